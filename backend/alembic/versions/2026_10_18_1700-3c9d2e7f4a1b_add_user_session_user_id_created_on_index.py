@@ -0,0 +1,30 @@
+"""add user_session user_id created_on index
+
+Revision ID: 3c9d2e7f4a1b
+Revises: 52bf070f396e
+Create Date: 2026-10-18 17:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d2e7f4a1b'
+down_revision: Union[str, None] = '52bf070f396e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_user_session_user_id_created_on",
+        "user_session",
+        ["user_id", sa.text("created_on DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_session_user_id_created_on", table_name="user_session")
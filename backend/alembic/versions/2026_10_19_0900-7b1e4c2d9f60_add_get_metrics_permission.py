@@ -0,0 +1,30 @@
+"""add GET_METRICS permission to SYSTEM_OWNER
+
+Revision ID: 7b1e4c2d9f60
+Revises: 3c9d2e7f4a1b
+Create Date: 2026-10-19 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4c2d9f60'
+down_revision: Union[str, None] = '3c9d2e7f4a1b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        sa.text(
+            "UPDATE ops.role SET permissions = array_append(permissions, 'GET_METRICS') "
+            "WHERE name = 'SYSTEM_OWNER' AND NOT 'GET_METRICS' = ANY(permissions)"
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(sa.text("UPDATE ops.role SET permissions = array_remove(permissions, 'GET_METRICS')"))
@@ -10,7 +10,8 @@ from data_tools.environment.types import DataToolsConfig
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from models import User
+from models import BaseModel, OpsDBHistoryType, User
+from models.utils import build_audit, build_snapshot
 
 SYSTEM_ADMIN_OIDC_ID = "00000000-0000-1111-a111-000000000026"
 SYSTEM_ADMIN_EMAIL = "system.admin@email.com"
@@ -47,3 +48,30 @@ def get_or_create_sys_user(session: Session) -> User:
         user = User(email=SYSTEM_ADMIN_EMAIL, oidc_id=UUID(SYSTEM_ADMIN_OIDC_ID))
 
     return user
+
+
+def get_db_history_row(obj: BaseModel, event_type: OpsDBHistoryType, sys_user: User) -> Optional[dict]:
+    """
+    Get the values of the OpsDBHistory record of an object written with a bulk statement.
+
+    Bulk statements don't go through the session's history triggers, the object (transient, with the committed
+    values of an updated row set with set_committed_value) has the changes to record.
+
+    Args:
+        obj: The object written
+        event_type: The type of the history event
+        sys_user: The system user to use
+    Returns:
+        The column values of the OpsDBHistory record, None if an updated object has no changes
+    """
+    db_audit = build_audit(obj, event_type)
+    if event_type == OpsDBHistoryType.UPDATED and not db_audit.changes:
+        return None
+    return {
+        "event_type": event_type,
+        "event_details": build_snapshot(obj),
+        "created_by": sys_user.id,
+        "class_name": obj.__class__.__name__,
+        "row_key": db_audit.row_key,
+        "changes": db_audit.changes,
+    }
@@ -1,6 +1,7 @@
 import os
 import sys
 import time
+from typing import Optional
 
 import click
 from data_tools.src.azure_utils.utils import get_csv
@@ -31,15 +32,26 @@ logger.add(sys.stderr, format=format, level="INFO")
 @click.command()
 @click.option("--env", help="The environment to use.")
 @click.option("--input-csv", help="The path to the CSV input file.")
+@click.option(
+    "--batch-size",
+    type=int,
+    default=None,
+    help="Load the CANs with bulk upserts of this many rows per statement and commit (instead of one row at a time).",
+)
+@click.option("--dry-run", is_flag=True, help="Load the CANs in batches and roll back instead of committing.")
 def main(
     env: str,
     input_csv: str,
+    batch_size: Optional[int],
+    dry_run: bool,
 ):
     """
     Main entrypoint for the script.
     """
     logger.debug(f"Environment: {env}")
     logger.debug(f"Input CSV: {input_csv}")
+    logger.debug(f"Batch size: {batch_size}")
+    logger.debug(f"Dry run: {dry_run}")
 
     logger.info("Starting the ETL process.")
 
@@ -70,7 +82,7 @@ def main(
         logger.info(f"Retrieved {len(portfolios)} portfolios.")
 
         try:
-            transform(csv_f, portfolios, session, sys_user)
+            transform(csv_f, portfolios, session, sys_user, batch_size=batch_size, dry_run=dry_run)
         except RuntimeError as re:
             logger.error(f"Error transforming data: {re}")
             sys.exit(1)
@@ -1,12 +1,34 @@
+import time
 from csv import DictReader
 from dataclasses import dataclass
-from typing import List
+from itertools import batched
+from typing import List, Optional
 
+from data_tools.src.common.utils import get_db_history_row
 from loguru import logger
-from sqlalchemy import and_, select
+from sqlalchemy import and_, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
-from models import CAN, CANFundingDetails, CANFundingSource, CANMethodOfTransfer, Portfolio, User
+from models import CAN, CANFundingDetails, CANFundingSource, CANMethodOfTransfer, OpsDBHistory, OpsDBHistoryType, Portfolio, User
+
+DEFAULT_BATCH_SIZE = 1000
+
+# the columns that identify a CANFundingDetails (there's no SYS_ID for it in the CAN data)
+FUNDING_DETAILS_COLUMNS = (
+    "fiscal_year",
+    "fund_code",
+    "allowance",
+    "sub_allowance",
+    "allotment",
+    "appropriation",
+    "method_of_transfer",
+    "funding_source",
+)
+
+# the columns of the CANs written by the loader
+CAN_COLUMNS = ("id", "number", "description", "nick_name", "portfolio_id", "funding_details_id")
 
 
 @dataclass
@@ -133,6 +155,39 @@ def create_models(data: CANData, sys_user: User, session: Session) -> None:
         raise e
 
 
+def get_funding_details_values(data: CANData) -> dict:
+    """
+    Get the column values of the CANFundingDetails of a CANData instance.
+
+    :param data: The CANData instance to use.
+
+    :return: The values of the CANFundingDetails columns that identify it.
+    """
+    appropriation_year = data.APPROP_YEAR[0:2] if data.APPROP_YEAR else ""
+    return {
+        "fiscal_year": int(data.FUND[6:10]),
+        "fund_code": data.FUND,
+        "allowance": data.ALLOWANCE,
+        "sub_allowance": data.SUB_ALLOWANCE,
+        "allotment": data.ALLOTMENT_ORG,
+        "appropriation": "-".join([data.APPROP_PREFIX or "", appropriation_year, data.APPROP_POSTFIX or ""]),
+        "method_of_transfer": CANMethodOfTransfer[data.METHOD_OF_TRANSFER],
+        "funding_source": CANFundingSource[data.FUNDING_SOURCE],
+    }
+
+
+def get_funding_details_key(data: CANData) -> tuple:
+    """
+    Get the values of the FUNDING_DETAILS_COLUMNS of the CANFundingDetails of a CANData instance.
+
+    :param data: The CANData instance to use.
+
+    :return: A tuple of the column values.
+    """
+    values = get_funding_details_values(data)
+    return tuple(values[column] for column in FUNDING_DETAILS_COLUMNS)
+
+
 def get_or_create_funding_details(data: CANData, sys_user: User, session: Session) -> CANFundingDetails:
     """
     Get or create a CANFundingDetails instance.
@@ -143,40 +198,12 @@ def get_or_create_funding_details(data: CANData, sys_user: User, session: Sessio
 
     :return: A CANFundingDetails instance.
     """
-    fiscal_year = int(data.FUND[6:10])
-    fund_code = data.FUND
-    allowance = data.ALLOWANCE
-    sub_allowance = data.SUB_ALLOWANCE
-    allotment = data.ALLOTMENT_ORG
-
-    appropriation_year = data.APPROP_YEAR[0:2] if data.APPROP_YEAR else ""
-    appropriation = "-".join([data.APPROP_PREFIX or "", appropriation_year, data.APPROP_POSTFIX or ""])
-
-    method_of_transfer = CANMethodOfTransfer[data.METHOD_OF_TRANSFER]
-    funding_source = CANFundingSource[data.FUNDING_SOURCE]
+    values = get_funding_details_values(data)
     existing_funding_details = session.execute(select(CANFundingDetails).where(
-        and_(
-            CANFundingDetails.fiscal_year == fiscal_year,
-            CANFundingDetails.fund_code == fund_code,
-            CANFundingDetails.allowance == allowance,
-            CANFundingDetails.sub_allowance == sub_allowance,
-            CANFundingDetails.allotment == allotment,
-            CANFundingDetails.appropriation == appropriation,
-            CANFundingDetails.method_of_transfer == method_of_transfer,
-            CANFundingDetails.funding_source == funding_source,
-        ))).scalar_one_or_none()
+        and_(*[getattr(CANFundingDetails, key) == value for key, value in values.items()])
+    )).scalar_one_or_none()
     if not existing_funding_details:
-        funding_details = CANFundingDetails(
-            fiscal_year=fiscal_year,
-            fund_code=fund_code,
-            allowance=allowance,
-            sub_allowance=sub_allowance,
-            allotment=allotment,
-            appropriation=appropriation,
-            method_of_transfer=method_of_transfer,
-            funding_source=funding_source,
-            created_by=sys_user.id,
-        )
+        funding_details = CANFundingDetails(**values, created_by=sys_user.id)
         return funding_details
     else:
         return existing_funding_details
@@ -235,7 +262,278 @@ def create_all_can_data(data: List[dict]) -> List[CANData]:
     return [create_can_data(d) for d in data]
 
 
-def transform(data: DictReader, portfolios: List[Portfolio], session: Session, sys_user: User) -> None:
+@dataclass
+class LoadResult:
+    """
+    The counts of a batch load of CANs.
+    """
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    funding_details_inserted: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def get_funding_details_ids(data: List[CANData], sys_user: User, session: Session, result: LoadResult) -> dict:
+    """
+    Get the ids of the CANFundingDetails of the CANData instances, inserting the missing ones in bulk.
+
+    The funding details are deduplicated in memory by their column values, the existing ones are read with one
+    query and the missing ones are inserted with one statement (with their history records).
+
+    :param data: The CanData instances (with valid fund codes).
+    :param sys_user: The system user to use.
+    :param session: The database session to use.
+    :param result: The LoadResult to count the inserted funding details in.
+
+    :return: A dict of the funding details ids by their keys (see get_funding_details_key).
+    """
+    keys = {get_funding_details_key(d) for d in data}
+    if not keys:
+        return {}
+
+    ids = {}
+    fund_codes = {dict(zip(FUNDING_DETAILS_COLUMNS, key))["fund_code"] for key in keys}
+    for funding_details in session.execute(
+        select(CANFundingDetails).where(CANFundingDetails.fund_code.in_(fund_codes))
+    ).scalars():
+        ids.setdefault(tuple(getattr(funding_details, column) for column in FUNDING_DETAILS_COLUMNS), funding_details.id)
+
+    missing = [key for key in keys if key not in ids]
+    if missing:
+        new_ids = session.execute(
+            insert(CANFundingDetails).returning(CANFundingDetails.id, sort_by_parameter_order=True),
+            [dict(zip(FUNDING_DETAILS_COLUMNS, key)) | {"created_by": sys_user.id} for key in missing],
+        ).scalars().all()
+        ids.update(zip(missing, new_ids))
+        session.execute(insert(OpsDBHistory), [
+            get_db_history_row(
+                CANFundingDetails(id=funding_details_id, **dict(zip(FUNDING_DETAILS_COLUMNS, key))),
+                OpsDBHistoryType.NEW,
+                sys_user,
+            )
+            for key, funding_details_id in zip(missing, new_ids)
+        ])
+        result.funding_details_inserted = len(missing)
+    return ids
+
+
+def get_can_values(data: CANData, portfolio_ids: dict, funding_details_ids: dict) -> dict:
+    """
+    Get the column values of the CAN of a CANData instance.
+
+    :param data: The CANData instance to use.
+    :param portfolio_ids: The portfolio ids by abbreviation.
+    :param funding_details_ids: The funding details ids by their keys (see get_funding_details_key).
+
+    :return: The CAN column values (without the funding_details_id if the fund code is invalid).
+    """
+    portfolio_id = portfolio_ids.get(data.PORTFOLIO)
+    if not portfolio_id:
+        raise ValueError(f"Portfolio not found for {data.PORTFOLIO}")
+
+    values = {
+        "id": data.SYS_CAN_ID,
+        "number": data.CAN_NBR,
+        "description": data.CAN_DESCRIPTION,
+        "nick_name": data.NICK_NAME,
+        "portfolio_id": portfolio_id,
+    }
+    try:
+        validate_fund_code(data)
+        values["funding_details_id"] = funding_details_ids[get_funding_details_key(data)]
+    except ValueError as e:
+        logger.info(f"Skipping creating funding details for {data} due to invalid fund code. {e}")
+    return values
+
+
+def upsert_cans(chunk: List[dict], sys_user: User, session: Session, result: LoadResult) -> None:
+    """
+    Upsert a chunk of CANs with INSERT ... ON CONFLICT and write their history records in bulk.
+
+    The existing CANs of the chunk are read with one query, so only the new and changed CANs are written and
+    their history records have the same changes as the ones written by the history triggers.
+
+    :param chunk: The CAN column values (with ids).
+    :param sys_user: The system user to use.
+    :param session: The database session to use.
+    :param result: The LoadResult to count the CANs in.
+
+    :return: None
+    """
+    existing = {
+        row.id: row._asdict()
+        for row in session.execute(
+            select(*[getattr(CAN, column) for column in CAN_COLUMNS]).where(CAN.id.in_([values["id"] for values in chunk]))
+        )
+    }
+
+    rows = []
+    history_rows = []
+    for values in chunk:
+        if values["id"] in existing:
+            can = CAN()
+            for column, value in existing[values["id"]].items():
+                set_committed_value(can, column, value)
+            for column, value in values.items():
+                setattr(can, column, value)
+            history_row = get_db_history_row(can, OpsDBHistoryType.UPDATED, sys_user)
+            if not history_row:
+                result.unchanged += 1
+                continue
+            result.updated += 1
+        else:
+            history_row = get_db_history_row(CAN(**values), OpsDBHistoryType.NEW, sys_user)
+            result.inserted += 1
+        rows.append(values)
+        history_rows.append(history_row)
+
+    # the statement's rows need the same columns, a CAN without funding details keeps its current ones
+    for values in rows:
+        values.setdefault("funding_details_id", None)
+        values["created_by"] = sys_user.id
+
+    if rows:
+        stmt = pg_insert(CAN)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CAN.id],
+            set_={
+                "number": stmt.excluded.number,
+                "description": stmt.excluded.description,
+                "nick_name": stmt.excluded.nick_name,
+                "portfolio_id": stmt.excluded.portfolio_id,
+                "funding_details_id": func.coalesce(stmt.excluded.funding_details_id, CAN.funding_details_id),
+                "updated_by": sys_user.id,
+                "updated_on": func.now(),
+            },
+        )
+        session.execute(stmt, rows)
+        session.execute(insert(OpsDBHistory), history_rows)
+
+
+def get_valid_fund_code_data(data: List[CANData]) -> List[CANData]:
+    """
+    Get the CANData instances with a valid fund code (the ones that get funding details).
+
+    :param data: The list of CanData instances.
+
+    :return: The CanData instances with a valid fund code.
+    """
+    valid_fund_code_data = []
+    for d in data:
+        try:
+            validate_fund_code(d)
+            valid_fund_code_data.append(d)
+        except ValueError:
+            pass
+    return valid_fund_code_data
+
+
+def insert_new_cans(chunk: List[dict], sys_user: User, session: Session, result: LoadResult) -> None:
+    """
+    Insert a chunk of CANs without a SYS_CAN_ID (with ids from the sequence) and write their history records in bulk.
+
+    :param chunk: The CAN column values (without ids).
+    :param sys_user: The system user to use.
+    :param session: The database session to use.
+    :param result: The LoadResult to count the CANs in.
+
+    :return: None
+    """
+    chunk = [{key: value for key, value in values.items() if key != "id"} for values in chunk]
+    ids = session.execute(
+        insert(CAN).returning(CAN.id, sort_by_parameter_order=True),
+        [{"funding_details_id": None, "created_by": sys_user.id} | values for values in chunk],
+    ).scalars().all()
+    session.execute(insert(OpsDBHistory), [
+        get_db_history_row(CAN(id=can_id, **values), OpsDBHistoryType.NEW, sys_user)
+        for values, can_id in zip(chunk, ids)
+    ])
+    result.inserted += len(chunk)
+
+
+def load_all_models(
+    data: List[CANData],
+    portfolios: List[Portfolio],
+    sys_user: User,
+    session: Session,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+) -> LoadResult:
+    """
+    Load the CANs of a list of CanData instances in batches.
+
+    The portfolios are looked up in memory, the funding details are deduplicated in memory and inserted in bulk,
+    and the CANs are upserted in chunks of batch_size rows with their history records (one commit per chunk).
+    CANs without a SYS_CAN_ID are inserted one chunk at a time as well.
+    Unlike create_all_models, the CAN version records are not written.
+
+    :param data: The list of CanData instances to load.
+    :param portfolios: The portfolios to use as reference data.
+    :param sys_user: The system user to use.
+    :param session: The database session to use.
+    :param batch_size: The number of CANs per statement (and commit).
+    :param dry_run: Roll back the load instead of committing it.
+
+    :return: The LoadResult of the load.
+    """
+    start = time.perf_counter()
+    result = LoadResult(rows=len(data))
+    portfolio_ids = {portfolio.abbreviation: portfolio.id for portfolio in portfolios}
+
+    try:
+        funding_details_ids = get_funding_details_ids(get_valid_fund_code_data(data), sys_user, session, result)
+
+        # a CAN appearing more than once is loaded with its last row (an upsert can't change a row twice)
+        cans = {}
+        new_cans = []
+        for d in data:
+            values = get_can_values(d, portfolio_ids, funding_details_ids)
+            if values["id"] is None:
+                new_cans.append(values)
+            else:
+                cans[values["id"]] = values
+
+        for chunk in batched(cans.values(), batch_size):
+            upsert_cans(list(chunk), sys_user, session, result)
+            if not dry_run:
+                session.commit()
+            logger.info(f"Loaded {result.inserted + result.updated + result.unchanged} of {len(cans)} CANs.")
+
+        for chunk in batched(new_cans, batch_size):
+            insert_new_cans(list(chunk), sys_user, session, result)
+            if not dry_run:
+                session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error loading the CANs: {e}")
+        raise e
+
+    if dry_run:
+        session.rollback()
+
+    result.seconds = time.perf_counter() - start
+    logger.info(
+        f"{'Dry run of loading' if dry_run else 'Loaded'} {result.rows} rows in {result.seconds:.2f}s "
+        f"({result.rows_per_second:.0f} rows/sec): {result.inserted} CANs inserted, {result.updated} updated, "
+        f"{result.unchanged} unchanged, {result.funding_details_inserted} funding details inserted."
+    )
+    return result
+
+
+def transform(
+    data: DictReader,
+    portfolios: List[Portfolio],
+    session: Session,
+    sys_user: User,
+    batch_size: Optional[int] = None,
+    dry_run: bool = False,
+) -> None:
     """
     Transform the data from the CSV file and persist the models to the database.
 
@@ -243,6 +541,8 @@ def transform(data: DictReader, portfolios: List[Portfolio], session: Session, s
     :param portfolios: The portfolios to use as reference data.
     :param session: The database session to use.
     :param sys_user: The system user to use.
+    :param batch_size: Load the models in batches of this size (see load_all_models) instead of one row at a time.
+    :param dry_run: Load the models in batches and roll back instead of committing.
 
     :return: None
     """
@@ -259,5 +559,8 @@ def transform(data: DictReader, portfolios: List[Portfolio], session: Session, s
 
     logger.info("Data validation passed.")
 
-    create_all_models(can_data, sys_user, session)
+    if batch_size or dry_run:
+        load_all_models(can_data, portfolios, sys_user, session, batch_size or DEFAULT_BATCH_SIZE, dry_run)
+    else:
+        create_all_models(can_data, sys_user, session)
     logger.info(f"Finished loading models.")
@@ -1,6 +1,7 @@
 import os
 import sys
 import time
+from typing import Optional
 
 import click
 from data_tools.src.azure_utils.utils import get_csv
@@ -29,15 +30,30 @@ logger.add(sys.stderr, format=format, level="INFO")
 @click.command()
 @click.option("--env", help="The environment to use.")
 @click.option("--input-csv", help="The path to the CSV input file.")
+@click.option(
+    "--batch-size",
+    type=int,
+    default=None,
+    help="Load the users with bulk upserts of this many rows per statement and commit (instead of one row at a time).",
+)
+@click.option(
+    "--checkpoint-file",
+    default=None,
+    help="Load the users in batches, recording the committed rows in this file to resume an interrupted load.",
+)
 def main(
     env: str,
     input_csv: str,
+    batch_size: Optional[int],
+    checkpoint_file: Optional[str],
 ):
     """
     Main entrypoint for the script.
     """
     logger.debug(f"Environment: {env}")
     logger.debug(f"Input CSV: {input_csv}")
+    logger.debug(f"Batch size: {batch_size}")
+    logger.debug(f"Checkpoint file: {checkpoint_file}")
 
     logger.info("Starting the ETL process.")
 
@@ -65,7 +81,7 @@ def main(
         setup_triggers(session, sys_user)
 
         try:
-            transform(csv_f, session, sys_user)
+            transform(csv_f, session, sys_user, batch_size=batch_size, checkpoint_file=checkpoint_file)
         except RuntimeError as re:
             logger.error(f"Error transforming data: {re}")
             sys.exit(1)
@@ -1,12 +1,42 @@
+import hashlib
+import json
+import os
+import time
 from csv import DictReader
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from itertools import batched
 from typing import List, Optional
 
+from data_tools.src.common.utils import get_db_history_row
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy import column, delete, func, insert, select, table, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
-from models import Division, OpsEvent, OpsEventStatus, OpsEventType, Role, User, UserStatus
+from models import (
+    Division,
+    OpsDBHistory,
+    OpsDBHistoryType,
+    OpsEvent,
+    OpsEventStatus,
+    OpsEventType,
+    Role,
+    User,
+    UserRole,
+    UserStatus,
+)
+
+DEFAULT_BATCH_SIZE = 1000
+
+# the columns of the users written by the loader
+USER_COLUMNS = ("id", "email", "status", "division")
+
+# the user_role table written by the bulk loader, a lightweight table so the statements aren't tracked as
+# association operations by the versioning (which needs a unit of work of a flush)
+USER_ROLE_TABLE = table(
+    "user_role", column("user_id"), column("role_id"), column("created_by"), column("created_on"), column("updated_on")
+)
 
 
 @dataclass
@@ -131,13 +161,372 @@ def create_all_user_data(data: List[dict]) -> List[UserData]:
     return [create_user_data(d) for d in data]
 
 
-def transform(data: DictReader, session: Session, sys_user: User) -> None:
+@dataclass
+class LoadResult:
+    """
+    The counts of a batch load of users.
+    """
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    resumed_from: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return (self.rows - self.resumed_from) / self.seconds if self.seconds else 0.0
+
+
+def get_fingerprint(data: List[UserData]) -> str:
+    """
+    Get a fingerprint of the user data, so a checkpoint is only resumed for the same input.
+
+    :param data: The list of UserData instances.
+
+    :return: The hex digest of the data.
+    """
+    return hashlib.sha256(json.dumps([asdict(d) for d in data]).encode()).hexdigest()
+
+
+def read_checkpoint(checkpoint_file: Optional[str], fingerprint: str) -> int:
+    """
+    Read the number of rows committed by an earlier (interrupted) load of the same data.
+
+    :param checkpoint_file: The path of the checkpoint file.
+    :param fingerprint: The fingerprint of the data being loaded (see get_fingerprint).
+
+    :return: The number of rows to skip, 0 if there's no checkpoint for the data.
+    """
+    if not checkpoint_file or not os.path.exists(checkpoint_file):
+        return 0
+    with open(checkpoint_file) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("fingerprint") != fingerprint:
+        logger.warning(f"Ignoring the checkpoint {checkpoint_file} of different data.")
+        return 0
+    return checkpoint["rows"]
+
+
+def write_checkpoint(checkpoint_file: Optional[str], fingerprint: str, rows: int) -> None:
+    """
+    Write the number of rows committed, replacing the checkpoint file atomically.
+
+    :param checkpoint_file: The path of the checkpoint file.
+    :param fingerprint: The fingerprint of the data being loaded (see get_fingerprint).
+    :param rows: The number of rows committed.
+
+    :return: None
+    """
+    if not checkpoint_file:
+        return
+    tmp_file = f"{checkpoint_file}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump({"fingerprint": fingerprint, "rows": rows}, f)
+    os.replace(tmp_file, checkpoint_file)
+
+
+def get_user_values(data: UserData, division_ids: dict) -> dict:
+    """
+    Get the column values of the User of a UserData instance.
+
+    :param data: The UserData instance to use.
+    :param division_ids: The division ids by abbreviation.
+
+    :return: The User column values.
+    """
+    return {
+        "id": data.SYS_USER_ID,
+        "email": data.EMAIL,
+        "status": UserStatus[data.STATUS],
+        "division": division_ids.get(data.DIVISION),
+    }
+
+
+def build_user(values: dict, role_ids: List[int], roles: dict, existing: Optional[tuple[dict, List[int]]] = None) -> User:
+    """
+    Build a transient User with its changes (see get_db_history_row).
+
+    :param values: The User column values.
+    :param role_ids: The ids of the roles of the user.
+    :param roles: The roles by id.
+    :param existing: The column values and role ids of the existing user, if any.
+
+    :return: The User instance.
+    """
+    # the user gets its own Role instances, the backref of the roles collection would collect all the users otherwise
+    user_roles = {
+        role_id: Role(id=role_id, name=roles[role_id].name)
+        for role_id in set(role_ids) | set(existing[1] if existing else [])
+    }
+    user = User()
+    if existing:
+        for attr, value in existing[0].items():
+            set_committed_value(user, attr, value)
+        set_committed_value(user, "roles", [user_roles[role_id] for role_id in existing[1]])
+    for attr, value in values.items():
+        setattr(user, attr, value)
+    user.roles = [user_roles[role_id] for role_id in role_ids]
+    return user
+
+
+def get_existing_users(ids: List[int], session: Session) -> dict:
+    """
+    Get the column values and role ids of the existing users, with one query each.
+
+    :param ids: The ids of the users.
+    :param session: The database session to use.
+
+    :return: A dict of the User column values and role ids of the existing users by id.
+    """
+    existing_roles = {}
+    for user_id, role_id in session.execute(
+        select(UserRole.user_id, UserRole.role_id).where(UserRole.user_id.in_(ids)).order_by(UserRole.role_id)
+    ):
+        existing_roles.setdefault(user_id, []).append(role_id)
+    return {
+        row.id: (row._asdict(), existing_roles.get(row.id, []))
+        for row in session.execute(select(*[getattr(User, attr) for attr in USER_COLUMNS]).where(User.id.in_(ids)))
+    }
+
+
+def get_changed_users(
+    users: List[tuple[dict, List[int]]], existing: dict, roles: dict, sys_user: User, result: LoadResult
+) -> tuple[List[dict], List[dict], dict]:
+    """
+    Get the new and changed users (with ids) to write and their history records.
+
+    :param users: The User column values and role ids of the users.
+    :param existing: The existing users (see get_existing_users).
+    :param roles: The roles by id.
+    :param sys_user: The system user to use.
+    :param result: The LoadResult to count the users in.
+
+    :return: The User rows to upsert, their OpsDBHistory rows and their role ids by user id.
+    """
+    rows = []
+    history_rows = []
+    user_roles = {}
+    for values, role_ids in users:
+        if values["id"] in existing:
+            history_row = get_db_history_row(
+                build_user(values, role_ids, roles, existing[values["id"]]), OpsDBHistoryType.UPDATED, sys_user
+            )
+            if not history_row:
+                result.unchanged += 1
+                continue
+            result.updated += 1
+        else:
+            history_row = get_db_history_row(build_user(values, role_ids, roles), OpsDBHistoryType.NEW, sys_user)
+            result.inserted += 1
+        rows.append(values | {"created_by": sys_user.id})
+        history_rows.append(history_row)
+        user_roles[values["id"]] = role_ids
+    return rows, history_rows, user_roles
+
+
+def insert_new_users(
+    new_users: List[tuple[dict, List[int]]], roles: dict, sys_user: User, session: Session, result: LoadResult
+) -> tuple[List[dict], dict]:
+    """
+    Insert the users without an id (with ids from the sequence), setting the ids of their values.
+
+    :param new_users: The User column values and role ids of the users.
+    :param roles: The roles by id.
+    :param sys_user: The system user to use.
+    :param session: The database session to use.
+    :param result: The LoadResult to count the users in.
+
+    :return: The OpsDBHistory rows of the users and their role ids by user id.
+    """
+    new_ids = session.execute(
+        insert(User).returning(User.id, sort_by_parameter_order=True),
+        [
+            {key: value for key, value in values.items() if key != "id"} | {"created_by": sys_user.id}
+            for values, _ in new_users
+        ],
+    ).scalars().all()
+    history_rows = []
+    user_roles = {}
+    for (values, role_ids), user_id in zip(new_users, new_ids):
+        values["id"] = user_id
+        history_rows.append(get_db_history_row(build_user(values, role_ids, roles), OpsDBHistoryType.NEW, sys_user))
+        user_roles[user_id] = role_ids
+    result.inserted += len(new_users)
+    return history_rows, user_roles
+
+
+def replace_user_roles(user_roles: dict, sys_user: User, session: Session) -> None:
+    """
+    Replace the user_role rows of the users with one DELETE of the removed roles and one INSERT of the assigned ones.
+
+    :param user_roles: The role ids by user id.
+    :param sys_user: The system user to use.
+    :param session: The database session to use.
+
+    :return: None
+    """
+    pairs = [(user_id, role_id) for user_id, role_ids in user_roles.items() for role_id in role_ids]
+    session.execute(
+        delete(USER_ROLE_TABLE).where(
+            USER_ROLE_TABLE.c.user_id.in_(list(user_roles)),
+            tuple_(USER_ROLE_TABLE.c.user_id, USER_ROLE_TABLE.c.role_id).not_in(pairs),
+        )
+    )
+    if pairs:
+        # the lightweight table has none of the column defaults of the model
+        session.execute(
+            pg_insert(USER_ROLE_TABLE).values(created_on=func.now(), updated_on=func.now()).on_conflict_do_nothing(),
+            [{"user_id": user_id, "role_id": role_id, "created_by": sys_user.id} for user_id, role_id in pairs],
+        )
+
+
+def upsert_users(
+    chunk: List[tuple[dict, List[int]]], roles: dict, sys_user: User, session: Session, result: LoadResult
+) -> List[dict]:
+    """
+    Upsert a chunk of users and their roles with bulk statements and write their history records in bulk.
+
+    The existing users of the chunk (and their roles) are read with one query each, so only the new and changed
+    users are written and their history records have the same changes as the ones written by the history triggers.
+    Users without an id are inserted (with ids from the sequence).
+
+    :param chunk: The User column values and role ids of the users.
+    :param roles: The roles by id.
+    :param sys_user: The system user to use.
+    :param session: The database session to use.
+    :param result: The LoadResult to count the users in.
+
+    :return: The User column values (with ids) of all the users of the chunk.
+    """
+    existing = get_existing_users([values["id"] for values, _ in chunk if values["id"] is not None], session)
+
+    # a user appearing more than once is loaded with its last row (an upsert can't change a row twice)
+    users = {values["id"]: (values, role_ids) for values, role_ids in chunk if values["id"] is not None}
+    new_users = [(values, role_ids) for values, role_ids in chunk if values["id"] is None]
+
+    rows, history_rows, user_roles = get_changed_users(list(users.values()), existing, roles, sys_user, result)
+    if rows:
+        stmt = pg_insert(User)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.id],
+            set_={
+                "email": stmt.excluded.email,
+                "status": stmt.excluded.status,
+                "division": stmt.excluded.division,
+                "updated_by": sys_user.id,
+                "updated_on": func.now(),
+            },
+        )
+        session.execute(stmt, rows)
+
+    if new_users:
+        new_history_rows, new_user_roles = insert_new_users(new_users, roles, sys_user, session, result)
+        history_rows.extend(new_history_rows)
+        user_roles.update(new_user_roles)
+
+    if user_roles:
+        replace_user_roles(user_roles, sys_user, session)
+        session.execute(insert(OpsDBHistory), history_rows)
+
+    return [values for values, _ in chunk]
+
+
+def load_all_models(
+    data: List[UserData],
+    sys_user: User,
+    session: Session,
+    roles: List[Role],
+    divisions: List[Division],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    checkpoint_file: Optional[str] = None,
+) -> LoadResult:
+    """
+    Load the users of a list of UserData instances in batches.
+
+    The roles and divisions are looked up in memory, and the users are upserted in chunks of batch_size rows with
+    their roles, history records and CREATE_USER events (one commit per chunk). After each commit the number of rows
+    loaded is written to the checkpoint file, so an interrupted load of the same data resumes after the last
+    committed chunk; the file is removed when the load finishes.
+    Unlike create_all_models, the user (and user role) version records are not written.
+
+    :param data: The list of UserData instances to load.
+    :param sys_user: The system user to use.
+    :param session: The database session to use.
+    :param roles: The list of roles to use.
+    :param divisions: The list of divisions to use.
+    :param batch_size: The number of users per statement (and commit).
+    :param checkpoint_file: The path of the checkpoint file, if any.
+
+    :return: The LoadResult of the load.
+    """
+    start = time.perf_counter()
+    fingerprint = get_fingerprint(data)
+    result = LoadResult(rows=len(data), resumed_from=read_checkpoint(checkpoint_file, fingerprint))
+    if result.resumed_from:
+        logger.info(f"Resuming the load after the {result.resumed_from} rows of the checkpoint {checkpoint_file}.")
+
+    roles_by_id = {role.id: role for role in roles}
+    division_ids = {division.abbreviation: division.id for division in divisions}
+
+    loaded = result.resumed_from
+    try:
+        for chunk in batched(data[result.resumed_from:], batch_size):
+            chunk_values = upsert_users(
+                [
+                    (get_user_values(d, division_ids), [role.id for role in roles if role.name in d.ROLES])
+                    for d in chunk
+                ],
+                roles_by_id,
+                sys_user,
+                session,
+                result,
+            )
+            session.execute(insert(OpsEvent), [
+                {
+                    "event_type": OpsEventType.CREATE_USER,
+                    "event_status": OpsEventStatus.SUCCESS,
+                    "created_by": sys_user.id,
+                    "event_details": {"user_id": values["id"], "message": f"Upserted user {values['email']}"},
+                }
+                for values in chunk_values
+            ])
+            session.commit()
+            loaded += len(chunk)
+            write_checkpoint(checkpoint_file, fingerprint, loaded)
+            logger.info(f"Loaded {loaded} of {len(data)} users.")
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error loading the users after {loaded} rows: {e}")
+        raise e
+
+    if checkpoint_file and os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+
+    result.seconds = time.perf_counter() - start
+    logger.info(
+        f"Loaded {result.rows - result.resumed_from} rows in {result.seconds:.2f}s "
+        f"({result.rows_per_second:.0f} rows/sec): {result.inserted} users inserted, {result.updated} updated, "
+        f"{result.unchanged} unchanged."
+    )
+    return result
+
+
+def transform(
+    data: DictReader,
+    session: Session,
+    sys_user: User,
+    batch_size: Optional[int] = None,
+    checkpoint_file: Optional[str] = None,
+) -> None:
     """
     Transform the data from the CSV file and persist the models to the database.
 
     :param data: The data from the CSV file.
     :param session: The database session to use.
     :param sys_user: The system user to use.
+    :param batch_size: Load the models in batches of this size (see load_all_models) instead of one row at a time.
+    :param checkpoint_file: Load the models in batches, resuming from (and recording) the rows committed in this file.
 
     :return: None
     """
@@ -160,5 +549,10 @@ def transform(data: DictReader, session: Session, sys_user: User) -> None:
 
     logger.info("Data validation passed.")
 
-    create_all_models(user_data, sys_user, session, roles, divisions)
+    if batch_size or checkpoint_file:
+        load_all_models(
+            user_data, sys_user, session, roles, divisions, batch_size or DEFAULT_BATCH_SIZE, checkpoint_file
+        )
+    else:
+        create_all_models(user_data, sys_user, session, roles, divisions)
     logger.info(f"Finished loading models.")
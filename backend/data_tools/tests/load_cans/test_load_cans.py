@@ -10,6 +10,7 @@ from data_tools.src.load_cans.utils import (
     CANData,
     create_can_data,
     create_models,
+    load_all_models,
     validate_all,
     validate_data,
     validate_fund_code,
@@ -574,3 +575,162 @@ def test_create_models_invalid_fund_code(db_with_portfolios):
     db_with_portfolios.execute(text("DELETE FROM can_funding_details_version"))
     db_with_portfolios.execute(text("DELETE FROM ops_db_history"))
     db_with_portfolios.execute(text("DELETE FROM ops_db_history_version"))
+
+
+def test_main_batch(db_with_portfolios):
+    result = CliRunner().invoke(
+        main,
+        [
+            "--env",
+            "pytest_data_tools",
+            "--input-csv",
+            "test_csv/can_valid.tsv",
+            "--batch-size",
+            "5",
+        ],
+    )
+
+    assert result.exit_code == 0
+
+    can_1 = db_with_portfolios.get(CAN, 500)
+    assert can_1.number == "G99HRF2"
+    assert can_1.nick_name == "HMRF-OPRE"
+    assert can_1.portfolio == db_with_portfolios.execute(select(Portfolio).where(Portfolio.abbreviation == "HMRF")).scalar_one_or_none()
+    assert can_1.funding_details == db_with_portfolios.execute(select(CANFundingDetails).where(CANFundingDetails.fund_code == "AAXXXX20231DAD")).scalar_one_or_none()
+    assert can_1.funding_details.appropriation == "XX-23-XXXX"
+    assert can_1.funding_details.method_of_transfer == CANMethodOfTransfer.DIRECT
+
+    can_2 = db_with_portfolios.get(CAN, 505)
+    assert can_2.number == "G994648"
+    assert can_2.funding_details.fund_code == "FFXXXX20215DAD"
+    assert can_2.funding_details.appropriation == "XX-21-XXXX"
+
+    history_objs = db_with_portfolios.execute(select(OpsDBHistory).where(OpsDBHistory.class_name == "CAN")).scalars().all()
+    assert len(history_objs) == 13
+    assert all(history.event_type == OpsDBHistoryType.NEW for history in history_objs)
+
+    can_1_history = db_with_portfolios.execute(select(OpsDBHistory).where(and_(OpsDBHistory.row_key == "500", OpsDBHistory.class_name == "CAN"))).scalar_one()
+    assert can_1_history.changes["number"] == {"new": "G99HRF2"}
+    assert can_1_history.event_details["display_name"] == "G99HRF2"
+
+    funding_details_history = db_with_portfolios.execute(select(OpsDBHistory).where(OpsDBHistory.class_name == "CANFundingDetails")).scalars().all()
+    assert len(funding_details_history) == len(db_with_portfolios.execute(select(CANFundingDetails)).scalars().all())
+
+    # loading the same file again doesn't change anything
+    result = CliRunner().invoke(
+        main,
+        [
+            "--env",
+            "pytest_data_tools",
+            "--input-csv",
+            "test_csv/can_valid.tsv",
+            "--batch-size",
+            "5",
+        ],
+    )
+    assert result.exit_code == 0
+    history_objs_after = db_with_portfolios.execute(select(OpsDBHistory).where(OpsDBHistory.class_name.in_(["CAN", "CANFundingDetails"]))).scalars().all()
+    assert len(history_objs_after) == len(history_objs) + len(funding_details_history)
+
+    # Cleanup
+    db_with_portfolios.execute(text("DELETE FROM can"))
+    db_with_portfolios.execute(text("DELETE FROM can_funding_details"))
+    db_with_portfolios.execute(text("DELETE FROM can_version"))
+    db_with_portfolios.execute(text("DELETE FROM can_funding_details_version"))
+    db_with_portfolios.execute(text("DELETE FROM ops_db_history"))
+    db_with_portfolios.execute(text("DELETE FROM ops_db_history_version"))
+
+
+def test_main_dry_run(db_with_portfolios):
+    result = CliRunner().invoke(
+        main,
+        [
+            "--env",
+            "pytest_data_tools",
+            "--input-csv",
+            "test_csv/can_valid.tsv",
+            "--dry-run",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert db_with_portfolios.execute(select(CAN)).scalars().all() == []
+    assert db_with_portfolios.execute(select(CANFundingDetails)).scalars().all() == []
+    assert db_with_portfolios.execute(select(OpsDBHistory).where(OpsDBHistory.class_name.in_(["CAN", "CANFundingDetails"]))).scalars().all() == []
+
+
+def test_load_all_models_upsert(db_with_portfolios):
+    sys_user = get_or_create_sys_user(db_with_portfolios)
+    portfolios = list(db_with_portfolios.execute(select(Portfolio)).scalars().all())
+
+    data_1 = CANData(
+        SYS_CAN_ID=500,
+        CAN_NBR="G99HRF2",
+        CAN_DESCRIPTION="Healthy Marriages Responsible Fatherhood - OPRE",
+        FUND="AAXXXX20231DAD",
+        ALLOWANCE="0000000001",
+        ALLOTMENT_ORG="YZC6S1JUGUN",
+        SUB_ALLOWANCE="9KRZ2ND",
+        CURRENT_FY_FUNDING_YTD=880000.0,
+        APPROP_PREFIX="XX",
+        APPROP_POSTFIX="XXXX",
+        APPROP_YEAR="23",
+        PORTFOLIO="HMRF",
+        FUNDING_SOURCE="OPRE",
+        METHOD_OF_TRANSFER="DIRECT",
+        NICK_NAME="HMRF-OPRE",
+    )
+
+    data_2 = CANData(
+        SYS_CAN_ID=500,
+        CAN_NBR="G99HRF3",
+        CAN_DESCRIPTION="Healthy Marriages Responsible Fatherhood - OPRE",
+        FUND="AAXXXX20231DAM",
+        ALLOWANCE="0000000001",
+        ALLOTMENT_ORG="YZC6S1JUGUN",
+        SUB_ALLOWANCE="9KRZ2ND",
+        CURRENT_FY_FUNDING_YTD=880000.0,
+        APPROP_PREFIX="XX",
+        APPROP_POSTFIX="XXXX",
+        APPROP_YEAR="23",
+        PORTFOLIO="CC",
+        FUNDING_SOURCE="OPRE",
+        METHOD_OF_TRANSFER="DIRECT",
+        NICK_NAME="HMRF-OPRE",
+    )
+
+    result = load_all_models([data_1], portfolios, sys_user, db_with_portfolios)
+    assert (result.inserted, result.updated, result.unchanged, result.funding_details_inserted) == (1, 0, 0, 1)
+
+    # the same CAN twice in a batch is loaded with its last row
+    result = load_all_models([data_1, data_2], portfolios, sys_user, db_with_portfolios, batch_size=1)
+    assert (result.inserted, result.updated, result.unchanged, result.funding_details_inserted) == (0, 1, 0, 1)
+
+    db_with_portfolios.expire_all()
+    can_1 = db_with_portfolios.get(CAN, 500)
+    assert can_1.number == "G99HRF3"
+    assert can_1.portfolio.abbreviation == "CC"
+    assert can_1.funding_details.fund_code == "AAXXXX20231DAM"
+    assert len(db_with_portfolios.execute(select(CAN)).scalars().all()) == 1
+    assert len(db_with_portfolios.execute(select(CANFundingDetails)).scalars().all()) == 2
+
+    history_record = db_with_portfolios.execute(
+        select(OpsDBHistory)
+        .where(OpsDBHistory.class_name == "CAN", OpsDBHistory.event_type == OpsDBHistoryType.UPDATED)
+    ).scalar_one()
+    assert history_record.row_key == "500"
+    assert history_record.changes["number"] == {"new": "G99HRF3", "old": "G99HRF2"}
+    assert set(history_record.changes) == {"number", "portfolio_id", "funding_details_id"}
+    assert history_record.event_details["number"] == "G99HRF3"
+
+    result = load_all_models([data_2], portfolios, sys_user, db_with_portfolios)
+    assert (result.inserted, result.updated, result.unchanged, result.funding_details_inserted) == (0, 0, 1, 0)
+    assert result.rows_per_second > 0
+
+    # Cleanup
+    db_with_portfolios.execute(text("DELETE FROM can"))
+    db_with_portfolios.execute(text("DELETE FROM can_funding_details"))
+    db_with_portfolios.execute(text("DELETE FROM can_version"))
+    db_with_portfolios.execute(text("DELETE FROM can_funding_details_version"))
+    db_with_portfolios.execute(text("DELETE FROM ops_db_history"))
+    db_with_portfolios.execute(text("DELETE FROM ops_db_history_version"))
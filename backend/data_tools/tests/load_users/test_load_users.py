@@ -6,7 +6,17 @@ from data_tools.environment.dev import DevConfig
 from data_tools.src.common.utils import get_or_create_sys_user
 from data_tools.src.import_static_data.import_data import get_config
 from data_tools.src.load_users.main import main
-from data_tools.src.load_users.utils import UserData, create_models, create_user_data, validate_all, validate_data
+from data_tools.src.load_users.utils import (
+    UserData,
+    create_models,
+    create_user_data,
+    get_fingerprint,
+    load_all_models,
+    read_checkpoint,
+    validate_all,
+    validate_data,
+    write_checkpoint,
+)
 from sqlalchemy import and_, text
 
 from models import *  # noqa: F403, F401
@@ -272,3 +282,155 @@ def test_create_models_upsert(db_with_roles):
     db_with_roles.execute(text("DELETE FROM ops_user_version"))
     db_with_roles.execute(text("DELETE FROM ops_db_history"))
     db_with_roles.execute(text("DELETE FROM ops_db_history_version"))
+
+
+def test_main_batch(db_with_roles, tmp_path):
+    checkpoint_file = tmp_path / "users.checkpoint"
+    result = CliRunner().invoke(
+        main,
+        [
+            "--env",
+            "pytest_data_tools",
+            "--input-csv",
+            "test_csv/users.tsv",
+            "--batch-size",
+            "10",
+            "--checkpoint-file",
+            str(checkpoint_file),
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert not checkpoint_file.exists()
+
+    # make sure the data was loaded
+    user_1 = db_with_roles.get(User, 1)
+    assert user_1 is not None
+    assert user_1.email == "chris.fortunato@example.com"
+    assert user_1.status == UserStatus.INACTIVE
+
+    history_objs = db_with_roles.execute(select(OpsDBHistory).where(OpsDBHistory.class_name == "User")).scalars().all()
+    assert len(history_objs) == 29
+
+    event_objs = db_with_roles.execute(select(OpsEvent).where(OpsEvent.event_type == OpsEventType.CREATE_USER)).scalars().all()
+    assert len(event_objs) >= 29
+
+    # Cleanup
+    db_with_roles.execute(text("DELETE FROM user_role"))
+    db_with_roles.execute(text("DELETE FROM user_role_version"))
+    db_with_roles.execute(text("DELETE FROM ops_user"))
+    db_with_roles.execute(text("DELETE FROM ops_user_version"))
+    db_with_roles.execute(text("DELETE FROM ops_db_history"))
+    db_with_roles.execute(text("DELETE FROM ops_db_history_version"))
+
+
+def test_load_all_models_upsert(db_with_roles):
+    sys_user = get_or_create_sys_user(db_with_roles)
+    roles = list(db_with_roles.execute(select(Role).order_by(Role.id)).scalars().all())
+    divisions = list(db_with_roles.execute(select(Division)).scalars().all())
+
+    data = [
+        UserData(SYS_USER_ID=1, EMAIL="user.demo@email.com", STATUS="INACTIVE", ROLES="role_1, role_2", DIVISION="FD"),
+        UserData(SYS_USER_ID=2, EMAIL="user.two@email.com", STATUS="ACTIVE", ROLES="role_2", DIVISION="FD"),
+        UserData(EMAIL="user.new@email.com", STATUS="ACTIVE", ROLES="role_1", DIVISION="FD"),
+    ]
+
+    result = load_all_models(data, sys_user, db_with_roles, roles, divisions, batch_size=2)
+
+    assert (result.rows, result.inserted, result.updated, result.unchanged) == (3, 3, 0, 0)
+
+    user_1 = db_with_roles.get(User, 1)
+    assert user_1.email == "user.demo@email.com"
+    assert user_1.status == UserStatus.INACTIVE
+    assert user_1.division == 999
+    assert sorted(role.id for role in user_1.roles) == [1, 2]
+
+    new_user = db_with_roles.execute(select(User).where(User.email == "user.new@email.com")).scalar_one()
+    assert [role.id for role in new_user.roles] == [1]
+
+    user_roles = db_with_roles.execute(select(UserRole)).scalars().all()
+    assert len(user_roles) == 4
+    assert all(user_role.created_on is not None and user_role.created_by == sys_user.id for user_role in user_roles)
+
+    history_record = db_with_roles.execute(
+        select(OpsDBHistory).where(and_(OpsDBHistory.class_name == "User", OpsDBHistory.row_key == "1"))
+    ).scalar_one()
+    assert history_record.event_type == OpsDBHistoryType.NEW
+    assert history_record.created_by == sys_user.id
+
+    # upsert the changed data, user 2 is unchanged
+    data = [
+        UserData(SYS_USER_ID=1, EMAIL="user.demo.updated@email.com", STATUS="ACTIVE", ROLES="role_1", DIVISION="FD"),
+        UserData(SYS_USER_ID=2, EMAIL="user.two@email.com", STATUS="ACTIVE", ROLES="role_2", DIVISION="FD"),
+    ]
+
+    result = load_all_models(data, sys_user, db_with_roles, roles, divisions, batch_size=2)
+
+    assert (result.rows, result.inserted, result.updated, result.unchanged) == (2, 0, 1, 1)
+
+    db_with_roles.expire_all()
+    user_1 = db_with_roles.get(User, 1)
+    assert user_1.email == "user.demo.updated@email.com"
+    assert user_1.status == UserStatus.ACTIVE
+    assert [role.id for role in user_1.roles] == [1]
+    assert user_1.updated_by == sys_user.id
+
+    history_record = db_with_roles.execute(
+        select(OpsDBHistory).where(
+            and_(
+                OpsDBHistory.class_name == "User",
+                OpsDBHistory.row_key == "1",
+                OpsDBHistory.event_type == OpsDBHistoryType.UPDATED,
+            )
+        )
+    ).scalar_one()
+    assert history_record.changes["email"] == {"new": "user.demo.updated@email.com", "old": "user.demo@email.com"}
+    assert [role["id"] for role in history_record.changes["roles"]["deleted"]] == [2]
+    assert len(
+        db_with_roles.execute(
+            select(OpsDBHistory).where(and_(OpsDBHistory.class_name == "User", OpsDBHistory.row_key == "2"))
+        ).scalars().all()
+    ) == 1
+
+    # Cleanup
+    db_with_roles.execute(text("DELETE FROM user_role"))
+    db_with_roles.execute(text("DELETE FROM user_role_version"))
+    db_with_roles.execute(text("DELETE FROM ops_user"))
+    db_with_roles.execute(text("DELETE FROM ops_user_version"))
+    db_with_roles.execute(text("DELETE FROM ops_db_history"))
+    db_with_roles.execute(text("DELETE FROM ops_db_history_version"))
+
+
+def test_load_all_models_resume(db_with_roles, tmp_path):
+    sys_user = get_or_create_sys_user(db_with_roles)
+    roles = list(db_with_roles.execute(select(Role).order_by(Role.id)).scalars().all())
+    divisions = list(db_with_roles.execute(select(Division)).scalars().all())
+
+    data = [
+        UserData(SYS_USER_ID=1, EMAIL="user.one@email.com", STATUS="ACTIVE", ROLES="role_1", DIVISION="FD"),
+        UserData(SYS_USER_ID=2, EMAIL="user.two@email.com", STATUS="ACTIVE", ROLES="role_1", DIVISION="FD"),
+        UserData(SYS_USER_ID=3, EMAIL="user.three@email.com", STATUS="ACTIVE", ROLES="role_1", DIVISION="FD"),
+    ]
+
+    # an earlier load of the same data committed the first chunk
+    checkpoint_file = tmp_path / "users.checkpoint"
+    write_checkpoint(str(checkpoint_file), get_fingerprint(data), 2)
+
+    result = load_all_models(data, sys_user, db_with_roles, roles, divisions, batch_size=2, checkpoint_file=str(checkpoint_file))
+
+    assert (result.resumed_from, result.inserted) == (2, 1)
+    assert db_with_roles.get(User, 1) is None
+    assert db_with_roles.get(User, 3) is not None
+    assert not checkpoint_file.exists()
+
+    # a checkpoint of different data is ignored
+    write_checkpoint(str(checkpoint_file), "other data", 2)
+    assert read_checkpoint(str(checkpoint_file), get_fingerprint(data)) == 0
+
+    # Cleanup
+    db_with_roles.execute(text("DELETE FROM user_role"))
+    db_with_roles.execute(text("DELETE FROM user_role_version"))
+    db_with_roles.execute(text("DELETE FROM ops_user"))
+    db_with_roles.execute(text("DELETE FROM ops_user_version"))
+    db_with_roles.execute(text("DELETE FROM ops_db_history"))
+    db_with_roles.execute(text("DELETE FROM ops_db_history_version"))
@@ -1,13 +1,23 @@
 """Agreement models."""
 
 from enum import Enum, auto
-from typing import List, Optional
-
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Table, Text, select
+from typing import Iterable, List, Optional
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    ForeignKey,
+    Integer,
+    String,
+    Table,
+    Text,
+    event,
+    select,
+)
 from sqlalchemy.dialects.postgresql import ENUM
-from sqlalchemy.orm import Mapped, mapped_column, object_session, relationship
+from sqlalchemy.orm import Mapped, Session, mapped_column, object_session, relationship
 
-from models.base import BaseModel
+from models.base import AuditProfile, AuditSnapshot, BaseModel
 from models.procurement_tracker import ProcurementTracker
 from models.users import User
 
@@ -74,6 +84,7 @@ class Agreement(BaseModel):
     """Base Agreement Model"""
 
     __tablename__ = "agreement"
+    __audit__ = AuditProfile(snapshot=AuditSnapshot.COLUMNS)
 
     id: Mapped[int] = BaseModel.get_pk_column()
     agreement_type: Mapped[AgreementType] = mapped_column(ENUM(AgreementType))
@@ -131,6 +142,9 @@ class Agreement(BaseModel):
 
     @property
     def procurement_tracker_id(self):
+        # use the procurement tracker id bulk loaded by load_procurement_tracker_ids (if any)
+        if "_procurement_tracker_id" in self.__dict__:
+            return self._procurement_tracker_id
         if object_session(self) is None:
             return False
         tracker_id = object_session(self).scalar(
@@ -140,6 +154,46 @@ class Agreement(BaseModel):
         )
         return tracker_id
 
+    @classmethod
+    def load_procurement_tracker_ids(
+        cls, session: Session, agreements: Iterable["Agreement"]
+    ) -> None:
+        """
+        Bulk load the procurement tracker ids of the given agreements with a single query
+        and attach them to the instances, so procurement_tracker_id doesn't issue a query
+        per agreement when a collection is serialized.
+
+        The loaded ids are discarded when the instance is expired (e.g. on commit).
+        """
+        agreements = [agreement for agreement in agreements if agreement.id is not None]
+        if not agreements:
+            return
+
+        tracker_id_by_agreement_id: dict[int, int] = {}
+        results = session.execute(
+            select(ProcurementTracker.agreement_id, ProcurementTracker.id)
+            .where(
+                ProcurementTracker.agreement_id.in_(
+                    {agreement.id for agreement in agreements}
+                )
+            )
+            .order_by(ProcurementTracker.id)
+        )
+        for agreement_id, tracker_id in results:
+            tracker_id_by_agreement_id.setdefault(agreement_id, tracker_id)
+
+        for agreement in agreements:
+            agreement._procurement_tracker_id = tracker_id_by_agreement_id.get(
+                agreement.id
+            )
+
+
+@event.listens_for(Agreement, "expire", propagate=True)
+def discard_loaded_procurement_tracker_id(target, attrs):
+    # target is None when the instance has already been garbage collected
+    if target is not None:
+        target.__dict__.pop("_procurement_tracker_id", None)
+
 
 contract_support_contacts = Table(
     "contract_support_contacts",
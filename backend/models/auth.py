@@ -1,14 +1,19 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import ForeignKey, Text
+from sqlalchemy import ForeignKey, Index, Text, desc
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from models.base import BaseModel
+from models.base import AuditProfile, AuditSnapshot, BaseModel
 
 
 class UserSession(BaseModel):
     __tablename__ = "user_session"
+    # the tokens are left out of the history
+    __audit__ = AuditProfile(
+        columns=("user_id", "is_active", "ip_address", "last_active_at"),
+        snapshot=AuditSnapshot.SLIM,
+    )
 
     id: Mapped[int] = BaseModel.get_pk_column()
 
@@ -22,3 +27,11 @@ class UserSession(BaseModel):
     access_token: Mapped[str] = mapped_column(Text, nullable=False)
     refresh_token: Mapped[str] = mapped_column(Text, nullable=False)
     last_active_at: Mapped[datetime]
+
+
+# index to find the latest session of a user (checked on requests)
+index = Index(
+    "ix_user_session_user_id_created_on",
+    UserSession.user_id,
+    desc(UserSession.created_on),
+)
@@ -2,17 +2,26 @@
 
 import enum
 from datetime import datetime
-from typing import Optional, cast
+from functools import cache
+from typing import Iterable, NamedTuple, Optional, cast
 
 import sqlalchemy
 from loguru import logger
 from marshmallow_enum import EnumField
-from sqlalchemy import Column, ForeignKey, Integer, Sequence, event, func
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, mapper, object_session
+from sqlalchemy import Column, ForeignKey, Integer, Sequence, event, func, select
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    Session,
+    mapped_column,
+    mapper,
+    object_session,
+)
 from typing_extensions import Any
 
 import marshmallow
-from marshmallow import fields
+from marshmallow import Schema, fields, missing
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
 from marshmallow.exceptions import MarshmallowError
 
 
@@ -83,13 +92,104 @@ def setup_schema(base: Base) -> callable:
 def setup_schema_trigger():
     setup_schema(Base)()
 
+
+# marshmallow fields that dump values of exactly these python types unchanged
+PLAIN_DUMP_FIELD_TYPES = {fields.Integer: int, fields.String: str, fields.Boolean: bool}
+
+
+@cache
+def get_schema(schema_class: type[Schema]) -> Schema:
+    """A single (reusable) instance of the schema class."""
+    return schema_class()
+
+
+@cache
+def get_dump_fields(
+    schema_class: type[Schema],
+) -> Optional[list[tuple[str, str, str, fields.Field, Optional[type]]]]:
+    """
+    The (key, name, attribute, field, plain python type) of each field the schema dumps, or None if
+    the schema has dump processors and can only be dumped with Schema.dump.
+    """
+    schema = get_schema(schema_class)
+    if schema._hooks[PRE_DUMP] or schema._hooks[POST_DUMP]:
+        return None
+
+    dump_fields = []
+    for name, field in schema.dump_fields.items():
+        attribute = field.attribute or name
+        plain_type = PLAIN_DUMP_FIELD_TYPES.get(type(field)) if "." not in attribute else None
+        key = field.data_key if field.data_key is not None else name
+        dump_fields.append((key, name, attribute, field, plain_type))
+    return dump_fields
+
+
+def dump(schema_class: type[Schema], obj: Any) -> dict:
+    """
+    The same as schema_class().dump(obj) but reuses the schema instance and reads the values
+    of integer, string and boolean fields directly from the object.
+    """
+    schema = get_schema(schema_class)
+    dump_fields = get_dump_fields(schema_class)
+    if dump_fields is None:
+        return schema.dump(obj)
+
+    data = {}
+    for key, name, attribute, field, plain_type in dump_fields:
+        if plain_type:
+            # a missing attribute is left to marshmallow (the field's dump_default or no key)
+            value = getattr(obj, attribute, missing)
+            if value is None or type(value) is plain_type:
+                data[key] = value
+                continue
+        value = field.serialize(name, obj, accessor=schema.get_attribute)
+        if value is not missing:
+            data[key] = value
+    return data
+
+
+@cache
+def get_safe_user_schema() -> Schema:
+    """
+    The SafeUserSchema instance, raises a RegistryError if it isn't in the marshmallow class registry.
+
+    SafeUserSchema is not always available in the marshmallow class registry
+    It is primarily used in the Flask API as a kluge for responses that are not
+    using custom marshmallow schemas.
+    """
+    return marshmallow.class_registry.get_class("SafeUserSchema")()
+
 from sqlalchemy_continuum import make_versioned
 
 # init sqlalchemy_continuum
 make_versioned(user_cls=None)
 
+USER_SUMMARIES_KEY = "user_summaries"
+
+
+class AuditSnapshot(enum.Enum):
+    """How much of an object is stored in the event_details of its OpsDBHistory records."""
+
+    SLIM = "slim"  # to_slim_dict (id and display_name)
+    COLUMNS = "columns"  # the column values and display_name
+    FULL = "full"  # to_dict
+
+
+class AuditProfile(NamedTuple):
+    """
+    How the changes of a model are tracked in OpsDBHistory (set as __audit__ on the model).
+
+    columns: the columns whose changes are tracked (None for all of them)
+    snapshot: how much of the object is stored as the event_details
+    """
+
+    columns: Optional[tuple[str, ...]] = None
+    snapshot: AuditSnapshot = AuditSnapshot.FULL
+
+
 class BaseModel(Base):
     __versioned__ = {}
+    __audit__ = AuditProfile()
     __abstract__ = True
 
     created_by: Mapped[Optional[int]] = mapped_column(
@@ -139,32 +239,61 @@ class BaseModel(Base):
             raise MarshmallowError(
                 f"Model {self.__class__.__name__} does not have a marshmallow schema"
             )
-        schema = self.__marshmallow__()
-        data = schema.dump(self)
+        data = dump(self.__marshmallow__, self)
         data["display_name"] = self.display_name
 
-        # SafeUserSchema is not always available in the marshmallow class registry
-        # It is primarily used in the Flask API as a kluge for responses that are not
-        # using custom marshmallow schemas.
         try:
-            _safe_user_schema_class = marshmallow.class_registry.get_class("SafeUserSchema")
-
-            user_schema = _safe_user_schema_class()
-            data["created_by_user"] = (
-                user_schema.dump(self.created_by_user)
-                if self.created_by_user
-                else None
-            )
-            data["updated_by_user"] = (
-                user_schema.dump(self.updated_by_user)
-                if self.updated_by_user
-                else None
-            )
+            get_safe_user_schema()
+            data["created_by_user"] = self.get_user_summary(self.created_by)
+            data["updated_by_user"] = self.get_user_summary(self.updated_by)
         except marshmallow.exceptions.RegistryError:
             logger.debug("SafeUserSchema not found in marshmallow class registry")
 
         return data
 
+    def get_user_summary(self, user_id: Optional[int]) -> Optional[dict]:
+        """
+        The SafeUserSchema dump of the user, read from the user summaries cached in the session
+        of the instance (see load_user_summaries).
+        """
+        session = object_session(self)
+        if not session or not user_id:
+            return None
+        user_summaries = session.info.setdefault(USER_SUMMARIES_KEY, {})
+        if user_id not in user_summaries:
+            self.load_user_summaries(session, [self])
+        return user_summaries.get(user_id)
+
+    @classmethod
+    def load_user_summaries(cls, session: Session, objs: Iterable["BaseModel"]) -> None:
+        """
+        Load the users that created or updated the objects with one query and cache their
+        SafeUserSchema dumps in the session, so to_dict doesn't look up and dump the users
+        for each object.
+
+        The cache lives as long as the session (i.e. the request in the API) and is cleared
+        when a user is flushed.
+        """
+        from models import User
+
+        user_summaries = session.info.setdefault(USER_SUMMARIES_KEY, {})
+        user_ids = {
+            user_id
+            for obj in objs
+            for user_id in (obj.created_by, obj.updated_by)
+            if user_id and user_id not in user_summaries
+        }
+        if not user_ids:
+            return
+
+        user_schema = get_safe_user_schema()
+        users = session.scalars(select(User).where(User.id.in_(user_ids))).all()
+        user_summaries.update({user.id: user_schema.dump(user) for user in users})
+        # cache the ids of missing users too so they aren't looked up again
+        user_summaries.update(
+            {user_id: None for user_id in user_ids if user_id not in user_summaries}
+        )
+
     @property
     def created_by_user(self):
         from models import User
@@ -207,3 +336,14 @@ class BaseModel(Base):
             "display_name": self.display_name,
         }
         return cast(dict[str, Any], d)
+
+
+@event.listens_for(Session, "after_flush")
+def discard_user_summaries(session, flush_context):
+    from models import User
+
+    if any(
+        isinstance(obj, User)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        session.info.pop(USER_SUMMARIES_KEY, None)
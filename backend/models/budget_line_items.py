@@ -3,17 +3,31 @@
 import decimal
 from datetime import date
 from enum import Enum, auto
-from typing import Optional
-
-from sqlalchemy import Boolean, Date, ForeignKey, Integer, Numeric, Sequence, String, Text, case, select
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    Boolean,
+    Date,
+    ForeignKey,
+    Integer,
+    Numeric,
+    Sequence,
+    String,
+    Text,
+    case,
+    cast,
+    event,
+    extract,
+    select,
+)
 from sqlalchemy.dialects.postgresql import ENUM
-from sqlalchemy.orm import Mapped, mapped_column, object_session, relationship
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Mapped, Session, mapped_column, object_session, relationship
 from typing_extensions import Any, override
 
 from models import CAN
 from models.base import BaseModel
 from models.change_requests import BudgetLineItemChangeRequest, ChangeRequestStatus
-from models.portfolios import Portfolio
 
 
 class ModType(Enum):
@@ -90,29 +104,32 @@ class BudgetLineItem(BaseModel):
     def display_name(self):
         return f"BL {self.id}"
 
-    @property
+    @hybrid_property
     def portfolio_id(self):
-        return object_session(self).scalar(
-            select(Portfolio.id)
-            .join(CAN, Portfolio.id == CAN.portfolio_id)
-            .join(self.__class__, self.can_id == CAN.id)
-            .where(self.__class__.id == self.id)
+        return self.can.portfolio_id if self.can else None
+
+    @portfolio_id.expression
+    def portfolio_id(cls):
+        return (
+            select(CAN.portfolio_id)
+            .where(CAN.id == cls.can_id)
+            .correlate_except(CAN)
+            .scalar_subquery()
         )
 
-    @property
+    @hybrid_property
     def fiscal_year(self):
-        date_needed = self.date_needed or None
-        month = date_needed.month if date_needed else -1
-        year = date_needed.year if date_needed else -1
-        return object_session(self).scalar(
-            select(
-                case(
-                    (month >= 10, year + 1),
-                    (month >= 0 and month < 10, year),
-                    else_=None,
-                )
-            )
-        )
+        if not self.date_needed:
+            return None
+        if self.date_needed.month >= 10:
+            return self.date_needed.year + 1
+        return self.date_needed.year
+
+    @fiscal_year.expression
+    def fiscal_year(cls):
+        month = extract("month", cls.date_needed)
+        year = cast(extract("year", cls.date_needed), Integer)
+        return case((month >= 10, year + 1), else_=year)
 
     @property
     def team_members(self):
@@ -120,6 +137,9 @@ class BudgetLineItem(BaseModel):
 
     @property
     def change_requests_in_review(self):
+        # use the change requests bulk loaded by load_change_requests_in_review (if any)
+        if "_change_requests_in_review" in self.__dict__:
+            return self._change_requests_in_review
         if object_session(self) is None:
             return None
         results = (
@@ -140,6 +160,40 @@ class BudgetLineItem(BaseModel):
     def in_review(self):
         return self.change_requests_in_review is not None
 
+    @classmethod
+    def load_change_requests_in_review(
+        cls, session: Session, budget_line_items: Iterable["BudgetLineItem"]
+    ) -> None:
+        """
+        Bulk load the IN_REVIEW change requests of the given budget line items with a single query
+        and attach them to the instances, so change_requests_in_review and in_review don't each
+        issue a query per budget line item when a collection is serialized.
+
+        The loaded change requests are discarded when the instance is expired (e.g. on commit).
+        """
+        budget_line_items = [bli for bli in budget_line_items if bli.id is not None]
+        if not budget_line_items:
+            return
+
+        change_requests_by_bli_id: dict[int, list[BudgetLineItemChangeRequest]] = {}
+        change_requests = session.scalars(
+            select(BudgetLineItemChangeRequest)
+            .where(
+                BudgetLineItemChangeRequest.budget_line_item_id.in_(
+                    {bli.id for bli in budget_line_items}
+                )
+            )
+            .where(BudgetLineItemChangeRequest.status == ChangeRequestStatus.IN_REVIEW)
+            .order_by(BudgetLineItemChangeRequest.id)
+        )
+        for change_request in change_requests:
+            change_requests_by_bli_id.setdefault(
+                change_request.budget_line_item_id, []
+            ).append(change_request)
+
+        for bli in budget_line_items:
+            bli._change_requests_in_review = change_requests_by_bli_id.get(bli.id)
+
     @property
     def project(self) -> Optional["Project"]:
         return self.agreement.project if self.agreement else None
@@ -154,3 +208,10 @@ class BudgetLineItem(BaseModel):
                 acting_change_request_id=self.acting_change_request_id,
             )
         return d
+
+
+@event.listens_for(BudgetLineItem, "expire")
+def discard_loaded_change_requests_in_review(target, attrs):
+    # target is None when the instance has already been garbage collected
+    if target is not None:
+        target.__dict__.pop("_change_requests_in_review", None)
@@ -9,7 +9,7 @@ from sqlalchemy import ForeignKey, Integer, Sequence, UniqueConstraint
 from sqlalchemy.dialects.postgresql import ENUM
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from models.base import BaseModel
+from models.base import AuditProfile, AuditSnapshot, BaseModel
 from models.portfolios import Portfolio
 
 
@@ -47,6 +47,7 @@ class CAN(BaseModel):
     """
 
     __tablename__ = "can"
+    __audit__ = AuditProfile(snapshot=AuditSnapshot.COLUMNS)
 
     id: Mapped[int] = BaseModel.get_pk_column(
         sequence=Sequence("can_id_seq", start=500, increment=1)
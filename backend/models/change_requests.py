@@ -71,6 +71,7 @@ class AgreementChangeRequest(ChangeRequest):
 
     __mapper_args__ = {
         "polymorphic_identity": ChangeRequestType.AGREEMENT_CHANGE_REQUEST,
+        "polymorphic_load": "inline",
     }
 
     budget_field_names = ["procurement_shop_id"]
@@ -95,6 +96,7 @@ class BudgetLineItemChangeRequest(AgreementChangeRequest):
 
     __mapper_args__ = {
         "polymorphic_identity": ChangeRequestType.BUDGET_LINE_ITEM_CHANGE_REQUEST,
+        "polymorphic_load": "inline",
     }
 
     budget_field_names = ["amount", "can_id", "date_needed"]
@@ -47,4 +47,5 @@ class ChangeRequestNotification(Notification):
 
     __mapper_args__ = {
         "polymorphic_identity": NotificationType.CHANGE_REQUEST_NOTIFICATION,
+        "polymorphic_load": "inline",
     }
@@ -4,7 +4,7 @@ from enum import Enum
 
 from sqlalchemy import Column, ForeignKey, Integer, String, Text
 from sqlalchemy.dialects.postgresql import ENUM
-from sqlalchemy.orm import Mapped, mapped_column, object_session, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models.base import BaseModel
 
@@ -87,6 +87,7 @@ class Portfolio(BaseModel):
     )
 
     division_id = Column(Integer, ForeignKey("division.id"), nullable=False)
+    division = relationship(Division, viewonly=True)
     urls = relationship("PortfolioUrl")
     description = Column(Text)
     team_leaders = relationship(
@@ -100,7 +101,3 @@ class Portfolio(BaseModel):
     @BaseModel.display_name.getter
     def display_name(self):
         return self.name
-
-    @property
-    def division(self):
-        return object_session(self).get(Division, self.division_id)
@@ -1,20 +1,26 @@
 import json
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
 from collections import namedtuple
 from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
 from types import NoneType
+from typing import Iterable, Optional
 
 from loguru import logger
-from sqlalchemy import inspect
+from sqlalchemy import Engine, event, insert, inspect
 from sqlalchemy.cyextension.collections import IdentitySet
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, SessionTransaction
 from sqlalchemy.orm.attributes import get_history
 
 from models import (
     Agreement,
     AgreementChangeRequest,
     AgreementOpsDbHistory,
+    AuditSnapshot,
     BaseModel,
     BudgetLineItem,
     OpsDBHistory,
@@ -25,6 +31,17 @@ from models import (
 
 DbRecordAudit = namedtuple("DbRecordAudit", "row_key changes")
 
+DbHistoryRecord = namedtuple(
+    "DbHistoryRecord",
+    "event_type class_name row_key changes created_by created_on event_details agreement_id",
+)
+
+# not interested in tracking these
+UNTRACKED_CLASSES = (OpsEvent, OpsDBHistory, AgreementOpsDbHistory)
+
+# the latest OpsDBHistory of each object in the session's transaction by (class name, row key)
+TRACKED_DB_HISTORY_KEY = "tracked_db_history"
+
 
 def convert_for_jsonb(value):
     if isinstance(value, (str, bool, int, float, NoneType)):
@@ -62,9 +79,15 @@ def build_audit(obj, event_type: OpsDBHistoryType) -> DbRecordAudit:  # noqa: C9
     changes = {}
 
     mapper = obj.__mapper__
+    audited_keys = obj.__audit__.columns
 
     # collect changes in column values
-    auditable_columns = list(filter(lambda c: c.key in obj.__dict__, mapper.columns))
+    auditable_columns = list(
+        filter(
+            lambda c: c.key in obj.__dict__ and (audited_keys is None or c.key in audited_keys),
+            mapper.columns,
+        )
+    )
     for col in auditable_columns:
         key = col.key
         hist = get_history(obj, key)
@@ -91,7 +114,9 @@ def build_audit(obj, event_type: OpsDBHistoryType) -> DbRecordAudit:  # noqa: C9
     # and only include them on the editable side
     auditable_relationships = list(
         filter(
-            lambda rel: rel.secondary is not None and not rel.viewonly,
+            lambda rel: rel.secondary is not None
+            and not rel.viewonly
+            and (audited_keys is None or rel.key in audited_keys),
             mapper.relationships,
         )
     )
@@ -112,16 +137,63 @@ def build_audit(obj, event_type: OpsDBHistoryType) -> DbRecordAudit:  # noqa: C9
     return DbRecordAudit(row_key, changes)
 
 
+def build_snapshot(obj) -> dict:
+    """The event_details of an OpsDBHistory record of the object, as set by the snapshot of its audit profile."""
+    snapshot = obj.__audit__.snapshot
+    if snapshot == AuditSnapshot.SLIM:
+        return obj.to_slim_dict()
+    if snapshot == AuditSnapshot.COLUMNS:
+        d = {attr.key: convert_for_jsonb(getattr(obj, attr.key)) for attr in obj.__mapper__.column_attrs}
+        d["display_name"] = obj.display_name
+        return d
+    return obj.to_dict()
+
+
+def can_merge_db_history(event_type: OpsDBHistoryType, later_event_type: OpsDBHistoryType) -> bool:
+    return (
+        event_type in (OpsDBHistoryType.NEW, OpsDBHistoryType.UPDATED) and later_event_type == OpsDBHistoryType.UPDATED
+    )
+
+
+def merge_db_history_changes(event_type: OpsDBHistoryType, changes: dict, later_changes: dict) -> dict:
+    """
+    Combine the changes of an object flushed several times in a transaction into the changes of one
+    record (of event_type), keeping the first old value and the last new value of each column.
+    """
+    merged = dict(changes)
+    for key, change in later_changes.items():
+        earlier_change = merged.get(key, {})
+        if "collection_of" in change:
+            change = dict(change)
+            for collection_key in ("added", "deleted"):
+                if collection_key in change:
+                    change[collection_key] = earlier_change.get(collection_key, []) + change[collection_key]
+        elif "old" in earlier_change:
+            change = {**change, "old": earlier_change["old"]}
+        if event_type == OpsDBHistoryType.NEW:
+            change = {k: v for k, v in change.items() if k not in ("old", "deleted")}
+        merged[key] = change
+    return merged
+
+
 def track_db_history_before(session: Session, user: User | None):
-    session.add_all(add_obj_to_db_history(session.deleted, OpsDBHistoryType.DELETED, user))
-    session.add_all(add_obj_to_db_history(session.dirty, OpsDBHistoryType.UPDATED, user))
+    tracked = session.info.setdefault(TRACKED_DB_HISTORY_KEY, {})
+    session.add_all(add_obj_to_db_history(session.deleted, OpsDBHistoryType.DELETED, user, tracked))
+    session.add_all(add_obj_to_db_history(session.dirty, OpsDBHistoryType.UPDATED, user, tracked))
 
 
 def track_db_history_after(session: Session, user: User | None):
-    session.add_all(add_obj_to_db_history(session.new, OpsDBHistoryType.NEW, user))
+    tracked = session.info.setdefault(TRACKED_DB_HISTORY_KEY, {})
+    session.add_all(add_obj_to_db_history(session.new, OpsDBHistoryType.NEW, user, tracked))
+
 
+@event.listens_for(Session, "after_transaction_end")
+def discard_tracked_db_history(session: Session, transaction: SessionTransaction):
+    if transaction.parent is None:
+        session.info.pop(TRACKED_DB_HISTORY_KEY, None)
 
-def track_db_history_catch_errors(exception_context):
+
+def track_db_history_catch_errors(exception_context, engine: Optional[Engine] = None):
     # Avoid JSON serialization error with exception_context.parameters by safely converting first
     # Otherwise, if there are objects in exception_context.parameters that SQLAlchemy can't convert to JSON
     # then it can spawn another error which comes back to here which spawns another error, etc
@@ -137,17 +209,20 @@ def track_db_history_catch_errors(exception_context):
             "sqlalchemy_exception": f"{exception_context.sqlalchemy_exception}",
         },
     )
-    with Session(exception_context.engine) as session:
+    # the error is written with the engine (pool) for audit records if there is one
+    with Session(engine or exception_context.engine) as session:
         session.add(ops_db)
         session.commit()
         logger.error(f"SQLAlchemy error added to {OpsDBHistory.__tablename__} with id {ops_db.id}")
 
 
-def add_obj_to_db_history(objs: IdentitySet, event_type: OpsDBHistoryType, user: User | None):
+def add_obj_to_db_history(
+    objs: IdentitySet, event_type: OpsDBHistoryType, user: User | None, tracked: Optional[dict] = None
+):
     result = []
 
     for obj in objs:
-        if not isinstance(obj, (OpsEvent, OpsDBHistory, AgreementOpsDbHistory)):  # not interested in tracking these
+        if not isinstance(obj, UNTRACKED_CLASSES):
             db_audit = build_audit(obj, event_type)
             if event_type == OpsDBHistoryType.UPDATED and not db_audit.changes:
                 logger.info(
@@ -156,14 +231,24 @@ def add_obj_to_db_history(objs: IdentitySet, event_type: OpsDBHistoryType, user:
                 )
                 continue
 
+            key = (obj.__class__.__name__, db_audit.row_key)
+            earlier = tracked.get(key) if tracked is not None else None
+            if earlier is not None and can_merge_db_history(earlier.event_type, event_type):
+                # the object was already flushed in this transaction, update its record instead of adding another
+                earlier.changes = merge_db_history_changes(earlier.event_type, earlier.changes, db_audit.changes)
+                earlier.event_details = build_snapshot(obj)
+                continue
+
             ops_db = OpsDBHistory(
                 event_type=event_type,
-                event_details=obj.to_dict(),
+                event_details=build_snapshot(obj),
                 created_by=user.id if user else None,
                 class_name=obj.__class__.__name__,
                 row_key=db_audit.row_key,
                 changes=db_audit.changes,
             )
+            if tracked is not None:
+                tracked[key] = ops_db
 
             result.append(ops_db)
 
@@ -172,18 +257,208 @@ def add_obj_to_db_history(objs: IdentitySet, event_type: OpsDBHistoryType, user:
     return result
 
 
+def get_history_agreement_id(obj) -> Optional[int]:
+    if isinstance(obj, Agreement):
+        return obj.id
+    if isinstance(obj, (BudgetLineItem, AgreementChangeRequest)):
+        return obj.agreement_id
+    return None
+
+
 def create_agreement_history_relations(obj, ops_db) -> list[AgreementOpsDbHistory]:
     objs = []
-    if isinstance(obj, Agreement):
+    if isinstance(obj, (Agreement, BudgetLineItem, AgreementChangeRequest)):
         agreement_ops_db_history = AgreementOpsDbHistory(
-            agreement_id=obj.id,
-            ops_db_history=ops_db,
-        )
-        objs.append(agreement_ops_db_history)
-    elif isinstance(obj, (BudgetLineItem, AgreementChangeRequest)):
-        agreement_ops_db_history = AgreementOpsDbHistory(
-            agreement_id=obj.agreement_id,
+            agreement_id=get_history_agreement_id(obj),
             ops_db_history=ops_db,
         )
         objs.append(agreement_ops_db_history)
     return objs
+
+
+def build_db_history_record(obj, event_type: OpsDBHistoryType, user: User | None) -> Optional[DbHistoryRecord]:
+    """
+    Capture the changes and the snapshot (event_details) of the object needed to write its OpsDBHistory
+    after the commit, while the object has the state of the change.
+    """
+    db_audit = build_audit(obj, event_type)
+    if event_type == OpsDBHistoryType.UPDATED and not db_audit.changes:
+        logger.info(
+            f"No changes found for {obj.__class__.__name__} with row_key={db_audit.row_key}, "
+            f"an OpsDBHistory record will not be created for this UPDATED event."
+        )
+        return None
+
+    return DbHistoryRecord(
+        event_type=event_type,
+        class_name=obj.__class__.__name__,
+        row_key=db_audit.row_key,
+        changes=db_audit.changes,
+        created_by=user.id if user else None,
+        created_on=datetime.now(),
+        event_details=build_snapshot(obj),
+        agreement_id=get_history_agreement_id(obj),
+    )
+
+
+class BatchWriter(ABC):
+    """
+    Writes the records put on a bounded queue in batches from a background thread.
+
+    A batch is written once it has batch_size records or flush_interval seconds after its
+    first record was queued. Putting a record blocks while the queue is full. close() writes
+    everything queued before stopping the thread.
+    """
+
+    name = "batch-writer"
+
+    def __init__(self, max_queue_size: int = 10000, batch_size: int = 500, flush_interval: float = 1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def put(self, record):
+        self._queue.put(record)
+
+    def flush(self):
+        """Wait until everything queued so far is written."""
+        self._queue.join()
+
+    def close(self):
+        """Write everything queued and stop the background thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        stopped = False
+        while not stopped:
+            batch = []
+            deadline = None
+            while len(batch) < self.batch_size:
+                try:
+                    timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                    record = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if record is None:
+                    self._queue.task_done()
+                    stopped = True
+                    break
+                batch.append(record)
+                deadline = deadline or time.monotonic() + self.flush_interval
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception:
+                    logger.exception(f"{self.name} failed to write {len(batch)} records")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+
+    @abstractmethod
+    def _write(self, records: list):
+        """Write a batch of records (called from the background thread)."""
+
+
+class DbHistoryWriter(BatchWriter):
+    """
+    The audit pipeline mode of OpsDBHistory tracking.
+
+    Instead of adding the OpsDBHistory (and AgreementOpsDbHistory) records to the transaction
+    being committed, only the changes and the snapshots are captured when the session flushes/commits.
+    Once the transaction is committed they are queued and a background thread inserts the records
+    in batches. The records of rolled back transactions are discarded.
+
+    The queue is bounded, committing blocks while it is full.
+    """
+
+    name = "db-history-writer"
+
+    PENDING_KEY = "pending_db_history"
+    # the index of the latest pending record of each object by (class name, row key)
+    PENDING_INDEX_KEY = "pending_db_history_index"
+
+    def __init__(
+        self,
+        engine: Engine,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        self.engine = engine
+        super().__init__(max_queue_size, batch_size, flush_interval)
+
+    def listen(self, session, user: User | None):
+        """Track the history of the objects committed by the session (a Session, sessionmaker or scoped_session)."""
+        event.listen(session, "before_commit", lambda s: self.track_before_commit(s, user))
+        event.listen(session, "after_flush", lambda s, flush_context: self.track_after_flush(s, user))
+        event.listen(session, "after_commit", self.enqueue_pending)
+        event.listen(session, "after_rollback", self.discard_pending)
+
+    def track_before_commit(self, session: Session, user: User | None):
+        self._add_pending(session, session.deleted, OpsDBHistoryType.DELETED, user)
+        self._add_pending(session, session.dirty, OpsDBHistoryType.UPDATED, user)
+
+    def track_after_flush(self, session: Session, user: User | None):
+        self._add_pending(session, session.new, OpsDBHistoryType.NEW, user)
+
+    def enqueue_pending(self, session: Session):
+        session.info.pop(self.PENDING_INDEX_KEY, None)
+        for record in session.info.pop(self.PENDING_KEY, []):
+            self.put(record)
+
+    def discard_pending(self, session: Session):
+        session.info.pop(self.PENDING_KEY, None)
+        session.info.pop(self.PENDING_INDEX_KEY, None)
+
+    def _add_pending(self, session: Session, objs: Iterable, event_type: OpsDBHistoryType, user: User | None):
+        # loading expired attributes mustn't flush (e.g. the deleted objects) before the changes are captured
+        with session.no_autoflush:
+            records = [
+                build_db_history_record(obj, event_type, user) for obj in objs if not isinstance(obj, UNTRACKED_CLASSES)
+            ]
+        pending = session.info.setdefault(self.PENDING_KEY, [])
+        pending_index = session.info.setdefault(self.PENDING_INDEX_KEY, {})
+        for record in records:
+            if not record:
+                continue
+            key = (record.class_name, record.row_key)
+            index = pending_index.get(key)
+            if index is not None and can_merge_db_history(pending[index].event_type, record.event_type):
+                earlier = pending[index]
+                changes = merge_db_history_changes(earlier.event_type, earlier.changes, record.changes)
+                pending[index] = earlier._replace(changes=changes, event_details=record.event_details)
+            else:
+                pending_index[key] = len(pending)
+                pending.append(record)
+
+    def _write(self, records: list[DbHistoryRecord]):
+        with Session(self.engine) as session:
+            rows = [
+                {
+                    "event_type": record.event_type,
+                    "event_details": record.event_details,
+                    "created_by": record.created_by,
+                    "created_on": record.created_on,
+                    "class_name": record.class_name,
+                    "row_key": record.row_key,
+                    "changes": record.changes,
+                }
+                for record in records
+            ]
+
+            history_ids = session.scalars(
+                insert(OpsDBHistory).returning(OpsDBHistory.id, sort_by_parameter_order=True), rows
+            ).all()
+            agreement_rows = [
+                {"agreement_id": record.agreement_id, "ops_db_history_id": history_id}
+                for record, history_id in zip(records, history_ids)
+                if record.agreement_id is not None
+            ]
+            if agreement_rows:
+                session.execute(insert(AgreementOpsDbHistory), agreement_rows)
+            session.commit()
+        logger.debug(f"Wrote {len(records)} {OpsDBHistory.__tablename__} records")
@@ -1,26 +1,28 @@
+import atexit
 import os
-import sys
 import time
 
 from authlib.integrations.flask_client import OAuth
 from flask import Blueprint, Flask, current_app, request
 from flask_cors import CORS
 from flask_jwt_extended import current_user, verify_jwt_in_request
-from loguru import logger
 from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from models import OpsEventType
-from models.utils import track_db_history_after, track_db_history_before, track_db_history_catch_errors
+from models.utils import DbHistoryWriter, track_db_history_after, track_db_history_before, track_db_history_catch_errors
 from ops_api.ops.auth.decorators import check_user_session_function
 from ops_api.ops.auth.extension_config import jwtMgr
-from ops_api.ops.db import handle_create_update_by_attrs, init_db
+from ops_api.ops.db import create_db_engine, get_pool_options, handle_create_update_by_attrs, init_db
 from ops_api.ops.error_handlers import register_error_handlers
 from ops_api.ops.home_page.views import home
 from ops_api.ops.services.can_messages import can_history_trigger
 from ops_api.ops.services.message_bus import MessageBus
 from ops_api.ops.urls import register_api
 from ops_api.ops.utils.core import is_fake_user, is_unit_test
+from ops_api.ops.utils.events import OpsEventWriter
+from ops_api.ops.utils.pagination import PAGINATION_HEADERS
+from ops_api.ops.utils.request_logging import configure_logging, log_request, log_response, track_db_time
 
 # Set the timezone to UTC
 os.environ["TZ"] = "UTC"
@@ -28,20 +30,6 @@ time.tzset()
 
 
 def create_app() -> Flask:  # noqa: C901
-    from ops_api.ops.utils.core import is_unit_test
-
-    log_level = "INFO" if not is_unit_test() else "DEBUG"
-
-    # logger configuration
-    format = (
-        "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-        "<level>{level: <8}</level> | "
-        "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | "
-        "<level>{message}</level>"
-    )
-    logger.add(sys.stdout, format=format, level=log_level)
-    logger.add(sys.stderr, format=format, level=log_level)
-
     app = Flask(__name__)
 
     app.config.from_object("ops_api.ops.environment.default_settings")
@@ -49,6 +37,8 @@ def create_app() -> Flask:  # noqa: C901
         app.config.from_envvar("OPS_CONFIG")
     app.config.from_prefixed_env()  # type: ignore [attr-defined]
 
+    configure_logging(app)
+
     # fall back for pytest to use
     app.config.setdefault(
         "SQLALCHEMY_DATABASE_URI",
@@ -61,6 +51,7 @@ def create_app() -> Flask:  # noqa: C901
         r"/api/*": {
             "origins": app.config.get("OPS_FRONTEND_URL"),
             "supports_credentials": True,
+            "expose_headers": PAGINATION_HEADERS,
         },
         r"/auth/*": {
             "origins": app.config.get("OPS_FRONTEND_URL"),
@@ -83,9 +74,21 @@ def create_app() -> Flask:  # noqa: C901
     oauth = OAuth()
     oauth.init_app(app)
 
-    db_session, engine = init_db(app.config.get("SQLALCHEMY_DATABASE_URI"))
+    # the (optional) read replica used by the GET requests
+    replica_uri = app.config.get("SQLALCHEMY_REPLICA_DATABASE_URI")
+    app.replica_engine = create_db_engine(replica_uri, get_pool_options(app.config)) if replica_uri else None
+    db_session, engine = init_db(
+        app.config.get("SQLALCHEMY_DATABASE_URI"), get_pool_options(app.config), app.replica_engine
+    )
     app.db_session = db_session
     app.engine = engine
+    # a separate (small) pool for writing the audit records (OpsDBHistory, OpsEvent) outside the request transaction
+    app.audit_engine = create_db_engine(
+        app.config.get("SQLALCHEMY_DATABASE_URI"), get_pool_options(app.config, "AUDIT_")
+    )
+    track_db_time(engine)
+    if app.replica_engine is not None:
+        track_db_time(app.replica_engine)
 
     @app.teardown_appcontext
     def shutdown_session(exception=None):
@@ -97,22 +100,45 @@ def create_app() -> Flask:  # noqa: C901
             request.message_bus.handle()
             request.message_bus.cleanup()
 
-    @event.listens_for(db_session, "before_commit")
-    def receive_before_commit(session: Session):
-        track_db_history_before(session, current_user)
-
-    @event.listens_for(db_session, "after_flush")
-    def receive_after_flush(session: Session, flush_context):
-        track_db_history_after(session, current_user)
+    if app.config.get("AUDIT_PIPELINE_MODE") == "async":
+        app.db_history_writer = DbHistoryWriter(
+            app.audit_engine,
+            max_queue_size=app.config.get("AUDIT_QUEUE_SIZE", 10000),
+            batch_size=app.config.get("AUDIT_BATCH_SIZE", 500),
+            flush_interval=app.config.get("AUDIT_FLUSH_INTERVAL", 1.0),
+        )
+        app.db_history_writer.listen(db_session, current_user)
+        atexit.register(app.db_history_writer.close)
+    else:
+
+        @event.listens_for(db_session, "before_commit")
+        def receive_before_commit(session: Session):
+            track_db_history_before(session, current_user)
+
+        @event.listens_for(db_session, "after_flush")
+        def receive_after_flush(session: Session, flush_context):
+            track_db_history_after(session, current_user)
+
+    if app.config.get("OPS_EVENT_PIPELINE_MODE") == "async":
+        app.ops_event_writer = OpsEventWriter(
+            app.audit_engine,
+            max_queue_size=app.config.get("OPS_EVENT_QUEUE_SIZE", 10000),
+            batch_size=app.config.get("OPS_EVENT_BATCH_SIZE", 500),
+            flush_interval=app.config.get("OPS_EVENT_FLUSH_INTERVAL", 1.0),
+        )
+        atexit.register(app.ops_event_writer.close)
 
     @event.listens_for(engine, "handle_error")
     def receive_error(exception_context):
-        track_db_history_catch_errors(exception_context)
+        track_db_history_catch_errors(exception_context, app.audit_engine)
 
     @event.listens_for(db_session, "before_commit")
     def update_create_update_by(session: Session):
         handle_create_update_by_attrs(session)
 
+    # the subscriptions to the (global) message bus signals are registered once
+    MessageBus().subscribe(OpsEventType.CREATE_NEW_CAN, can_history_trigger)
+
     @app.before_request
     def before_request():
         before_request_function(app, request)
@@ -127,50 +153,30 @@ def create_app() -> Flask:  # noqa: C901
     return app
 
 
-def log_response(response):
-    if request.url != request.url_root:
-        response_data = {
-            "method": request.method,
-            "url": request.url,
-            "request_headers": request.headers,
-            "status_code": response.status_code,
-            "json": response.get_data(as_text=True),
-            "response_headers": response.headers,
-        }
-        logger.info(f"Response: {response_data}")
-
-
-def log_request():
-    request_data = {
-        "method": request.method,
-        "url": request.url,
-        "json": request.get_json(silent=True),
-        "args": request.args,
-        "headers": request.headers,
-    }
-    logger.info(f"Request: {request_data}")
+# endpoints that can be requested without a valid user session
+USER_SESSION_EXEMPT_ENDPOINTS = frozenset(
+    [
+        "auth.login_post",
+        "auth.logout_post",
+        "auth.refresh_post",
+        "home.show",
+        "api.health-check",
+    ]
+)
+USER_SESSION_EXEMPT_METHODS = frozenset(["OPTIONS", "HEAD"])
 
 
 def before_request_function(app: Flask, request: request):
     log_request()
-    # check that the UserSession is valid
-    all_valid_endpoints = [
-        rule.endpoint
-        for rule in app.url_map.iter_rules()
-        if rule.endpoint
-        not in [
-            "auth.login_post",
-            "auth.logout_post",
-            "auth.refresh_post",
-            "home.show",
-            "api.health-check",
-        ]
-    ]
-    if request.endpoint in all_valid_endpoints and request.method not in ["OPTIONS", "HEAD"]:
+    # check that the UserSession is valid (request.endpoint is None when no route matches the request)
+    if (
+        request.endpoint is not None
+        and request.endpoint not in USER_SESSION_EXEMPT_ENDPOINTS
+        and request.method not in USER_SESSION_EXEMPT_METHODS
+    ):
         verify_jwt_in_request()  # needed to load current_user
         if not is_unit_test() and not is_fake_user(app, current_user):
             current_app.logger.info(f"Checking user session for {current_user.oidc_id}")
             check_user_session_function(current_user)
 
     request.message_bus = MessageBus()
-    request.message_bus.subscribe(OpsEventType.CREATE_NEW_CAN, can_history_trigger)
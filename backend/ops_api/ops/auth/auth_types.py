@@ -19,6 +19,7 @@ class Permission(Enum):
     CHANGE_REQUEST_REVIEW = auto()
     DIVISION = auto()
     HISTORY = auto()
+    METRICS = auto()
     NOTIFICATION = auto()
     PACKAGE = auto()
     PORTFOLIO = auto()
@@ -1,27 +1,113 @@
+import time
+from contextlib import suppress
+from typing import Optional
+
 from flask import current_app
-from flask_jwt_extended import get_jwt_identity
-from sqlalchemy import select
+from flask_jwt_extended import get_current_user, get_jwt_identity
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
 
-from models.users import User
+from models.users import Role, User, UserRole
 from ops_api.ops.auth.auth_types import Permission, PermissionType
 from ops_api.ops.auth.authorization_gateway import AuthorizationGateway
 
+# the oidc_ids of the users whose permissions are invalidated when the session commits (None for all users)
+INVALIDATED_PERMISSIONS_KEY = "invalidated_user_permissions"
+
+
+class UserPermissionsCache:
+    """
+    The permissions of the users (by oidc_id) compiled from their roles, cached in the process.
+
+    Entries expire after PERMISSIONS_CACHE_TTL seconds (0 disables the cache) and are invalidated
+    when users, roles or user roles are committed in this process. Permissions read before an invalidation
+    (the generation) aren't cached.
+    """
+
+    def __init__(self):
+        self._permissions: dict[str, tuple[float, frozenset[str]]] = {}
+        self.generation = 0
+
+    def get(self, oidc_id: str, ttl: float) -> Optional[frozenset[str]]:
+        cached = self._permissions.get(str(oidc_id))
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        return None
+
+    def set(self, oidc_id: str, permissions: frozenset[str], generation: int) -> None:
+        if generation != self.generation:
+            return
+        self._permissions[str(oidc_id)] = (time.monotonic(), permissions)
+
+    def invalidate(self, oidc_id: Optional[str] = None) -> None:
+        """Invalidate the permissions of the user, or of all users if no oidc_id is given."""
+        self.generation += 1
+        if oidc_id is None:
+            self._permissions.clear()
+        else:
+            self._permissions.pop(str(oidc_id), None)
+
+
+user_permissions_cache = UserPermissionsCache()
+
+
+def get_user_permissions(oidc_id: str) -> frozenset[str]:
+    ttl = current_app.config.get("PERMISSIONS_CACHE_TTL", 60)
+    permissions = user_permissions_cache.get(oidc_id, ttl)
+    if permissions is None:
+        generation = user_permissions_cache.generation
+        user = _get_user(oidc_id)
+        permissions = frozenset(p for role in user.roles for p in role.permissions) if user else frozenset()
+        user_permissions_cache.set(oidc_id, permissions, generation)
+    return permissions
+
+
+def _get_user(oidc_id: str) -> Optional[User]:
+    # the user of the request is already loaded by the JWT user lookup
+    with suppress(RuntimeError):
+        user = get_current_user()
+        if user and str(user.oidc_id) == str(oidc_id):
+            return user
+
+    stmt = select(User).where(User.oidc_id == oidc_id)
+    users = current_app.db_session.execute(stmt).all()
+    return users[0][0] if users and len(users) == 1 else None
+
+
+@event.listens_for(Session, "after_flush")
+def collect_invalidated_user_permissions(session: Session, flush_context) -> None:
+    # the cache is only invalidated on commit, a concurrent request could cache the old permissions otherwise
+    oidc_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User) and "oidc_id" in obj.__dict__ and not inspect(obj).attrs.oidc_id.history.deleted:
+            oidc_ids.add(obj.oidc_id)
+        elif isinstance(obj, (User, Role, UserRole)):
+            oidc_ids.add(None)
+    if oidc_ids:
+        session.info.setdefault(INVALIDATED_PERMISSIONS_KEY, set()).update(oidc_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_user_permissions(session: Session) -> None:
+    oidc_ids = session.info.pop(INVALIDATED_PERMISSIONS_KEY, None) or set()
+    if None in oidc_ids:
+        user_permissions_cache.invalidate()
+    else:
+        for oidc_id in oidc_ids:
+            user_permissions_cache.invalidate(oidc_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_invalidated_user_permissions(session: Session) -> None:
+    session.info.pop(INVALIDATED_PERMISSIONS_KEY, None)
+
 
 class BasicAuthorizationProvider:
     def __init__(self, authorized_users: list[str] = []):
         self.authorized_users = authorized_users
 
     def is_authorized(self, oidc_id: str, permission: str) -> bool:
-        stmt = select(User).where(User.oidc_id == oidc_id)
-        users = current_app.db_session.execute(stmt).all()
-        if users and len(users) == 1:
-            user = users[0][0]
-
-            user_permissions = set(p for role in user.roles for p in role.permissions)
-            if permission in user_permissions:
-                return True
-
-        return False
+        return permission in get_user_permissions(oidc_id)
 
 
 def _check_role(permission_type: PermissionType, permission: Permission) -> bool:
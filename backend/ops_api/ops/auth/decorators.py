@@ -15,6 +15,7 @@ from ops_api.ops.auth.utils import (
     get_bearer_token,
     get_latest_user_session,
     get_user_from_userinfo,
+    user_session_cache,
 )
 from ops_api.ops.utils.errors import error_simulator
 from ops_api.ops.utils.response import make_response_with_headers
@@ -113,32 +114,45 @@ def check_user_session_function(user: User):
     1. The user has an active user session.
     2. The access token in the request is the same as the latest user session access token.
     3. The last_accessed_at field of the latest user session is not more than a configurable threshold ago.
+
+    A valid access token is cached for USER_SESSION_CACHE_TTL, and last_active_at is only written
+    when it's more than USER_SESSION_ACTIVITY_GRANULARITY old, so most requests neither load nor
+    update the user session.
     """
-    user_sessions = get_all_user_sessions(user.id, current_app.db_session)
+    bearer_token = get_bearer_token()
+    access_token = bearer_token.replace("Bearer", "").strip() if bearer_token else None
+    # Update the last_accessed_at field of the latest user session (if this isn't only touching /notification)
+    update_last_active_at = "notification" not in request.endpoint
+    activity_granularity = current_app.config.get("USER_SESSION_ACTIVITY_GRANULARITY", timedelta(minutes=1))
+
+    if access_token:
+        cache_ttl = current_app.config.get("USER_SESSION_CACHE_TTL", timedelta(seconds=10)).total_seconds()
+        last_active_at = user_session_cache.get(user.id, access_token, cache_ttl)
+        if last_active_at and not (update_last_active_at and datetime.now() - last_active_at > activity_granularity):
+            return
+
+    generation = user_session_cache.generation
     latest_user_session = get_latest_user_session(user.id, current_app.db_session)
     # Check if the latest user session is active
     if not latest_user_session or not latest_user_session.is_active:
-        deactivate_all_user_sessions(user_sessions)
+        deactivate_all_user_sessions(get_all_user_sessions(user.id, current_app.db_session))
         raise InvalidUserSessionError(f"User with id={user.id} does not have an active user session")
     # Check if the access token in the request is the same as the latest user session access token
-    bearer_token = get_bearer_token()
-    if bearer_token:
-        access_token = bearer_token.replace("Bearer", "").strip()
-
-        if access_token != latest_user_session.access_token:
-            deactivate_all_user_sessions(user_sessions)
-            raise InvalidUserSessionError(f"User with id={user.id} is using an invalid access token")
+    if access_token and access_token != latest_user_session.access_token:
+        deactivate_all_user_sessions(get_all_user_sessions(user.id, current_app.db_session))
+        raise InvalidUserSessionError(f"User with id={user.id} is using an invalid access token")
     # Check if the last_accessed_at field of the latest user session is not more than a configurable threshold ago
     if check_last_active_at(latest_user_session):
-        deactivate_all_user_sessions(user_sessions)
+        deactivate_all_user_sessions(get_all_user_sessions(user.id, current_app.db_session))
         raise InvalidUserSessionError(f"User with id={user.id} has not accessed the system for more than the threshold")
-    # Update the last_accessed_at field of the latest user session (if this isn't only touching /notification)
-    if "notification" not in request.endpoint:
-        # If last_accessed_at is more than 30 minutes ago, then throw an exception
+    if update_last_active_at and check_last_active_at(latest_user_session, activity_granularity.total_seconds()):
         latest_user_session.last_active_at = datetime.now()
         current_app.db_session.add(latest_user_session)
         current_app.db_session.commit()
 
+    if access_token:
+        user_session_cache.set(user.id, access_token, latest_user_session.last_active_at, generation)
+
 
 def check_last_active_at(latest_user_session, threshold_in_seconds=None):
     """
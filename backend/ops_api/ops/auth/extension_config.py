@@ -1,6 +1,6 @@
 from typing import Optional
 
-from flask import current_app
+from flask import current_app, has_request_context, request
 from flask_jwt_extended import JWTManager
 from sqlalchemy import select
 
@@ -17,5 +17,14 @@ def user_identity_lookup(user: User) -> str:
 @jwtMgr.user_lookup_loader
 def user_lookup_callback(_jwt_header: dict, jwt_data: dict) -> Optional[User]:
     identity = jwt_data["sub"]
+    # the JWT is verified both before the request and by the jwt_required view decorators,
+    # load the user once per request
+    if has_request_context():
+        loaded_user = getattr(request, "jwt_user", None)
+        if loaded_user is not None and str(loaded_user.oidc_id) == identity:
+            return loaded_user
     stmt = select(User).where(User.oidc_id == identity)
-    return current_app.db_session.scalars(stmt).one_or_none()
+    user = current_app.db_session.scalars(stmt).one_or_none()
+    if has_request_context():
+        request.jwt_user = user
+    return user
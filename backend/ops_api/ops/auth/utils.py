@@ -1,3 +1,4 @@
+import hashlib
 import json
 import time
 import uuid
@@ -9,7 +10,7 @@ import requests
 from authlib.jose import jwt as jose_jwt
 from flask import Config, current_app, request
 from flask_jwt_extended import create_access_token, create_refresh_token
-from sqlalchemy import select
+from sqlalchemy import event, inspect, select
 from sqlalchemy.orm import Session
 
 from models import User, UserSession
@@ -163,6 +164,73 @@ def get_latest_user_session(user_id: int, session: Session) -> UserSession | Non
     )
 
 
+# the ids of the users whose validated tokens are invalidated when the session commits
+INVALIDATED_USER_SESSIONS_KEY = "invalidated_user_sessions"
+
+
+class UserSessionCache:
+    """
+    The access tokens (by hash) recently validated against the latest user session of each user,
+    cached in the process so the session doesn't have to be loaded on every request.
+
+    The tokens of a user are invalidated when any of the user's sessions is created, deactivated
+    or gets a new access token and committed in this process. Validations started before an
+    invalidation (the generation) aren't cached.
+    """
+
+    def __init__(self):
+        self._validated: dict[int, dict[str, tuple[float, datetime]]] = {}
+        self.generation = 0
+
+    @staticmethod
+    def hash_token(access_token: str) -> str:
+        return hashlib.sha256(access_token.encode()).hexdigest()
+
+    def get(self, user_id: int, access_token: str, ttl: float) -> Optional[datetime]:
+        """The last_active_at of the user session if the access token was validated less than ttl seconds ago."""
+        validated = self._validated.get(user_id, {}).get(self.hash_token(access_token))
+        if validated and time.monotonic() - validated[0] < ttl:
+            return validated[1]
+        return None
+
+    def set(self, user_id: int, access_token: str, last_active_at: datetime, generation: int) -> None:
+        if generation != self.generation:
+            return
+        self._validated.setdefault(user_id, {})[self.hash_token(access_token)] = (time.monotonic(), last_active_at)
+
+    def invalidate(self, user_id: int) -> None:
+        self.generation += 1
+        self._validated.pop(user_id, None)
+
+
+user_session_cache = UserSessionCache()
+
+
+@event.listens_for(Session, "after_flush")
+def collect_invalidated_user_sessions(session: Session, flush_context) -> None:
+    # the cache is only invalidated on commit, a concurrent request could cache the old session otherwise
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, UserSession):
+            attrs = inspect(obj).attrs
+            if obj in session.dirty and not (
+                attrs.is_active.history.has_changes() or attrs.access_token.history.has_changes()
+            ):
+                # e.g. only last_active_at was updated
+                continue
+            session.info.setdefault(INVALIDATED_USER_SESSIONS_KEY, set()).add(obj.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_user_session_cache(session: Session) -> None:
+    for user_id in session.info.pop(INVALIDATED_USER_SESSIONS_KEY, None) or ():
+        user_session_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_invalidated_user_sessions(session: Session) -> None:
+    session.info.pop(INVALIDATED_USER_SESSIONS_KEY, None)
+
+
 def get_bearer_token() -> str:
     """
     Get the bearer token from the request headers.
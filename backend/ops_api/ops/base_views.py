@@ -1,16 +1,18 @@
 from contextlib import suppress
 from enum import Enum
-from typing import Optional
+from typing import Optional, Sequence
 
 from flask import Response, current_app, jsonify, request
 from flask.views import MethodView
 from flask_jwt_extended import jwt_required
 from marshmallow import EXCLUDE, Schema
-from sqlalchemy import select
+from sqlalchemy import Select, select
 
 from models.base import BaseModel
 from ops_api.ops.auth.authorization_providers import AuthorizationGateway, BasicAuthorizationProvider
 from ops_api.ops.utils.errors import error_simulator
+from ops_api.ops.utils.loader_options import get_loader_options
+from ops_api.ops.utils.pagination import KeysetOrder, Page, PageRequest, fetch_page, set_page_headers
 from ops_api.ops.utils.query_helpers import QueryHelper
 from ops_api.ops.utils.response import make_response_with_headers
 
@@ -38,10 +40,32 @@ class OPSMethodView(MethodView):
         stmt = select(self.model).where(self.model.id == id).order_by(self.model.id)
         return current_app.db_session.scalar(stmt)
 
+    def _get_all_items_stmt(self) -> Select:
+        # eager load the relationships serialized by to_dict
+        return (
+            select(self.model)
+            .options(*get_loader_options(self.model, self.model.__marshmallow__))
+            .order_by(self.model.id)
+        )
+
     def _get_all_items(self) -> list[BaseModel]:
-        stmt = select(self.model).order_by(self.model.id)
         # row objects containing 1 model instance each, need to unpack.
-        return [row[0] for row in current_app.db_session.execute(stmt).all()]
+        return [row[0] for row in current_app.db_session.execute(self._get_all_items_stmt()).all()]
+
+    def _get_page(
+        self, stmt: Select | Sequence[Select], order: Optional[KeysetOrder] = None, default_limit: Optional[int] = None
+    ) -> Page:
+        """
+        Get the page of the statement's items requested by the limit, cursor and count query parameters.
+
+        Without a limit or a cursor (and no default limit) all the items are returned.
+        """
+        order = order or KeysetOrder([self.model.id])
+        return fetch_page(current_app.db_session, stmt, order, PageRequest.from_request(default_limit))
+
+    @staticmethod
+    def _make_page_response(data: list, page: Page) -> Response:
+        return set_page_headers(make_response_with_headers(data), page)
 
     def _get_item_by_oidc_with_try(self, oidc: str):
         item = self._get_item_by_oidc(oidc)
@@ -66,10 +90,12 @@ class OPSMethodView(MethodView):
         return response
 
     def _get_all_items_with_try(self) -> Response:
-        item_list = self._get_all_items()
+        page = self._get_page(self._get_all_items_stmt())
+        item_list = page.items
 
         if item_list:
-            response = make_response_with_headers([item.to_dict() for item in item_list])
+            self.model.load_user_summaries(current_app.db_session, item_list)
+            response = self._make_page_response([item.to_dict() for item in item_list], page)
         else:
             response = make_response_with_headers({}, 404)
 
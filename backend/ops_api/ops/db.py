@@ -1,20 +1,121 @@
 from __future__ import annotations
 
+import threading
+import time
 from itertools import chain
+from typing import Mapping, Optional
 
-from flask import current_app
-from flask_jwt_extended import current_user
-from sqlalchemy import Engine, create_engine
+from flask import current_app, has_request_context, request
+from flask_jwt_extended import current_user, get_jwt_identity
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import Session, scoped_session, sessionmaker
 
 from models import *  # noqa: F403, F401
+from ops_api.ops.utils.pool_metrics import InstrumentedQueuePool
+
+SAFE_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])  # the queries of these requests can use the read replica
+WROTE_KEY = "wrote"
+
+
+class RecentWrites:
+    """
+    When each user last committed a write (in this process), to read their own writes from the primary.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._writes: dict[str, float] = {}
+
+    def record(self, identity: str, window: float):
+        now = time.monotonic()
+        with self._lock:
+            self._writes[identity] = now
+            if len(self._writes) > 1000:
+                self._writes = {key: value for key, value in self._writes.items() if now - value < window}
+
+    def has_recent_write(self, identity: str, window: float) -> bool:
+        with self._lock:
+            written = self._writes.get(identity)
+        return written is not None and time.monotonic() - written < window
+
+    def clear(self):
+        with self._lock:
+            self._writes.clear()
+
+
+recent_writes = RecentWrites()
+
+
+def get_request_identity() -> Optional[str]:
+    """The identity (oidc_id) of the JWT of the request if it has been verified."""
+    if not has_request_context():
+        return None
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        return None
+    return str(identity) if identity else None
+
+
+class RoutingSession(Session):
+    """
+    A session that runs the queries of safe (read only) requests on the read replica engine if there is one.
+
+    The primary is used for flushes and once the session has written in the transaction, for queries
+    that don't have a verified user yet, and for READ_REPLICA_STICKY_SECONDS after the user committed a write
+    (so users read their own writes while the replica catches up).
+    """
+
+    def __init__(self, *args, replica_bind: Optional[Engine] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica_bind = replica_bind
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replica_bind is not None and self._use_replica():
+            return self.replica_bind
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+    def _use_replica(self) -> bool:
+        # (the session doesn't autoflush so pending changes aren't visible to the queries of either engine)
+        if self._flushing or self.info.get(WROTE_KEY):
+            return False
+        if not has_request_context() or request.method not in SAFE_METHODS:
+            return False
+        identity = get_request_identity()
+        if identity is None:
+            return False
+        return not recent_writes.has_recent_write(identity, current_app.config.get("READ_REPLICA_STICKY_SECONDS", 10))
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def mark_session_wrote(session: Session, flush_context):
+    # recording the activity of the user session isn't a write the user reads back
+    objs = chain(session.new, session.dirty, session.deleted)
+    if any(not isinstance(obj, UserSession) for obj in objs):  # noqa: F405
+        session.info[WROTE_KEY] = get_request_identity() or True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def record_session_write(session: Session):
+    identity = session.info.pop(WROTE_KEY, None)
+    if isinstance(identity, str):
+        recent_writes.record(identity, current_app.config.get("READ_REPLICA_STICKY_SECONDS", 10))
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def discard_session_write(session: Session):
+    session.info.pop(WROTE_KEY, None)
 
 
 def init_db(
     conn_string: str,
+    pool_options: Optional[dict] = None,
+    replica_engine: Optional[Engine] = None,
 ) -> tuple[scoped_session[Session | Any], Engine]:  # noqa: F405
-    engine = create_engine(conn_string)
-    db_session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    engine = create_db_engine(conn_string, pool_options)
+    db_session = scoped_session(
+        sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, replica_bind=replica_engine)
+    )
 
     # hack to allow SQLAlchemy v1 style .query access to all models
     BaseModel.query = db_session.query_property()  # noqa: F405
@@ -22,6 +123,31 @@ def init_db(
     return db_session, engine
 
 
+def create_db_engine(conn_string: str, pool_options: Optional[dict] = None) -> Engine:
+    """
+    Create an engine with an instrumented connection pool (see get_pool_options for the options).
+    """
+    pool_options = dict(pool_options or {})
+    statement_timeout = pool_options.pop("statement_timeout", None)
+    connect_args = {"options": f"-c statement_timeout={statement_timeout}"} if statement_timeout else {}
+    return create_engine(conn_string, poolclass=InstrumentedQueuePool, connect_args=connect_args, **pool_options)
+
+
+def get_pool_options(config: Mapping, prefix: str = "SQLALCHEMY_") -> dict:
+    """
+    The connection pool options of the app config, e.g. SQLALCHEMY_POOL_SIZE or AUDIT_POOL_SIZE.
+    """
+    options = {
+        "pool_size": config.get(f"{prefix}POOL_SIZE"),
+        "max_overflow": config.get(f"{prefix}MAX_OVERFLOW"),
+        "pool_timeout": config.get(f"{prefix}POOL_TIMEOUT"),
+        "pool_recycle": config.get(f"{prefix}POOL_RECYCLE"),
+        "pool_pre_ping": config.get(f"{prefix}POOL_PRE_PING"),
+        "statement_timeout": config.get(f"{prefix}STATEMENT_TIMEOUT"),
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+
 def handle_create_update_by_attrs(session: Session) -> None:
     # This is a short circuit to skip setting created_by and updated_by fields
     # (to be used in tests)
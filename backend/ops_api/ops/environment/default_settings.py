@@ -6,6 +6,27 @@ DEBUG = False  # make sure DEBUG is off unless enabled explicitly otherwise
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 SQLALCHEMY_ECHO = False
 
+# connection pool of the requests (per process, sized for the gunicorn threads)
+SQLALCHEMY_POOL_SIZE = 5
+SQLALCHEMY_MAX_OVERFLOW = 10
+SQLALCHEMY_POOL_TIMEOUT = 30  # seconds to wait for a connection
+SQLALCHEMY_POOL_RECYCLE = 1800  # seconds, replace connections before the server/proxy drops them
+SQLALCHEMY_POOL_PRE_PING = False
+SQLALCHEMY_STATEMENT_TIMEOUT = None  # milliseconds
+
+# an optional read replica for the queries of GET requests (the same pool options as the primary),
+# users read from the primary for READ_REPLICA_STICKY_SECONDS after they commit a write
+SQLALCHEMY_REPLICA_DATABASE_URI = None
+READ_REPLICA_STICKY_SECONDS = 10
+
+# connection pool for the audit records (OpsDBHistory, OpsEvent) written outside the request transaction
+AUDIT_POOL_SIZE = 2
+AUDIT_MAX_OVERFLOW = 2
+AUDIT_POOL_TIMEOUT = 10
+AUDIT_POOL_RECYCLE = 1800
+AUDIT_POOL_PRE_PING = False
+AUDIT_STATEMENT_TIMEOUT = None
+
 FLASK_PORT = 8080
 
 JWT_PRIVATE_KEY = os.getenv("JWT_PRIVATE_KEY")
@@ -58,8 +79,46 @@ STORAGE_ACCOUNT_KEY = os.getenv("AZURE_STORAGE_ACCOUNT_KEY")
 
 JSONIFY_PRETTYPRINT_REGULAR = True
 
+# OpsDBHistory tracking: "sync" adds the history records to each committed transaction,
+# "async" writes them after the commit in batches from a background thread
+AUDIT_PIPELINE_MODE = "sync"
+AUDIT_QUEUE_SIZE = 10000
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_INTERVAL = 1.0  # seconds
+
+# OpsEvent recording: "sync" inserts each event when its handler exits,
+# "async" writes them in batches from a background thread
+OPS_EVENT_PIPELINE_MODE = "sync"
+OPS_EVENT_QUEUE_SIZE = 10000
+OPS_EVENT_BATCH_SIZE = 500
+OPS_EVENT_FLUSH_INTERVAL = 1.0  # seconds
+# the request metadata added to the event_details of the events (the auth headers are redacted)
+OPS_EVENT_METADATA = ["request.values", "request.headers", "request.remote_addr", "request.remote_user", "request.json"]
+
+# the number of worker threads running the deferred message bus handlers
+MESSAGE_BUS_WORKERS = 2
+
+# seconds the permissions of a user are cached for (0 disables the cache)
+PERMISSIONS_CACHE_TTL = 60
+
+# Request/response logging
+LOG_LEVEL = None  # DEBUG for unit tests, INFO otherwise
+# write the logs from a background thread and as JSON records (with the structured request/response fields)
+LOG_ENQUEUE = True
+LOG_SERIALIZE = False
+# "none", "summary" (method, url, status code and timings) or "full" (plus the headers and JSON bodies)
+LOG_VERBOSITY = "full"
+LOG_ENDPOINT_VERBOSITY = {"home.show": "none", "api.metrics": "summary"}
+# the fraction of requests whose headers and bodies are logged (error responses are always logged in full)
+LOG_BODY_SAMPLE_RATE = 1.0
+LOG_BODY_MAX_LENGTH = 2000
+
 # User Session Variables
 USER_SESSION_EXPIRATION = timedelta(minutes=30)
+# how long a validated access token is trusted without loading the user session again
+USER_SESSION_CACHE_TTL = timedelta(seconds=10)
+# last_active_at is only written when it's older than this
+USER_SESSION_ACTIVITY_GRANULARITY = timedelta(minutes=1)
 
 FAKE_USER_OIDC_IDS = [
     "00000000-0000-1111-a111-000000000018",
@@ -72,3 +131,29 @@ DOCUMENT_PROVIDERS = {
     "fake",
     "azure",
 }
+
+# HTTP caching (ETag/Last-Modified validators) of the list and summary endpoints, it reads the data version
+# (a query of OpsDBHistory) on every request of the endpoints and is ignored when AUDIT_PIPELINE_MODE is async
+HTTP_CACHE_ENABLED = False
+# the default Cache-Control policy (clients revalidate every time, only the browser cache is used)
+HTTP_CACHE_CONTROL = "private, no-cache"
+# Cache-Control policies by endpoint, e.g. {"api.can-funding-summary-list": "private, max-age=30"}
+HTTP_CACHE_CONTROL_ENDPOINTS = {}
+# part of every ETag, change it (e.g. to the release version) when the serialized responses change
+HTTP_CACHE_KEY = ""
+
+# seconds the funding summaries are cached for (0 disables the cache) and the maximum number of cached summaries
+FUNDING_SUMMARY_CACHE_TTL = 300
+FUNDING_SUMMARY_CACHE_SIZE = 256
+
+# Pagination (keyset) of the list APIs
+# the limit when the request has none (None returns all the items), when it only has a cursor and the maximum limit
+PAGINATION_DEFAULT_LIMIT = None
+PAGINATION_CURSOR_LIMIT = 100
+PAGINATION_MAX_LIMIT = 1000
+
+# the number of rows read from the server side cursor (and serialized) at a time by the streamed list responses
+STREAMING_BATCH_SIZE = 500
+
+# the number of rows read from the server side cursor (and written) at a time by the CSV/XLSX exports
+EXPORT_BATCH_SIZE = 2000
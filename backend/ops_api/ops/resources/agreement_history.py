@@ -1,5 +1,5 @@
 from flask import Response, current_app, request
-from sqlalchemy import select
+from sqlalchemy import Select, select
 
 from models import (
     Agreement,
@@ -16,6 +16,7 @@ from ops_api.ops.auth.auth_types import Permission, PermissionType
 from ops_api.ops.auth.decorators import is_authorized
 from ops_api.ops.base_views import BaseListAPI
 from ops_api.ops.utils.api_helpers import get_all_class_names
+from ops_api.ops.utils.pagination import KeysetOrder, Page
 from ops_api.ops.utils.response import make_response_with_headers
 
 change_request_class_names = get_all_class_names(ChangeRequest)
@@ -24,7 +25,21 @@ change_request_class_names = get_all_class_names(ChangeRequest)
 # omit_change_details_for = ["description", "notes", "comments"]
 
 
+# the order of the history of an agreement, latest first
+AGREEMENT_HISTORY_ORDER = KeysetOrder([OpsDBHistory.created_on, OpsDBHistory.id], descending=True)
+
+
 def find_agreement_histories(agreement_id, limit=10, offset=0):
+    stmt = get_agreement_histories_stmt(agreement_id)
+    stmt = stmt.order_by(*AGREEMENT_HISTORY_ORDER.order_by())
+    stmt = stmt.limit(limit)
+    if offset:
+        stmt = stmt.offset(int(offset))
+    results = current_app.db_session.execute(stmt).all()
+    return results
+
+
+def get_agreement_histories_stmt(agreement_id) -> Select:
     stmt = select(OpsDBHistory).join(
         AgreementOpsDbHistory, OpsDBHistory.id == AgreementOpsDbHistory.ops_db_history_id, isouter=True
     )
@@ -38,12 +53,7 @@ def find_agreement_histories(agreement_id, limit=10, offset=0):
             ]
         )
     )
-    stmt = stmt.order_by(OpsDBHistory.created_on.desc())
-    stmt = stmt.limit(limit)
-    if offset:
-        stmt = stmt.offset(int(offset))
-    results = current_app.db_session.execute(stmt).all()
-    return results
+    return stmt
 
 
 def find_target_display_name(ops_db_hist: OpsDBHistory):
@@ -60,7 +70,8 @@ def find_target_display_name(ops_db_hist: OpsDBHistory):
 
 
 def build_agreement_history_dict(ops_db_hist: OpsDBHistory):
-    created_by_user_full_name = ops_db_hist.created_by_user.full_name if ops_db_hist.created_by_user else None
+    created_by_user = ops_db_hist.get_user_summary(ops_db_hist.created_by)
+    created_by_user_full_name = created_by_user["full_name"] if created_by_user else None
     event_type = ops_db_hist.event_type.name
     changes = ops_db_hist.changes
     target_class_name = ops_db_hist.class_name
@@ -153,11 +164,16 @@ class AgreementHistoryListAPI(BaseListAPI):
 
     @is_authorized(PermissionType.GET, Permission.HISTORY)
     def get(self, id: int) -> Response:
-        limit = request.args.get("limit", 10, type=int)
         offset = request.args.get("offset", 0, type=int)
-        results = find_agreement_histories(id, limit, offset)
-        if results:
-            response = make_response_with_headers([build_agreement_history_dict(row[0]) for row in results])
+        if offset:
+            # the offset pagination of the earlier clients
+            limit = request.args.get("limit", 10, type=int)
+            page = Page([row[0] for row in find_agreement_histories(id, limit, offset)])
+        else:
+            page = self._get_page(get_agreement_histories_stmt(id), AGREEMENT_HISTORY_ORDER, default_limit=10)
+        if page.items:
+            OpsDBHistory.load_user_summaries(current_app.db_session, page.items)
+            response = self._make_page_response([build_agreement_history_dict(item) for item in page.items], page)
         else:
             response = make_response_with_headers({}, 404)
         return response
@@ -14,6 +14,7 @@ from models import (
     AgreementReason,
     AgreementType,
     BaseModel,
+    BudgetLineItem,
     BudgetLineItemStatus,
     ContractAgreement,
     ContractType,
@@ -36,7 +37,11 @@ from ops_api.ops.resources.agreements_constants import (
     ENDPOINT_STRING,
 )
 from ops_api.ops.utils.events import OpsEventHandler
+from ops_api.ops.utils.http_cache import conditional_get
+from ops_api.ops.utils.loader_options import get_loader_options
+from ops_api.ops.utils.pagination import KeysetOrder, get_query_args
 from ops_api.ops.utils.response import make_response_with_headers
+from ops_api.ops.utils.streaming import get_stream_format, make_streamed_response
 
 
 @dataclass
@@ -71,6 +76,7 @@ class AgreementItemAPI(BaseItemAPI):
         item = self._get_item(id)
 
         if item:
+            BudgetLineItem.load_change_requests_in_review(current_app.db_session, item.budget_line_items)
             schema = AGREEMENT_RESPONSE_SCHEMAS.get(item.agreement_type)
             serialized_agreement = schema.dump(item)
             response = make_response_with_headers(serialized_agreement)
@@ -170,6 +176,7 @@ class AgreementListAPI(BaseListAPI):
         super().__init__(model)
 
     @is_authorized(PermissionType.GET, Permission.AGREEMENT)
+    @conditional_get()
     def get(self) -> Response:
         agreement_classes = [
             ContractAgreement,
@@ -178,19 +185,36 @@ class AgreementListAPI(BaseListAPI):
             IaaAaAgreement,
             DirectAgreement,
         ]
-        result = []
+        stmts = []
         for agreement_cls in agreement_classes:
-            result.extend(current_app.db_session.execute(self._get_query(agreement_cls, **request.args)).all())
+            schema = AGREEMENT_RESPONSE_SCHEMAS.get(agreement_cls.__mapper__.polymorphic_identity)
+            stmt = self._get_query(agreement_cls, **get_query_args()).options(
+                *get_loader_options(agreement_cls, schema)
+            )
+            stmts.append(stmt)
+
+        stream_format = get_stream_format()
+        if stream_format:
+            return make_streamed_response(stmts, self._dump_agreements, stream_format)
+
+        page = self._get_page(stmts, KeysetOrder([Agreement.id]))
+        return self._make_page_response(self._dump_agreements(page.items), page)
+
+    @staticmethod
+    def _dump_agreements(agreements: list[Agreement]) -> list[dict]:
+        Agreement.load_procurement_tracker_ids(current_app.db_session, agreements)
+        BudgetLineItem.load_change_requests_in_review(
+            current_app.db_session, [bli for agreement in agreements for bli in agreement.budget_line_items]
+        )
 
         agreement_response: List[dict] = []
 
-        for item in result:
-            for agreement in item:
-                schema = AGREEMENT_RESPONSE_SCHEMAS.get(agreement.agreement_type)
-                serialized_agreement = schema.dump(agreement)
-                agreement_response.append(serialized_agreement)
+        for agreement in agreements:
+            schema = AGREEMENT_RESPONSE_SCHEMAS.get(agreement.agreement_type)
+            serialized_agreement = schema.dump(agreement)
+            agreement_response.append(serialized_agreement)
 
-        return make_response_with_headers(agreement_response)
+        return agreement_response
 
     @is_authorized(PermissionType.POST, Permission.AGREEMENT)
     def post(self) -> Response:
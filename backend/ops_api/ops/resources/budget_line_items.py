@@ -33,8 +33,12 @@ from ops_api.ops.schemas.budget_line_items import (
 from ops_api.ops.utils.api_helpers import convert_date_strings_to_dates, validate_and_prepare_change_data
 from ops_api.ops.utils.change_requests import create_notification_of_new_request_to_reviewer
 from ops_api.ops.utils.events import OpsEventHandler
+from ops_api.ops.utils.http_cache import conditional_get
+from ops_api.ops.utils.loader_options import get_loader_options
+from ops_api.ops.utils.pagination import get_query_args
 from ops_api.ops.utils.query_helpers import QueryHelper
 from ops_api.ops.utils.response import make_response_with_headers
+from ops_api.ops.utils.streaming import get_stream_format, make_streamed_response
 
 ENDPOINT_STRING = "/budget-line-items"
 
@@ -317,7 +321,11 @@ class BudgetLineItemsListAPI(BaseListAPI):
         agreement_id: Optional[int] = None,
         status: Optional[str] = None,
     ) -> list[BudgetLineItem]:
-        stmt = select(BudgetLineItem).order_by(BudgetLineItem.id)
+        stmt = (
+            select(BudgetLineItem)
+            .options(*get_loader_options(BudgetLineItem, BudgetLineItemResponseSchema))
+            .order_by(BudgetLineItem.id)
+        )
 
         query_helper = QueryHelper(stmt)
 
@@ -336,20 +344,31 @@ class BudgetLineItemsListAPI(BaseListAPI):
         return stmt
 
     @is_authorized(PermissionType.GET, Permission.BUDGET_LINE_ITEM)
+    @conditional_get()
     def get(self) -> Response:
-        data = self._get_schema.dump(self._get_schema.load(request.args))
+        data = self._get_schema.dump(self._get_schema.load(get_query_args()))
 
         data["status"] = BudgetLineItemStatus[data["status"]] if data.get("status") else None
         data = convert_date_strings_to_dates(data)
 
         stmt = self._get_query(data.get("can_id"), data.get("agreement_id"), data.get("status"))
 
-        result = current_app.db_session.execute(stmt).all()
+        stream_format = get_stream_format()
+        if stream_format:
+            return make_streamed_response(stmt, self._dump_budget_line_items, stream_format)
 
-        response = make_response_with_headers(self._response_schema_collection.dump([bli[0] for bli in result]))
+        page = self._get_page(stmt)
+        budget_line_items = page.items
+        BudgetLineItem.load_change_requests_in_review(current_app.db_session, budget_line_items)
+
+        response = self._make_page_response(self._response_schema_collection.dump(budget_line_items), page)
 
         return response
 
+    def _dump_budget_line_items(self, budget_line_items: list[BudgetLineItem]) -> list[dict]:
+        BudgetLineItem.load_change_requests_in_review(current_app.db_session, budget_line_items)
+        return self._response_schema_collection.dump(budget_line_items)
+
     @is_authorized(PermissionType.POST, Permission.BUDGET_LINE_ITEM)
     def post(self) -> Response:
 
@@ -6,6 +6,7 @@ from ops_api.ops.auth.auth_types import Permission, PermissionType
 from ops_api.ops.auth.decorators import is_authorized
 from ops_api.ops.base_views import BaseItemAPI
 from ops_api.ops.services.can_funding_summary import CANFundingSummaryService
+from ops_api.ops.utils.http_cache import conditional_get
 from ops_api.ops.utils.response import make_response_with_headers
 
 
@@ -15,6 +16,7 @@ class CANFundingSummaryListAPI(BaseItemAPI):
         self.service = CANFundingSummaryService()
 
     @is_authorized(PermissionType.GET, Permission.CAN)
+    @conditional_get()
     def get(self) -> Response:
         # Get request query parameters
         try:
@@ -48,8 +50,7 @@ class CANFundingSummaryListAPI(BaseItemAPI):
 
         # When 'can_ids' is 0 (all CANS)
         if can_ids == ["0"]:
-            cans = self._get_all_items()
-            return self.service.get_all_cans(cans, fiscal_year, active_period, transfer, portfolio, fy_budget)
+            return self.service.get_all_cans(fiscal_year, active_period, transfer, portfolio, fy_budget)
 
         # Single 'can_id' without additional filters
         if len(can_ids) == 1 and not (active_period or transfer or portfolio or fy_budget):
@@ -57,5 +58,4 @@ class CANFundingSummaryListAPI(BaseItemAPI):
             return self.service.get_single_can(can, fiscal_year)
 
         # Multiple 'can_ids' with filters
-        cans = [self._get_item(can_id) for can_id in can_ids]
-        return self.service.get_list(cans, fiscal_year, active_period, transfer, portfolio, fy_budget)
+        return self.service.get_list(can_ids, fiscal_year, active_period, transfer, portfolio, fy_budget)
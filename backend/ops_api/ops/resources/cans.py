@@ -6,7 +6,7 @@ from flask import Response, current_app, request
 from flask_jwt_extended import jwt_required
 from sqlalchemy import select
 
-from models import OpsEventType
+from models import BudgetLineItem, OpsEventType
 from models.base import BaseModel
 from models.cans import CAN
 from ops_api.ops.auth.auth_types import Permission, PermissionType
@@ -16,7 +16,10 @@ from ops_api.ops.schemas.cans import CANSchema, CreateUpdateCANRequestSchema, Ge
 from ops_api.ops.services.cans import CANService
 from ops_api.ops.utils.errors import error_simulator
 from ops_api.ops.utils.events import OpsEventHandler
+from ops_api.ops.utils.http_cache import conditional_get
+from ops_api.ops.utils.pagination import Page, PageRequest, get_query_args
 from ops_api.ops.utils.response import make_response_with_headers
+from ops_api.ops.utils.streaming import get_stream_format, make_streamed_response
 
 
 @dataclass
@@ -33,6 +36,7 @@ class CANItemAPI(BaseItemAPI):
     def get(self, id: int) -> Response:
         schema = CANSchema()
         item = self.can_service.get(id)
+        BudgetLineItem.load_change_requests_in_review(current_app.db_session, item.budget_line_items)
         return make_response_with_headers(schema.dump(item))
 
     @is_authorized(PermissionType.PATCH, Permission.CAN)
@@ -84,13 +88,30 @@ class CANListAPI(BaseListAPI):
         self._get_input_schema = desert.schema(ListAPIRequest)
 
     @jwt_required()
+    @conditional_get()
     @error_simulator
     def get(self) -> Response:
         list_schema = GetCANListRequestSchema()
-        get_request = list_schema.load(request.args)
-        result = self.can_service.get_list(**get_request)
+        get_request = list_schema.load(get_query_args())
+
+        stream_format = get_stream_format()
+        if stream_format:
+            return make_streamed_response(self.can_service.get_list_stmt(**get_request), self._dump_cans, stream_format)
+
+        page_request = PageRequest.from_request()
+        if page_request.is_paginated or page_request.count:
+            page = self.can_service.get_page(page_request, **get_request)
+        else:
+            page = Page(self.can_service.get_list(**get_request))
+        return self._make_page_response(self._dump_cans(page.items), page)
+
+    @staticmethod
+    def _dump_cans(cans: list[CAN]) -> list[dict]:
+        BudgetLineItem.load_change_requests_in_review(
+            current_app.db_session, [bli for can in cans for bli in can.budget_line_items]
+        )
         can_schema = CANSchema()
-        return make_response_with_headers([can_schema.dump(can) for can in result])
+        return [can_schema.dump(can) for can in cans]
 
     @is_authorized(PermissionType.POST, Permission.CAN)
     def post(self) -> Response:
@@ -123,4 +144,5 @@ class CANsByPortfolioAPI(BaseItemAPI):
     @jwt_required()
     def get(self, id: int) -> Response:
         cans = self._get_item(id)
+        CAN.load_user_summaries(current_app.db_session, cans)
         return make_response_with_headers([can.to_dict() for can in cans])
@@ -3,7 +3,7 @@ from datetime import datetime
 
 from flask import Response, current_app, request
 from flask_jwt_extended import current_user, jwt_required
-from sqlalchemy import or_, select
+from sqlalchemy import Select, or_, select
 
 from models import BudgetLineItem, BudgetLineItemChangeRequest, ChangeRequest, ChangeRequestStatus, Division
 from ops_api.ops.auth.auth_types import Permission, PermissionType
@@ -15,6 +15,7 @@ from ops_api.ops.schemas.budget_line_items import PATCHRequestBodySchema
 from ops_api.ops.schemas.change_requests import GenericChangeRequestResponseSchema
 from ops_api.ops.utils import procurement_tracker_helper
 from ops_api.ops.utils.change_requests import create_notification_of_reviews_request_to_submitter
+from ops_api.ops.utils.pagination import KeysetOrder, Page
 from ops_api.ops.utils.response import make_response_with_headers
 
 
@@ -72,7 +73,15 @@ def review_change_request(
 # TODO: add more query options, for now this just returns CRs in review for
 #  the current user as a division director or deputy division director
 def find_change_requests(user_id, limit: int = 10, offset: int = 0):
+    stmt = get_change_requests_stmt(user_id).order_by(ChangeRequest.id)
+    stmt = stmt.limit(limit)
+    if offset:
+        stmt = stmt.offset(int(offset))
+    results = current_app.db_session.execute(stmt).all()
+    return results
+
 
+def get_change_requests_stmt(user_id) -> Select:
     stmt = (
         select(ChangeRequest)
         .join(Division, ChangeRequest.managing_division_id == Division.id)
@@ -85,11 +94,7 @@ def find_change_requests(user_id, limit: int = 10, offset: int = 0):
                 Division.deputy_division_director_id == user_id,
             )
         )
-    stmt = stmt.limit(limit)
-    if offset:
-        stmt = stmt.offset(int(offset))
-    results = current_app.db_session.execute(stmt).all()
-    return results
+    return stmt
 
 
 def build_change_request_response(change_request: ChangeRequest):
@@ -108,13 +113,16 @@ class ChangeRequestListAPI(BaseListAPI):
 
     @is_authorized(PermissionType.GET, Permission.CHANGE_REQUEST)
     def get(self) -> Response:
-        limit = request.args.get("limit", 10, type=int)
         offset = request.args.get("offset", 0, type=int)
         user_id = request.args.get("userId")
-        results = find_change_requests(user_id, limit=limit, offset=offset)
-        change_requests = [row[0] for row in results] if results else None
-        if change_requests:
-            response = make_response_with_headers(self._response_schema_collection.dump(change_requests))
+        if offset:
+            # the offset pagination of the earlier clients
+            limit = request.args.get("limit", 10, type=int)
+            page = Page([row[0] for row in find_change_requests(user_id, limit=limit, offset=offset)])
+        else:
+            page = self._get_page(get_change_requests_stmt(user_id), KeysetOrder([ChangeRequest.id]), default_limit=10)
+        if page.items:
+            response = self._make_page_response(self._response_schema_collection.dump(page.items), page)
         else:
             response = make_response_with_headers([], 200)
         return response
@@ -0,0 +1,151 @@
+from typing import Optional
+
+from flask import Response, current_app
+from sqlalchemy import Select, func, select
+
+from models import (
+    CAN,
+    Agreement,
+    BudgetLineItem,
+    BudgetLineItemStatus,
+    ProcurementShop,
+    ProductServiceCode,
+    Project,
+    User,
+)
+from models.base import BaseModel
+from ops_api.ops.auth.auth_types import Permission, PermissionType
+from ops_api.ops.auth.decorators import is_authorized
+from ops_api.ops.base_views import BaseListAPI
+from ops_api.ops.schemas.budget_line_items import ExportQueryParametersSchema
+from ops_api.ops.utils.export import make_export_response
+from ops_api.ops.utils.pagination import get_query_args
+
+
+def get_budget_line_item_filters(
+    can_id: Optional[int] = None,
+    status: Optional[BudgetLineItemStatus] = None,
+    fiscal_year: Optional[int] = None,
+) -> list:
+    filters = []
+    if can_id:
+        filters.append(BudgetLineItem.can_id == can_id)
+    if status:
+        filters.append(BudgetLineItem.status == status)
+    if fiscal_year:
+        filters.append(BudgetLineItem.fiscal_year == fiscal_year)
+    return filters
+
+
+class BudgetLineItemsExportAPI(BaseListAPI):
+    def __init__(self, model: BaseModel):
+        super().__init__(model)
+        self._get_schema = ExportQueryParametersSchema()
+
+    @staticmethod
+    def _get_query(
+        can_id: Optional[int] = None,
+        agreement_id: Optional[int] = None,
+        status: Optional[BudgetLineItemStatus] = None,
+        fiscal_year: Optional[int] = None,
+    ) -> Select:
+        # the columns are read as rows (no model instances or relationships are loaded)
+        stmt = (
+            select(
+                BudgetLineItem.id,
+                BudgetLineItem.line_description,
+                BudgetLineItem.agreement_id,
+                Agreement.name.label("agreement_name"),
+                BudgetLineItem.can_id,
+                CAN.number.label("can_number"),
+                BudgetLineItem.amount,
+                BudgetLineItem.proc_shop_fee_percentage,
+                BudgetLineItem.status,
+                BudgetLineItem.date_needed,
+                BudgetLineItem.fiscal_year.label("fiscal_year"),
+                BudgetLineItem.on_hold,
+                BudgetLineItem.requisition_number,
+                BudgetLineItem.requisition_date,
+                BudgetLineItem.comments,
+                BudgetLineItem.created_on,
+                BudgetLineItem.updated_on,
+            )
+            .outerjoin(Agreement, BudgetLineItem.agreement_id == Agreement.id)
+            .outerjoin(CAN, BudgetLineItem.can_id == CAN.id)
+            .where(*get_budget_line_item_filters(can_id, status, fiscal_year))
+            .order_by(BudgetLineItem.id)
+        )
+        if agreement_id:
+            stmt = stmt.where(BudgetLineItem.agreement_id == agreement_id)
+
+        current_app.logger.debug(f"SQL: {stmt}")
+        return stmt
+
+    @is_authorized(PermissionType.GET, Permission.BUDGET_LINE_ITEM)
+    def get(self) -> Response:
+        data = self._get_schema.load(get_query_args())
+        export_format = data.pop("format")
+        return make_export_response(self._get_query(**data), export_format, "budget-line-items")
+
+
+class AgreementsExportAPI(BaseListAPI):
+    def __init__(self, model: BaseModel):
+        super().__init__(model)
+        self._get_schema = ExportQueryParametersSchema()
+
+    @staticmethod
+    def _get_query(
+        can_id: Optional[int] = None,
+        agreement_id: Optional[int] = None,
+        status: Optional[BudgetLineItemStatus] = None,
+        fiscal_year: Optional[int] = None,
+    ) -> Select:
+        budget_line_item_totals = (
+            select(
+                BudgetLineItem.agreement_id,
+                func.count().label("count"),
+                func.coalesce(func.sum(BudgetLineItem.amount), 0).label("total"),
+            )
+            .group_by(BudgetLineItem.agreement_id)
+            .subquery()
+        )
+        stmt = (
+            select(
+                Agreement.id,
+                Agreement.name,
+                Agreement.agreement_type,
+                Agreement.agreement_reason,
+                Agreement.description,
+                Agreement.project_id,
+                Project.title.label("project_title"),
+                User.full_name.label("project_officer"),
+                ProcurementShop.abbr.label("procurement_shop"),
+                ProductServiceCode.name.label("product_service_code"),
+                func.coalesce(budget_line_item_totals.c.count, 0).label("budget_line_item_count"),
+                func.coalesce(budget_line_item_totals.c.total, 0).label("budget_line_item_total"),
+                Agreement.created_on,
+                Agreement.updated_on,
+            )
+            .outerjoin(Project, Agreement.project_id == Project.id)
+            .outerjoin(User, Agreement.project_officer_id == User.id)
+            .outerjoin(ProcurementShop, Agreement.awarding_entity_id == ProcurementShop.id)
+            .outerjoin(ProductServiceCode, Agreement.product_service_code_id == ProductServiceCode.id)
+            .outerjoin(budget_line_item_totals, Agreement.id == budget_line_item_totals.c.agreement_id)
+            .order_by(Agreement.id)
+        )
+        if agreement_id:
+            stmt = stmt.where(Agreement.id == agreement_id)
+
+        # the agreements with a budget line item matching the filters
+        budget_line_item_filters = get_budget_line_item_filters(can_id, status, fiscal_year)
+        if budget_line_item_filters:
+            stmt = stmt.where(Agreement.id.in_(select(BudgetLineItem.agreement_id).where(*budget_line_item_filters)))
+
+        current_app.logger.debug(f"SQL: {stmt}")
+        return stmt
+
+    @is_authorized(PermissionType.GET, Permission.AGREEMENT)
+    def get(self) -> Response:
+        data = self._get_schema.load(get_query_args())
+        export_format = data.pop("format")
+        return make_export_response(self._get_query(**data), export_format, "agreements")
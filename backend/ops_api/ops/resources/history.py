@@ -5,7 +5,9 @@ from models.base import BaseModel
 from ops_api.ops.auth.auth_types import Permission, PermissionType
 from ops_api.ops.auth.decorators import is_authorized
 from ops_api.ops.base_views import BaseListAPI
+from ops_api.ops.utils.pagination import KeysetOrder, Page
 from ops_api.ops.utils.response import make_response_with_headers
+from ops_api.ops.utils.streaming import get_stream_format, make_streamed_response
 
 
 class OpsDBHistoryListAPI(BaseListAPI):
@@ -16,23 +18,34 @@ class OpsDBHistoryListAPI(BaseListAPI):
     def get(self) -> Response:
         class_name = request.args.get("class_name", None)
         row_key = request.args.get("row_key", None)
-        limit = request.args.get("limit", None)
-        offset = request.args.get("offset", None)
+        offset = request.args.get("offset", None, type=int)
         stmt = select(self.model)
         if class_name:
             stmt = stmt.where(self.model.class_name == class_name)
         if row_key:
             stmt = stmt.where(self.model.row_key == row_key)
-        if limit:
-            stmt = stmt.limit(int(limit))
-        if offset:
-            stmt = stmt.offset(int(limit))
-        stmt = stmt.where(self.model.class_name != "UserSession").order_by(self.model.created_on.desc())
+        stmt = stmt.where(self.model.class_name != "UserSession")
+        order = KeysetOrder([self.model.created_on, self.model.id], descending=True)
 
-        item_list = [row[0] for row in current_app.db_session.execute(stmt).all()]
+        stream_format = get_stream_format()
+        if stream_format:
+            return make_streamed_response(stmt.order_by(*order.order_by()), self._dump_histories, stream_format)
+
+        if offset:
+            # the offset pagination of the earlier clients
+            limit = request.args.get("limit", None, type=int)
+            stmt = stmt.order_by(*order.order_by()).limit(limit).offset(offset)
+            page = Page(list(current_app.db_session.scalars(stmt)))
+        else:
+            page = self._get_page(stmt.order_by(*order.order_by()), order)
+        item_list = page.items
 
         if item_list:
-            response = make_response_with_headers([item.to_dict() for item in item_list])
+            response = self._make_page_response(self._dump_histories(item_list), page)
         else:
             response = make_response_with_headers({}, 404)
         return response
+
+    def _dump_histories(self, histories: list[BaseModel]) -> list[dict]:
+        self.model.load_user_summaries(current_app.db_session, histories)
+        return [history.to_dict() for history in histories]
@@ -0,0 +1,33 @@
+from flask import Response, current_app
+from flask.views import MethodView
+
+from ops_api.ops.auth.auth_types import Permission, PermissionType
+from ops_api.ops.auth.decorators import is_authorized
+from ops_api.ops.services.message_bus import message_bus_metrics
+from ops_api.ops.utils.pool_metrics import render_pool_metrics
+
+
+def render_message_bus_metrics(snapshot: dict) -> list[str]:
+    lines = [
+        "# TYPE ops_message_bus_deferred_pending gauge",
+        f"ops_message_bus_deferred_pending {snapshot['deferred_pending']}",
+    ]
+    for metric_name, key, metric_type in (
+        ("ops_message_bus_handler_calls_total", "calls", "counter"),
+        ("ops_message_bus_handler_errors_total", "errors", "counter"),
+        ("ops_message_bus_handler_seconds_total", "total_seconds", "counter"),
+        ("ops_message_bus_handler_max_seconds", "max_seconds", "gauge"),
+    ):
+        lines.append(f"# TYPE {metric_name} {metric_type}")
+        lines.extend(f'{metric_name}{{handler="{name}"}} {stats[key]}' for name, stats in snapshot["handlers"].items())
+    return lines
+
+
+class MetricsAPI(MethodView):
+    @is_authorized(PermissionType.GET, Permission.METRICS)
+    def get(self) -> Response:
+        pools = {"default": current_app.engine.pool, "audit": current_app.audit_engine.pool}
+        if current_app.replica_engine is not None:
+            pools["replica"] = current_app.replica_engine.pool
+        lines = render_pool_metrics(pools) + render_message_bus_metrics(message_bus_metrics.snapshot())
+        return Response("\n".join(lines) + "\n", mimetype="text/plain")
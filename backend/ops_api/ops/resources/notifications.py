@@ -19,6 +19,9 @@ from ops_api.ops.auth.decorators import is_authorized
 from ops_api.ops.base_views import BaseItemAPI, BaseListAPI
 from ops_api.ops.schemas.change_requests import GenericChangeRequestResponseSchema
 from ops_api.ops.utils.events import OpsEventHandler
+from ops_api.ops.utils.http_cache import conditional_get
+from ops_api.ops.utils.loader_options import get_loader_options
+from ops_api.ops.utils.pagination import KeysetOrder, get_query_args
 from ops_api.ops.utils.query_helpers import QueryHelper
 from ops_api.ops.utils.response import make_response_with_headers
 
@@ -179,6 +182,7 @@ class NotificationListAPI(BaseListAPI):
             # only ChangeRequestNotifications are associated with an agreement
             stmt = (
                 select(ChangeRequestNotification)
+                .options(*get_loader_options(ChangeRequestNotification, NotificationResponseSchema))
                 .join(User, ChangeRequestNotification.recipient_id == User.id, isouter=True)
                 .join(
                     AgreementChangeRequest,
@@ -190,6 +194,7 @@ class NotificationListAPI(BaseListAPI):
         else:
             stmt = (
                 select(Notification)
+                .options(*get_loader_options(Notification, NotificationResponseSchema))
                 .join(User, Notification.recipient_id == User.id, isouter=True)
                 .order_by(Notification.created_on.desc())
             )
@@ -213,21 +218,23 @@ class NotificationListAPI(BaseListAPI):
         return stmt
 
     @is_authorized(PermissionType.GET, Permission.NOTIFICATION)
+    @conditional_get()
     def get(self) -> Response:
-        errors = self._get_input_schema.validate(request.args)
+        query_args = get_query_args()
+        errors = self._get_input_schema.validate(query_args)
 
         if errors:
             return make_response_with_headers(errors, 400)
 
-        request_data: ListAPIRequest = self._get_input_schema.load(request.args)
+        request_data: ListAPIRequest = self._get_input_schema.load(query_args)
         stmt = self._get_query(
             user_id=request_data.user_id,
             oidc_id=request_data.oidc_id,
             is_read=request_data.is_read,
             agreement_id=request_data.agreement_id,
         )
-        result = current_app.db_session.execute(stmt).all()
-        return make_response_with_headers(self._response_schema_collection.dump([item[0] for item in result]))
+        page = self._get_page(stmt, KeysetOrder([Notification.created_on, Notification.id], descending=True))
+        return self._make_page_response(self._response_schema_collection.dump(page.items), page)
 
 
 def is_acknowledging(notification: Notification | None):
@@ -26,4 +26,5 @@ class PortfolioCansAPI(BaseItemAPI):
     def get(self, id: int) -> Response:
         year = request.args.get("year")
         cans = self._get_item(id, year)
+        CAN.load_user_summaries(current_app.db_session, cans)
         return make_response_with_headers([can.to_dict() for can in cans])
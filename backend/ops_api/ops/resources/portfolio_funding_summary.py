@@ -5,6 +5,7 @@ from ops_api.ops.auth.auth_types import Permission, PermissionType
 from ops_api.ops.auth.decorators import is_authorized
 from ops_api.ops.base_views import BaseItemAPI
 from ops_api.ops.utils.fiscal_year import get_current_fiscal_year
+from ops_api.ops.utils.http_cache import conditional_get
 from ops_api.ops.utils.portfolios import get_total_funding
 from ops_api.ops.utils.response import make_response_with_headers
 
@@ -14,6 +15,7 @@ class PortfolioFundingSummaryItemAPI(BaseItemAPI):
         super().__init__(model)
 
     @is_authorized(PermissionType.GET, Permission.PORTFOLIO)
+    @conditional_get()
     def get(self, id: int) -> Response:
         """
         /portfolio-funding-summary/<int:id>
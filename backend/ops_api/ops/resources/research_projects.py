@@ -24,6 +24,8 @@ from ops_api.ops.auth.auth_types import Permission, PermissionType
 from ops_api.ops.auth.decorators import is_authorized
 from ops_api.ops.base_views import BaseItemAPI, BaseListAPI
 from ops_api.ops.utils.events import OpsEventHandler
+from ops_api.ops.utils.loader_options import get_loader_options
+from ops_api.ops.utils.pagination import KeysetOrder
 from ops_api.ops.utils.query_helpers import QueryHelper
 from ops_api.ops.utils.response import make_response_with_headers
 
@@ -100,6 +102,7 @@ class ResearchProjectListAPI(BaseListAPI):
     def _get_query(fiscal_year=None, portfolio_id=None, search=None):
         stmt = (
             select(ResearchProject)
+            .options(*get_loader_options(ResearchProject, ResearchProjectResponse))
             .distinct(ResearchProject.id)
             .join(Agreement, isouter=True)
             .join(BudgetLineItem, isouter=True)
@@ -133,14 +136,13 @@ class ResearchProjectListAPI(BaseListAPI):
 
         stmt = ResearchProjectListAPI._get_query(fiscal_year, portfolio_id, search)
 
-        result = current_app.db_session.execute(stmt).all()
+        page = self._get_page(stmt, KeysetOrder([ResearchProject.id]))
 
         project_response: List[dict] = []
-        for item in result:
-            for project in item:
-                project_response.append(ResearchProjectListAPI._response_schema.dump(project))
+        for project in page.items:
+            project_response.append(ResearchProjectListAPI._response_schema.dump(project))
 
-        return make_response_with_headers(project_response)
+        return self._make_page_response(project_response, page)
 
     @is_authorized(PermissionType.POST, Permission.RESEARCH_PROJECT)
     def post(self) -> Response:
@@ -7,8 +7,9 @@ from ops_api.ops.auth.auth_types import Permission, PermissionType
 from ops_api.ops.auth.decorators import is_authorized
 from ops_api.ops.base_views import BaseItemAPI, BaseListAPI
 from ops_api.ops.schemas.users import CreateUserSchema, QueryParameters, SafeUserSchema, UpdateUserSchema, UserResponse
-from ops_api.ops.services.users import get_users
+from ops_api.ops.services.users import get_users, get_users_page
 from ops_api.ops.utils.events import OpsEventHandler
+from ops_api.ops.utils.pagination import Page, PageRequest, get_query_args
 from ops_api.ops.utils.response import make_response_with_headers
 from ops_api.ops.utils.users import is_user_admin
 
@@ -118,9 +119,14 @@ class UsersListAPI(BaseListAPI):
         """
         with OpsEventHandler(OpsEventType.GET_USER_DETAILS) as meta:
             schema = QueryParameters()
-            request_data = schema.load(request.args)
+            request_data = schema.load(get_query_args())
 
-            users = get_users(current_app.db_session, **request_data)
+            page_request = PageRequest.from_request()
+            if page_request.is_paginated or page_request.count:
+                page = get_users_page(current_app.db_session, page_request, **request_data)
+            else:
+                page = Page(get_users(current_app.db_session, **request_data))
+            users = page.items
 
             if is_user_admin(current_user) or (len(users) == 1 and users[0].id == current_user.id):
                 schema = UserResponse(many=True)
@@ -138,7 +144,7 @@ class UsersListAPI(BaseListAPI):
 
             meta.metadata.update({"user_details": user_data})
 
-            return make_response_with_headers(user_data)
+            return self._make_page_response(user_data, page)
 
     @is_authorized(PermissionType.POST, Permission.USER)
     def post(self) -> Response:
@@ -6,7 +6,7 @@ from _decimal import Decimal
 from flask import current_app
 from marshmallow_enum import EnumField
 
-from marshmallow import EXCLUDE, Schema, ValidationError, fields, validates_schema
+from marshmallow import EXCLUDE, Schema, ValidationError, fields, validate, validates_schema
 from models import AgreementReason, BudgetLineItem, BudgetLineItemStatus, ServicesComponent
 from ops_api.ops.schemas.change_requests import GenericChangeRequestResponseSchema
 
@@ -227,6 +227,11 @@ class QueryParametersSchema(Schema):
     status = EnumField(BudgetLineItemStatus, default=None, allow_none=True)
 
 
+class ExportQueryParametersSchema(QueryParametersSchema):
+    fiscal_year = fields.Int(default=None, allow_none=True)
+    format = fields.Str(load_default="csv", validate=validate.OneOf(["csv", "xlsx"]))
+
+
 class BLITeamMembersSchema(Schema):
     class Meta:
         unknown = EXCLUDE  # Exclude unknown fields
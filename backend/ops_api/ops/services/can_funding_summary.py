@@ -1,62 +1,90 @@
 from typing import List, Optional
 
-from flask import Response
+from flask import Response, current_app
 
 from models import CANMethodOfTransfer
 from ops_api.ops.schemas.can_funding_summary import (
     GetCANFundingSummaryRequestSchema,
     GetCANFundingSummaryResponseSchema,
 )
-from ops_api.ops.utils.cans import aggregate_funding_summaries, get_can_funding_summary, get_filtered_cans
+from ops_api.ops.utils.cans import (
+    aggregate_funding_summaries,
+    get_can_funding_summaries,
+    get_can_funding_summary,
+    get_filtered_cans_stmt,
+)
+from ops_api.ops.utils.funding_summary_cache import ANY_CAN, get_cached_funding_summary
 from ops_api.ops.utils.response import make_response_with_headers
 
 
 class CANFundingSummaryService:
     def apply_filters_and_return(
         self,
-        cans: list,
+        can_ids: Optional[list] = None,
         fiscal_year: str = None,
         active_period: list = None,
         transfer: list = None,
         portfolio: list = None,
         fy_budget: list = None,
     ) -> Response:
-        # Filter cans based on the provided parameters
-        cans_with_filters = get_filtered_cans(
-            cans, int(fiscal_year) if fiscal_year else None, active_period, transfer, portfolio, fy_budget
+        key = (
+            "cans",
+            tuple(int(can_id) for can_id in can_ids) if can_ids else None,
+            fiscal_year,
+            tuple(active_period or ()),
+            tuple(t.name for t in transfer or ()),
+            tuple(sorted(portfolio or ())),
+            tuple(fy_budget or ()),
         )
-        # Generate funding summaries for each filtered CAN
-        can_funding_summaries = [
-            get_can_funding_summary(can, int(fiscal_year) if fiscal_year else None) for can in cans_with_filters
-        ]
-        # Aggregate and return the final summary
-        aggregated_summary = aggregate_funding_summaries(can_funding_summaries)
-        return self.create_can_funding_budget_response(aggregated_summary)
+        # the summary of the CANs matching filters (not a given list of CANs) may change with any CAN
+        tags = [("can", can_id) for can_id in key[1]] if can_ids else [ANY_CAN]
+
+        def get_summary():
+            # Fetch only the cans that match the provided parameters
+            stmt = get_filtered_cans_stmt(
+                can_ids, int(fiscal_year) if fiscal_year else None, active_period, transfer, portfolio, fy_budget
+            )
+            cans_with_filters = current_app.db_session.scalars(stmt).all()
+            # Generate funding summaries for all the filtered CANs in one query
+            can_funding_summaries = get_can_funding_summaries(
+                cans_with_filters, int(fiscal_year) if fiscal_year else None
+            )
+            # Aggregate the final summary
+            return self.dump_can_funding_summary(aggregate_funding_summaries(can_funding_summaries))
+
+        return self.create_cached_response(key, tags, get_summary)
 
     def get_single_can(self, can: dict, fiscal_year: Optional[str] = None) -> Response:
         # Get funding summary for a single CAN
-        can_funding_summary = get_can_funding_summary(can, int(fiscal_year) if fiscal_year else None)
-        return self.create_can_funding_budget_response(can_funding_summary)
+        def get_summary():
+            return self.dump_can_funding_summary(
+                get_can_funding_summary(can, int(fiscal_year) if fiscal_year else None)
+            )
+
+        return self.create_cached_response(("can", can.id, fiscal_year), [("can", can.id)], get_summary)
 
     def get_all_cans(
         self,
-        cans: List[dict],
         fiscal_year: Optional[str] = None,
         active_period: Optional[List[int]] = None,
         transfer: Optional[List[str]] = None,
         portfolio: Optional[List[str]] = None,
         fy_budget: Optional[List[int]] = None,
     ) -> Response:
-        return self.apply_filters_and_return(cans, fiscal_year, active_period, transfer, portfolio, fy_budget)
+        return self.apply_filters_and_return(None, fiscal_year, active_period, transfer, portfolio, fy_budget)
+
+    def get_list(self, can_ids, fiscal_year, active_period, transfer, portfolio, fy_budget):
+        return self.apply_filters_and_return(can_ids, fiscal_year, active_period, transfer, portfolio, fy_budget)
 
-    def get_list(self, cans, fiscal_year, active_period, transfer, portfolio, fy_budget):
-        return self.apply_filters_and_return(cans, fiscal_year, active_period, transfer, portfolio, fy_budget)
+    @staticmethod
+    def dump_can_funding_summary(result) -> dict:
+        schema = GetCANFundingSummaryResponseSchema(many=False)
+        return schema.dump(result)
 
     @staticmethod
-    def create_can_funding_budget_response(result) -> Response:
+    def create_cached_response(key: tuple, tags: list[tuple], get_summary) -> Response:
         try:
-            schema = GetCANFundingSummaryResponseSchema(many=False)
-            result = schema.dump(result)
+            result = get_cached_funding_summary(key, tags, get_summary)
             return make_response_with_headers(result)
         except Exception as e:
             return make_response_with_headers({"error": "An unexpected error occurred", "details": str(e)}, 500)
@@ -1,12 +1,15 @@
 from typing import cast
 
 from flask import current_app
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import InstrumentedAttribute
 from werkzeug.exceptions import NotFound
 
 from models import CAN
+from ops_api.ops.schemas.cans import CANSchema
+from ops_api.ops.utils.loader_options import get_loader_options
+from ops_api.ops.utils.pagination import KeysetOrder, Page, PageRequest, fetch_page
 from ops_api.ops.utils.query_helpers import QueryHelper
 
 
@@ -83,12 +86,24 @@ class CANService:
         results = current_app.db_session.execute(search_query).all()
         return [can for item in results for can in item]
 
+    def get_list_stmt(self, search=None) -> Select:
+        """
+        Get the statement of the list of CANs, optionally filtered by a search parameter.
+        """
+        return self._get_query(search)
+
+    def get_page(self, page_request: PageRequest, search=None) -> Page:
+        """
+        Get a page of the list of CANs, optionally filtered by a search parameter.
+        """
+        return fetch_page(current_app.db_session, self._get_query(search), KeysetOrder([CAN.id]), page_request)
+
     @staticmethod
     def _get_query(search=None):
         """
         Construct a search query that can be used to retrieve a list of CANs.
         """
-        stmt = select(CAN).order_by(CAN.id)
+        stmt = select(CAN).options(*get_loader_options(CAN, CANSchema)).order_by(CAN.id)
 
         query_helper = QueryHelper(stmt)
 
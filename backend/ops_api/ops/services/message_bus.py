@@ -1,11 +1,97 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from typing import List
 
-from blinker import signal
-from flask import current_app
+from blinker import Namespace, signal
+from flask import Flask, current_app
 from loguru import logger
 
 from models import OpsEvent, OpsEventType
 
+# the signals of the handlers that run on the worker pool instead of in the request
+deferred_signals = Namespace()
+
+
+class MessageBusMetrics:
+    """
+    The number of calls, errors and the latency of each handler and the number of deferred handler calls waiting
+    for (or running on) the worker pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.handlers: dict[str, dict] = {}
+        self.deferred_pending = 0
+
+    def record(self, handler_name: str, duration: float, failed: bool):
+        with self._lock:
+            stats = self.handlers.setdefault(
+                handler_name, {"calls": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            )
+            stats["calls"] += 1
+            stats["errors"] += int(failed)
+            stats["total_seconds"] += duration
+            stats["max_seconds"] = max(stats["max_seconds"], duration)
+
+    def add_deferred(self, count: int):
+        with self._lock:
+            self.deferred_pending += count
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "deferred_pending": self.deferred_pending,
+                "handlers": {name: dict(stats) for name, stats in self.handlers.items()},
+            }
+
+
+message_bus_metrics = MessageBusMetrics()
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_deferred_futures: set[Future] = set()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get("MESSAGE_BUS_WORKERS", 2), thread_name_prefix="message-bus"
+            )
+        return _executor
+
+
+def wait_for_deferred_handlers(timeout: float | None = None):
+    """Wait until the deferred handler calls submitted so far are done."""
+    wait(list(_deferred_futures), timeout=timeout)
+
+
+def get_handler_name(callback: callable) -> str:
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+def call_handler(callback: callable, event: OpsEvent, session):
+    start = time.perf_counter()
+    failed = False
+    try:
+        callback(event, session=session)
+    except Exception:
+        failed = True
+        logger.exception(f"Handler {get_handler_name(callback)} failed for event {event.event_type}")
+    finally:
+        message_bus_metrics.record(get_handler_name(callback), time.perf_counter() - start, failed)
+
+
+def call_deferred_handler(app: Flask, callback: callable, event: OpsEvent):
+    try:
+        with app.app_context():
+            call_handler(callback, event, app.db_session)
+            app.db_session.commit()
+    finally:
+        message_bus_metrics.add_deferred(-1)
+
 
 class MessageBus:
     """
@@ -13,35 +99,57 @@ class MessageBus:
 
     This message bus implementation uses the Blinker library to handle event signals.
 
-    This message bus assumes it exists in a single thread and is meant to be used within the context of a single request.
+    The subscriptions are global and are registered once (when the app is created). A message bus instance holds
+    the events published during a single request and is not shared between requests or threads.
 
-    Published events are stored in a list and are handled when the handle method is called (usually at the end of a request).
+    Published events are handled when the handle method is called (at the end of the request, after the view
+    committed its changes). Handlers subscribed with deferred=True run on a worker thread pool (with a session of
+    their own) so they don't add to the time of the request.
     """
 
-    published_events: List[OpsEvent] = []
-    known_callbacks = []
+    def __init__(self):
+        self.published_events: List[OpsEvent] = []
 
     def handle(self):
         """
         Handle all published events by calling the appropriate handlers for each event type.
         """
         for event in self.published_events:
-            ops_signal = signal(event.event_type.name)
-            ops_signal.send(event, session=current_app.db_session)
             logger.debug(f"Handling event {event}")
+            for callback in signal(event.event_type.name).receivers_for(event):
+                call_handler(callback, event, current_app.db_session)
+
+            deferred_callbacks = list(deferred_signals.signal(event.event_type.name).receivers_for(event))
+            if deferred_callbacks:
+                app = current_app._get_current_object()
+                message_bus_metrics.add_deferred(len(deferred_callbacks))
+                for callback in deferred_callbacks:
+                    future = get_executor().submit(call_deferred_handler, app, callback, event)
+                    _deferred_futures.add(future)
+                    future.add_done_callback(_deferred_futures.discard)
         self.published_events.clear()
 
-    def subscribe(self, event_type: OpsEventType, callback: callable):
+    def subscribe(self, event_type: OpsEventType, callback: callable, deferred: bool = False):
         """
         Subscribe to an event type with a callback function.
 
+        Subscribing the same callback again has no effect.
+
         :param event_type: The event type to subscribe to.
         :param callback: The callback function to call when the event is published.
+        :param deferred: Call the callback on the worker pool instead of at the end of the request.
         """
         logger.debug(f"Subscribing to {event_type} with callback {callback}")
-        ops_signal = signal(event_type.name)
+        ops_signal = deferred_signals.signal(event_type.name) if deferred else signal(event_type.name)
         ops_signal.connect(callback)
 
+    def unsubscribe(self, event_type: OpsEventType, callback: callable):
+        """
+        Unsubscribe the callback function from an event type.
+        """
+        signal(event_type.name).disconnect(callback)
+        deferred_signals.signal(event_type.name).disconnect(callback)
+
     def publish(self, event_type: OpsEventType, event: OpsEvent):
         """
         Publish an event with the given event type and details.
@@ -56,10 +164,6 @@ class MessageBus:
 
     def cleanup(self):
         """
-        Clean up all subscriptions and published events.
+        Clean up the published events (that weren't handled).
         """
-        for callback in self.known_callbacks:
-            ops_signal = signal(callback)
-            ops_signal.disconnect(callback)
         self.published_events.clear()
-        self.known_callbacks.clear()
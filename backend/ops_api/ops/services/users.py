@@ -1,11 +1,12 @@
 from typing import cast
 
-from sqlalchemy import ColumnElement, select
+from sqlalchemy import ColumnElement, Select, select
 from sqlalchemy.orm import Session
 from werkzeug.exceptions import BadRequest, Forbidden, NotFound
 
 from models import Role, User, UserStatus
 from ops_api.ops.auth.utils import deactivate_all_user_sessions, get_all_user_sessions
+from ops_api.ops.utils.pagination import KeysetOrder, Page, PageRequest, fetch_page
 from ops_api.ops.utils.users import is_user_admin
 
 
@@ -77,6 +78,24 @@ def get_users(session: Session, **kwargs) -> list[User]:
     :return: The users that match the criteria.
 
     """
+    users = session.execute(_get_users_stmt(**kwargs)).scalars().all()
+
+    return list(users)
+
+
+def get_users_page(session: Session, page_request: PageRequest, **kwargs) -> Page:
+    """
+    Get a page of the users that match the given criteria.
+
+    :param session: The database session.
+    :param page_request: The limit, cursor and count of the page.
+    :param **kwargs: The criteria to filter the users by.
+    :return: The page of the users that match the criteria.
+    """
+    return fetch_page(session, _get_users_stmt(**kwargs), KeysetOrder([User.id]), page_request)
+
+
+def _get_users_stmt(**kwargs) -> Select:
     stmt = select(User)
 
     for key, value in kwargs.items():
@@ -85,11 +104,7 @@ def get_users(session: Session, **kwargs) -> list[User]:
         else:
             stmt = stmt.where(cast(ColumnElement[bool], getattr(User, key)) == value)
 
-    stmt = stmt.order_by(User.id)
-
-    users = session.execute(stmt).scalars().all()
-
-    return list(users)
+    return stmt.order_by(User.id)
 
 
 def create_user(session: Session, **kwargs) -> User:
@@ -8,7 +8,9 @@ from ops_api.ops.views import (
     AGREEMENT_LIST_API_VIEW_FUNC,
     AGREEMENT_REASON_LIST_API_VIEW_FUNC,
     AGREEMENT_TYPE_LIST_API_VIEW_FUNC,
+    AGREEMENTS_EXPORT_API_VIEW_FUNC,
     AZURE_SAS_TOKEN_VIEW_FUNC,
+    BUDGET_LINE_ITEMS_EXPORT_API_VIEW_FUNC,
     BUDGET_LINE_ITEMS_ITEM_API_VIEW_FUNC,
     BUDGET_LINE_ITEMS_LIST_API_VIEW_FUNC,
     CAN_FUNDING_BUDGET_ITEM_API_VIEW_FUNC,
@@ -29,6 +31,7 @@ from ops_api.ops.views import (
     DIVISIONS_LIST_API_VIEW_FUNC,
     DOCUMENT_API_FUNC,
     HEALTH_CHECK_VIEW_FUNC,
+    METRICS_VIEW_FUNC,
     NOTIFICATIONS_ITEM_API_VIEW_FUNC,
     NOTIFICATIONS_LIST_API_VIEW_FUNC,
     OPS_DB_HISTORY_LIST_API_VIEW_FUNC,
@@ -71,6 +74,10 @@ def register_api(api_bp: Blueprint) -> None:
         "/health/",
         view_func=HEALTH_CHECK_VIEW_FUNC,
     )
+    api_bp.add_url_rule(
+        "/metrics/",
+        view_func=METRICS_VIEW_FUNC,
+    )
     api_bp.add_url_rule(
         "/azure/sas-token/",
         view_func=AZURE_SAS_TOKEN_VIEW_FUNC,
@@ -134,6 +141,10 @@ def register_api(api_bp: Blueprint) -> None:
         "/budget-line-items/",
         view_func=BUDGET_LINE_ITEMS_LIST_API_VIEW_FUNC,
     )
+    api_bp.add_url_rule(
+        "/budget-line-items/export",
+        view_func=BUDGET_LINE_ITEMS_EXPORT_API_VIEW_FUNC,
+    )
 
     api_bp.add_url_rule(
         "/procurement-shops/<int:id>",
@@ -221,6 +232,10 @@ def register_api(api_bp: Blueprint) -> None:
         "/agreements/",
         view_func=AGREEMENT_LIST_API_VIEW_FUNC,
     )
+    api_bp.add_url_rule(
+        "/agreements/export",
+        view_func=AGREEMENTS_EXPORT_API_VIEW_FUNC,
+    )
     api_bp.add_url_rule(
         "/agreement-history/<int:id>",
         view_func=AGREEMENT_HISTORY_LIST_API_VIEW_FUNC,
@@ -1,7 +1,19 @@
 from decimal import Decimal
 from typing import List, Optional, TypedDict
 
-from models import CAN, BudgetLineItemStatus
+from flask import current_app
+from sqlalchemy import Integer, Select, and_, case, cast, func, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from models import (
+    CAN,
+    BudgetLineItem,
+    BudgetLineItemStatus,
+    CANFundingBudget,
+    CANFundingDetails,
+    CANFundingReceived,
+    Portfolio,
+)
 
 
 class CanObject(TypedDict):
@@ -26,6 +38,15 @@ class CanFundingSummary(TypedDict):
     new_funding: float
 
 
+# The CanFundingSummary key for the funding total of each BudgetLineItem status
+BUDGET_LINE_ITEM_STATUS_FUNDING_KEYS = {
+    BudgetLineItemStatus.PLANNED: "planned_funding",
+    BudgetLineItemStatus.OBLIGATED: "obligated_funding",
+    BudgetLineItemStatus.IN_EXECUTION: "in_execution_funding",
+    BudgetLineItemStatus.DRAFT: "in_draft_funding",
+}
+
+
 def get_funding_by_budget_line_item_status(
     can: CAN, status: BudgetLineItemStatus, fiscal_year: Optional[int] = None
 ) -> float:
@@ -111,12 +132,41 @@ def get_can_funding_summary(can: CAN, fiscal_year: Optional[int] = None) -> CanF
         in_execution_funding = get_funding_by_budget_line_item_status(can, BudgetLineItemStatus.IN_EXECUTION, None)
         in_draft_funding = get_funding_by_budget_line_item_status(can, BudgetLineItemStatus.DRAFT, None)
 
-    carry_forward_label = (
-        "Carry-Forward"
-        if len(can.funding_budgets[1:]) == 1
-        else ", ".join(f"FY {c}" for c in [c.fiscal_year for c in can.funding_budgets[1:]]) + " Carry-Forward"
+    return _build_can_funding_summary(
+        can,
+        carry_forward_label=_get_carry_forward_label([c.fiscal_year for c in can.funding_budgets[1:]]),
+        received_funding=received_funding,
+        total_funding=total_funding,
+        carry_forward_funding=carry_forward_funding,
+        new_funding=new_funding,
+        planned_funding=planned_funding,
+        obligated_funding=obligated_funding,
+        in_execution_funding=in_execution_funding,
+        in_draft_funding=in_draft_funding,
     )
 
+
+def _get_carry_forward_label(carry_forward_fiscal_years: list[int]) -> str:
+    """
+    Return the carry forward label for the fiscal years of a CAN's carry forward budgets.
+    """
+    if len(carry_forward_fiscal_years) == 1:
+        return "Carry-Forward"
+    return ", ".join(f"FY {fiscal_year}" for fiscal_year in carry_forward_fiscal_years) + " Carry-Forward"
+
+
+def _build_can_funding_summary(
+    can: CAN,
+    carry_forward_label: str,
+    received_funding,
+    total_funding,
+    carry_forward_funding,
+    new_funding,
+    planned_funding,
+    obligated_funding,
+    in_execution_funding,
+    in_draft_funding,
+) -> CanFundingSummary:
     available_funding = total_funding - sum([planned_funding, obligated_funding, in_execution_funding]) or 0
 
     return {
@@ -140,57 +190,179 @@ def get_can_funding_summary(can: CAN, fiscal_year: Optional[int] = None) -> CanF
     }
 
 
-def get_nested_attribute(obj, attribute_path):
+def get_can_funding_totals_stmt(can_ids: list[int], fiscal_year: Optional[int] = None) -> Select:
     """
-    Given an object and a string representing a dot-separated attribute path,
-    returns the value of the attribute dynamically. If any attribute is None, return None.
-    :param obj: The object to get the attribute from
-    :param attribute_path: The dot-separated attribute path
-    :return: The value of the attribute, or None if any attribute is None or the attribute does not exist
+    Return a statement that computes the funding totals of each of the given CANs in one grouped query.
+
+    Each row has the CAN id along with the budget, received and budget line item totals
+    that make up a CanFundingSummary.
     """
-    attributes = attribute_path.split(".")
-    for attr in attributes:
-        obj = getattr(obj, attr, None)
-        if obj is None:
-            return None
-    return obj
+    ranked_budgets = (
+        select(
+            CANFundingBudget.can_id,
+            CANFundingBudget.fiscal_year,
+            CANFundingBudget.budget,
+            CANFundingDetails.fiscal_year.label("appropriation_year"),
+            func.row_number()
+            .over(partition_by=CANFundingBudget.can_id, order_by=CANFundingBudget.id)
+            .label("position"),
+        )
+        .join(CAN, CAN.id == CANFundingBudget.can_id)
+        .outerjoin(CANFundingDetails, CANFundingDetails.id == CAN.funding_details_id)
+        .where(CANFundingBudget.can_id.in_(can_ids))
+        .subquery()
+    )
+    # the first budget of a CAN is new money, every budget after it is carry forward
+    is_carry_forward = ranked_budgets.c.position > 1
+    budget_fiscal_year_match = ranked_budgets.c.fiscal_year == fiscal_year if fiscal_year else true()
+    budget_totals = (
+        select(
+            ranked_budgets.c.can_id,
+            func.sum(ranked_budgets.c.budget).filter(budget_fiscal_year_match).label("total_funding"),
+            func.sum(ranked_budgets.c.budget)
+            .filter(and_(budget_fiscal_year_match, is_carry_forward))
+            .label("carry_forward_funding"),
+            func.sum(ranked_budgets.c.budget)
+            .filter(ranked_budgets.c.fiscal_year == ranked_budgets.c.appropriation_year)
+            .label("appropriation_year_funding"),
+            func.array_agg(aggregate_order_by(ranked_budgets.c.fiscal_year, ranked_budgets.c.position))
+            .filter(is_carry_forward)
+            .label("carry_forward_fiscal_years"),
+        )
+        .group_by(ranked_budgets.c.can_id)
+        .subquery()
+    )
+
+    received_totals = (
+        select(
+            CANFundingReceived.can_id,
+            func.sum(CANFundingReceived.funding).label("received_funding"),
+        )
+        .where(CANFundingReceived.can_id.in_(can_ids))
+        .where(CANFundingReceived.fiscal_year == fiscal_year if fiscal_year else true())
+        .group_by(CANFundingReceived.can_id)
+        .subquery()
+    )
+
+    budget_line_item_totals = (
+        select(
+            BudgetLineItem.can_id,
+            *[
+                func.sum(BudgetLineItem.amount).filter(BudgetLineItem.status == status).label(key)
+                for status, key in BUDGET_LINE_ITEM_STATUS_FUNDING_KEYS.items()
+            ],
+        )
+        .where(BudgetLineItem.can_id.in_(can_ids))
+        .where(BudgetLineItem.fiscal_year == fiscal_year if fiscal_year else true())
+        .group_by(BudgetLineItem.can_id)
+        .subquery()
+    )
+
+    return (
+        select(
+            CAN.id.label("can_id"),
+            budget_totals.c.total_funding,
+            budget_totals.c.carry_forward_funding,
+            budget_totals.c.appropriation_year_funding,
+            budget_totals.c.carry_forward_fiscal_years,
+            received_totals.c.received_funding,
+            *[budget_line_item_totals.c[key] for key in BUDGET_LINE_ITEM_STATUS_FUNDING_KEYS.values()],
+        )
+        .outerjoin(budget_totals, budget_totals.c.can_id == CAN.id)
+        .outerjoin(received_totals, received_totals.c.can_id == CAN.id)
+        .outerjoin(budget_line_item_totals, budget_line_item_totals.c.can_id == CAN.id)
+        .where(CAN.id.in_(can_ids))
+    )
 
 
-def filter_by_attribute(cans: list[CAN], attribute_search: str, attribute_list) -> list[CAN]:
+def get_can_funding_summaries(cans: list[CAN], fiscal_year: Optional[int] = None) -> list[CanFundingSummary]:
     """
-    Filters the list of cans based on a nested attribute search.
-    The attribute search is a string that can specify nested attributes, separated by dots.
-    For example, "portfolios.abbr" would search for the 'abbr' attribute in the 'portfolios' attribute.
+    Return a CanFundingSummary dictionary for each of the given CANs.
+
+    The funding totals for all the CANs are computed in the database with a single grouped query
+    rather than by loading and summing the budgets, funding received and budget line items of each CAN.
     """
-    return [can for can in cans if get_nested_attribute(can, attribute_search) in attribute_list]
+    if not cans:
+        return []
+
+    stmt = get_can_funding_totals_stmt([can.id for can in cans], fiscal_year)
+    totals_by_can_id = {row.can_id: row for row in current_app.db_session.execute(stmt)}
+
+    summaries = []
+    for can in cans:
+        totals = totals_by_can_id[can.id]
+        total_funding = totals.total_funding or 0
+
+        if fiscal_year and can.active_period == 1:
+            new_funding = total_funding
+        else:
+            new_funding = totals.appropriation_year_funding or None
+
+        summaries.append(
+            _build_can_funding_summary(
+                can,
+                carry_forward_label=_get_carry_forward_label(totals.carry_forward_fiscal_years or []),
+                received_funding=totals.received_funding or 0,
+                total_funding=total_funding,
+                carry_forward_funding=totals.carry_forward_funding or 0,
+                new_funding=new_funding,
+                planned_funding=totals.planned_funding or 0,
+                obligated_funding=totals.obligated_funding or 0,
+                in_execution_funding=totals.in_execution_funding or 0,
+                in_draft_funding=totals.in_draft_funding or 0,
+            )
+        )
 
+    return summaries
 
-def filter_by_fiscal_year_budget(cans: list[CAN], fiscal_year_budget: list[int]) -> list[CAN]:
+
+def _get_active_period_expression():
     """
-    Filters the list of cans based on the fiscal year budget's minimum and maximum values.
+    SQL expression for CANFundingDetails.active_period, the number of years the funds are active for.
     """
-    return [
-        can
-        for can in cans
-        if any(fiscal_year_budget[0] <= budget.budget <= fiscal_year_budget[1] for budget in can.funding_budgets)
-    ]
+    return case(
+        (
+            func.length(CANFundingDetails.fund_code) == 14,
+            cast(func.substr(CANFundingDetails.fund_code, 11, 1), Integer),
+        ),
+        else_=None,
+    )
 
 
-def get_filtered_cans(cans, fiscal_year=None, active_period=None, transfer=None, portfolio=None, fy_budget=None):
+def get_filtered_cans_stmt(
+    can_ids=None, fiscal_year=None, active_period=None, transfer=None, portfolio=None, fy_budget=None
+) -> Select:
     """
-    Returns a filtered list of CANs for the given list of CANs based on the provided attributes.
+    Returns a statement that selects the CANs matching the provided attributes.
+
+    The filters are compiled into JOIN/WHERE clauses so only the matching CANs are fetched. When can_ids are given
+    the CANs are returned in the order of can_ids, otherwise they are ordered by id.
     """
+    stmt = select(CAN)
+
+    if can_ids:
+        positions = {}
+        for position, can_id in enumerate(can_ids):
+            positions.setdefault(int(can_id), position)
+        stmt = stmt.where(CAN.id.in_(positions)).order_by(case(positions, value=CAN.id))
+    else:
+        stmt = stmt.order_by(CAN.id)
+    if fiscal_year or active_period or transfer:
+        stmt = stmt.join(CANFundingDetails, CANFundingDetails.id == CAN.funding_details_id)
     if fiscal_year:
-        cans = filter_by_attribute(cans, "funding_details.fiscal_year", [fiscal_year])
+        stmt = stmt.where(CANFundingDetails.fiscal_year == fiscal_year)
     if active_period:
-        cans = filter_by_attribute(cans, "active_period", active_period)
+        stmt = stmt.where(_get_active_period_expression().in_(active_period))
     if transfer:
-        cans = filter_by_attribute(cans, "funding_details.method_of_transfer", transfer)
+        stmt = stmt.where(CANFundingDetails.method_of_transfer.in_(transfer))
     if portfolio:
-        cans = filter_by_attribute(cans, "portfolio.abbreviation", portfolio)
+        stmt = stmt.join(Portfolio, Portfolio.id == CAN.portfolio_id).where(Portfolio.abbreviation.in_(portfolio))
     if fy_budget:
-        cans = filter_by_fiscal_year_budget(cans, fy_budget)
-    return cans
+        stmt = stmt.where(CAN.funding_budgets.any(CANFundingBudget.budget.between(fy_budget[0], fy_budget[1])))
+
+    current_app.logger.debug(f"SQL: {stmt}")
+
+    return stmt
 
 
 def aggregate_funding_summaries(funding_summaries: List[dict]) -> dict:
@@ -1,14 +1,26 @@
+from datetime import datetime
 from types import TracebackType
 from typing import Optional, Type
 
 from flask import current_app, request
 from flask_jwt_extended import current_user
 from loguru import logger
+from sqlalchemy import Engine, insert
 from sqlalchemy.orm import Session
 from werkzeug.exceptions import UnsupportedMediaType
 
 from models.events import OpsEvent, OpsEventStatus, OpsEventType
+from models.utils import BatchWriter
 from ops_api.ops.auth.utils import get_request_ip_address
+from ops_api.ops.utils.request_logging import get_headers
+
+DEFAULT_OPS_EVENT_METADATA = (
+    "request.values",
+    "request.headers",
+    "request.remote_addr",
+    "request.remote_user",
+    "request.json",
+)
 
 
 class OpsEventHandler:
@@ -17,20 +29,23 @@ class OpsEventHandler:
         self.event_type = event_type
 
     def __enter__(self):
-        self.metadata.update(
-            {
-                "request.values": request.values,
-                "request.headers": {k: v for k, v in request.headers},
-                "request.remote_addr": get_request_ip_address(),
-                "request.remote_user": request.remote_user,
-            }
-        )
+        captured = current_app.config.get("OPS_EVENT_METADATA", DEFAULT_OPS_EVENT_METADATA)
 
-        try:
-            self.metadata["request.json"] = request.json
-        except UnsupportedMediaType:
-            if request.data:
-                self.metadata["request.data"] = request.data
+        if "request.values" in captured:
+            self.metadata["request.values"] = request.values.to_dict()
+        if "request.headers" in captured:
+            self.metadata["request.headers"] = get_headers(request.headers)
+        if "request.remote_addr" in captured:
+            self.metadata["request.remote_addr"] = get_request_ip_address()
+        if "request.remote_user" in captured:
+            self.metadata["request.remote_user"] = request.remote_user
+
+        if "request.json" in captured:
+            try:
+                self.metadata["request.json"] = request.json
+            except UnsupportedMediaType:
+                if request.data:
+                    self.metadata["request.data"] = request.data
 
         return self
 
@@ -51,12 +66,17 @@ class OpsEventHandler:
             event_status=event_status,
             event_details=self.metadata,
             created_by=current_user.id if current_user else None,
+            created_on=datetime.now(),
         )
 
-        with Session(current_app.engine) as session:
-            session.add(event)
-            session.commit()
-            current_app.logger.info(f"EVENT: {event.to_dict()}")
+        ops_event_writer = getattr(current_app, "ops_event_writer", None)
+        if ops_event_writer:
+            ops_event_writer.put(event)
+        else:
+            with Session(current_app.audit_engine, expire_on_commit=False) as session:
+                session.add(event)
+                session.commit()
+        current_app.logger.info(f"EVENT: {self.event_type.name} {event_status.name}")
 
         if isinstance(exc_val, Exception):
             logger.error(f"EVENT ({exc_type}): {exc_val}")
@@ -67,3 +87,48 @@ class OpsEventHandler:
         if hasattr(request, "message_bus"):
             logger.info(f"Publishing event {self.event_type.name}")
             request.message_bus.publish(self.event_type.name, event)
+
+
+class OpsEventWriter(BatchWriter):
+    """
+    The async pipeline mode of OpsEvent recording.
+
+    The events are queued when the OpsEventHandler exits and a background thread inserts them
+    in batches using the audit connection pool, so recording an event doesn't wait for
+    a database round trip.
+    """
+
+    name = "ops-event-writer"
+
+    def __init__(self, engine: Engine, max_queue_size: int = 10000, batch_size: int = 500, flush_interval: float = 1.0):
+        self.engine = engine
+        super().__init__(max_queue_size, batch_size, flush_interval)
+
+    def _write(self, events: list[OpsEvent]):
+        rows = [
+            {
+                "event_type": event.event_type,
+                "event_status": event.event_status,
+                "event_details": event.event_details,
+                "created_by": event.created_by,
+                "created_on": event.created_on,
+            }
+            for event in events
+        ]
+        try:
+            with Session(self.engine) as session:
+                session.execute(insert(OpsEvent), rows)
+                session.commit()
+            logger.debug(f"Wrote {len(rows)} {OpsEvent.__tablename__} records")
+        except Exception:
+            if len(rows) == 1:
+                raise
+            # write the events one at a time so a single bad event doesn't lose the whole batch
+            logger.exception(f"Failed to write {len(rows)} {OpsEvent.__tablename__} records, retrying one at a time")
+            for row in rows:
+                try:
+                    with Session(self.engine) as session:
+                        session.execute(insert(OpsEvent), [row])
+                        session.commit()
+                except Exception:
+                    logger.exception(f"Failed to write {OpsEvent.__tablename__} record {row['event_type']}")
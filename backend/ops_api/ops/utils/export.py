@@ -0,0 +1,190 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Iterable, Iterator
+from xml.sax.saxutils import escape
+
+from flask import Response, current_app, request, stream_with_context
+from loguru import logger
+from sqlalchemy import Select
+
+EXPORT_FORMATS = ("csv", "xlsx")
+
+EXPORT_MIMETYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# the first characters of the text that spreadsheets read from a CSV as a formula
+CSV_FORMULA_CHARACTERS = ("=", "+", "-", "@", "\t", "\r")
+
+# the characters that aren't allowed in XML (the cells are written as inline strings)
+INVALID_XML_CHARACTERS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+XLSX_SHEET_END = "</sheetData></worksheet>"
+
+
+def iter_rows(stmt: Select, batch_size: int) -> Iterator[list]:
+    """
+    The rows of the (column) statement in batches, read from a server side cursor.
+    """
+    result = current_app.db_session.execute(stmt.execution_options(yield_per=batch_size))
+    yield from result.partitions()
+
+
+def format_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def format_csv_value(value: Any) -> Any:
+    """The value of a CSV cell, text that would be read as a formula is quoted with a leading apostrophe."""
+    value = format_value(value)
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_CHARACTERS):
+        return f"'{value}"
+    return value
+
+
+def generate_csv(headers: list[str], batches: Iterable[list]) -> Iterator[str]:
+    """The CSV of the rows, a chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for batch in batches:
+        writer.writerows([format_csv_value(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+class _StreamBuffer(io.RawIOBase):
+    """An unseekable file the zip is written to, its content is taken (and cleared) after each batch."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _xlsx_cell(value: Any) -> str:
+    value = format_value(value)
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f"<c><v>{value}</v></c>"
+    text = escape(INVALID_XML_CHARACTERS.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values: Iterable) -> str:
+    return "<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+def generate_xlsx(headers: list[str], batches: Iterable[list], sheet_name: str) -> Iterator[bytes]:
+    """
+    The XLSX workbook (a single sheet of inline strings and numbers) of the rows, written row by row.
+
+    The sheet is a deflated entry of the zip written as the rows are read, so only a batch of rows is held
+    in memory at a time.
+    """
+    stream = _StreamBuffer()
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in XLSX_PARTS.items():
+            workbook.writestr(name, content)
+        workbook.writestr("xl/workbook.xml", XLSX_WORKBOOK.format(sheet_name=escape(sheet_name)))
+        with workbook.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write((XLSX_SHEET_START + _xlsx_row(headers)).encode())
+            for batch in batches:
+                sheet.write("".join(_xlsx_row(row) for row in batch).encode())
+                yield stream.take()
+            sheet.write(XLSX_SHEET_END.encode())
+    yield stream.take()
+
+
+def make_export_response(stmt: Select, export_format: str, name: str) -> Response:
+    """
+    Stream the rows of the (column) statement as a CSV or XLSX attachment, the column labels are the headers.
+    """
+    batch_size = current_app.config.get("EXPORT_BATCH_SIZE", 2000)
+    headers = [column.name for column in stmt.selected_columns]
+
+    def generate():
+        try:
+            batches = iter_rows(stmt, batch_size)
+            if export_format == "xlsx":
+                yield from generate_xlsx(headers, batches, name)
+            else:
+                yield from generate_csv(headers, batches)
+        except Exception:
+            # the status was already sent, the client gets a truncated file
+            logger.exception(f"Failed to export {request.path}")
+            raise
+
+    response = Response(stream_with_context(generate()), mimetype=EXPORT_MIMETYPES[export_format])
+    response.headers["Content-Disposition"] = (
+        f'attachment; filename="{name}-{date.today().isoformat()}.{export_format}"'
+    )
+    return response
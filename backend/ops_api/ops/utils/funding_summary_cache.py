@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from flask import current_app
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from models import CAN, BudgetLineItem, CANFundingBudget, CANFundingDetails, CANFundingReceived, Division, Portfolio
+
+# the tag of the entries computed from all the CANs (or the CANs matching filters)
+ANY_CAN = ("can", "*")
+# the tag of every entry
+ALL = ("*",)
+
+# the classes whose changes only affect the summaries of their CAN (and its portfolio)
+CAN_FUNDING_CLASSES = (CANFundingBudget, CANFundingReceived, BudgetLineItem)
+# the classes whose changes may affect any summary
+SHARED_CLASSES = (CANFundingDetails, Portfolio, Division)
+
+FUNDING_SUMMARY_TAGS_KEY = "funding_summary_tags"
+
+
+class FundingSummaryCache:
+    """
+    The funding summaries (by scope, fiscal year and filters) cached in the process.
+
+    Entries expire after FUNDING_SUMMARY_CACHE_TTL seconds (0 disables the cache) and the least recently used
+    entries are dropped once there are more than FUNDING_SUMMARY_CACHE_SIZE. Each entry has tags for the CANs and
+    portfolios it is computed from and is invalidated when a change to one of them is committed in this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, Any, frozenset]] = OrderedDict()
+        # incremented by every invalidation so a summary computed before it is not cached after it
+        self.generation = 0
+
+    def get(self, key: Hashable, ttl: float) -> Optional[Any]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+            if time.monotonic() - cached[0] >= ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return cached[1]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[tuple], max_size: int, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic(), value, frozenset(tags) | {ALL})
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tags: Iterable[tuple] = (ALL,)) -> None:
+        """Invalidate the entries with any of the tags (all the entries by default)."""
+        tags = set(tags)
+        with self._lock:
+            self.generation += 1
+            for key in [key for key, (_, _, entry_tags) in self._entries.items() if entry_tags & tags]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+funding_summary_cache = FundingSummaryCache()
+
+
+def get_cached_funding_summary(key: Hashable, tags: Iterable[tuple], get_summary: Callable[[], Any]) -> Any:
+    """
+    Get the funding summary from the cache or compute it with get_summary and cache it.
+
+    N.B. The cached summary is shared, it must not be modified.
+    """
+    ttl = current_app.config.get("FUNDING_SUMMARY_CACHE_TTL", 300)
+    if not ttl:
+        return get_summary()
+
+    summary = funding_summary_cache.get(key, ttl)
+    if summary is None:
+        generation = funding_summary_cache.generation
+        summary = get_summary()
+        max_size = current_app.config.get("FUNDING_SUMMARY_CACHE_SIZE", 256)
+        funding_summary_cache.set(key, summary, tags, max_size, generation)
+    return summary
+
+
+def _get_values(obj, attribute: str) -> set:
+    """The current and the previous (flushed) values of an attribute."""
+    history = inspect(obj).attrs[attribute].history
+    return {value for value in (getattr(obj, attribute, None), *history.deleted) if value is not None}
+
+
+def get_invalidated_tags(session: Session, resolve_portfolios: bool = True) -> set[tuple]:
+    """
+    The tags of the funding summaries affected by the flushed changes of the session.
+
+    Without resolve_portfolios the portfolios of the changed budgets and budget line items aren't looked up,
+    the changes invalidate all the summaries instead.
+    """
+    tags = set()
+    can_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, SHARED_CLASSES):
+            return {ALL}
+        if isinstance(obj, CAN):
+            tags.add(ANY_CAN)
+            tags.update(("can", can_id) for can_id in _get_values(obj, "id"))
+            tags.update(("portfolio", portfolio_id) for portfolio_id in _get_values(obj, "portfolio_id"))
+        elif isinstance(obj, CAN_FUNDING_CLASSES):
+            can_ids.update(_get_values(obj, "can_id"))
+
+    if can_ids and not resolve_portfolios:
+        return {ALL}
+    if can_ids:
+        tags.add(ANY_CAN)
+        tags.update(("can", can_id) for can_id in can_ids)
+        portfolio_ids = session.scalars(select(CAN.portfolio_id).where(CAN.id.in_(can_ids)))
+        tags.update(("portfolio", portfolio_id) for portfolio_id in portfolio_ids)
+    return tags
+
+
+@event.listens_for(Session, "after_flush")
+def collect_funding_summary_tags(session: Session, flush_context) -> None:
+    # with an empty cache the invalidation only has to stop the summaries being computed from being cached
+    tags = get_invalidated_tags(session, resolve_portfolios=len(funding_summary_cache) > 0)
+    if tags:
+        session.info.setdefault(FUNDING_SUMMARY_TAGS_KEY, set()).update(tags)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def collect_bulk_funding_summary_tags(orm_execute_state: ORMExecuteState) -> None:
+    # bulk INSERT/UPDATE/DELETE statements don't flush objects, their rows are unknown
+    if orm_execute_state.is_select or orm_execute_state.bind_mapper is None:
+        return
+    if issubclass(orm_execute_state.bind_mapper.class_, (CAN, *CAN_FUNDING_CLASSES, *SHARED_CLASSES)):
+        orm_execute_state.session.info.setdefault(FUNDING_SUMMARY_TAGS_KEY, set()).add(ALL)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_funding_summaries(session: Session) -> None:
+    tags = session.info.pop(FUNDING_SUMMARY_TAGS_KEY, None)
+    if tags:
+        funding_summary_cache.invalidate(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_funding_summary_tags(session: Session) -> None:
+    session.info.pop(FUNDING_SUMMARY_TAGS_KEY, None)
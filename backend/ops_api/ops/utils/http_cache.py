@@ -0,0 +1,133 @@
+import hashlib
+from datetime import date, datetime, timezone
+from functools import wraps
+from typing import Callable, NamedTuple, Optional
+
+from flask import Response, current_app, request
+from flask_jwt_extended import current_user
+from sqlalchemy import func, select
+
+from models import OpsDBHistory
+from ops_api.ops.utils.streaming import get_stream_format
+
+# changes of these classes don't change the responses of the cached endpoints
+IGNORED_CLASS_NAMES = ("UserSession",)
+
+# the number of the latest OpsDBHistory records counted so records committed after a record with
+# a higher id (by a concurrent transaction) still change the version
+RECENT_HISTORY_WINDOW = 1000
+
+
+class DataVersion(NamedTuple):
+    latest_id: int
+    recent_count: int
+    last_modified: Optional[datetime]
+
+
+def get_data_version() -> DataVersion:
+    """
+    A cheap version stamp of the data from the OpsDBHistory records (written for every change), read with one query.
+    """
+    latest = (
+        select(OpsDBHistory.id, OpsDBHistory.created_on)
+        .where(OpsDBHistory.class_name.not_in(IGNORED_CLASS_NAMES))
+        .order_by(OpsDBHistory.id.desc())
+        .limit(1)
+        .subquery()
+    )
+    recent_count = (
+        select(func.count())
+        .where(
+            OpsDBHistory.id > latest.c.id - RECENT_HISTORY_WINDOW,
+            OpsDBHistory.class_name.not_in(IGNORED_CLASS_NAMES),
+        )
+        .scalar_subquery()
+    )
+    row = current_app.db_session.execute(select(latest.c.id, latest.c.created_on, recent_count)).first()
+    if row is None:
+        return DataVersion(0, 0, None)
+
+    latest_id, created_on, count = row
+    last_modified = created_on.replace(tzinfo=timezone.utc, microsecond=0) if created_on else None
+    return DataVersion(latest_id, count, last_modified)
+
+
+def is_enabled() -> bool:
+    """
+    Whether the validators are used: HTTP_CACHE_ENABLED is set and the audit pipeline is synchronous.
+
+    The async audit pipeline writes the OpsDBHistory records after the commit, so a request right after a write could
+    still validate the ETag of the data before it.
+    """
+    return bool(current_app.config.get("HTTP_CACHE_ENABLED", False)) and (
+        current_app.config.get("AUDIT_PIPELINE_MODE", "sync") != "async"
+    )
+
+
+def make_etag(version: DataVersion) -> str:
+    # the responses depend on the user (permissions), the query parameters, the (Accept header) negotiated
+    # streaming format and the current (fiscal year) date
+    user_id = getattr(current_user, "id", None)
+    key = (
+        f"{current_app.config.get('HTTP_CACHE_KEY', '')}:{version.latest_id}:{version.recent_count}:"
+        f"{user_id}:{request.full_path}:{get_stream_format()}:{date.today()}"
+    )
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def get_cache_control(cache_control: Optional[str]) -> str:
+    endpoint_cache_control = current_app.config.get("HTTP_CACHE_CONTROL_ENDPOINTS", {}).get(request.endpoint)
+    return endpoint_cache_control or cache_control or current_app.config.get("HTTP_CACHE_CONTROL", "private, no-cache")
+
+
+def is_not_modified(etag: str, last_modified: Optional[datetime]) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime], cache_control: str):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers["Cache-Control"] = cache_control
+    response.vary.add("Authorization")
+    response.vary.add("Accept")
+
+
+def conditional_get(cache_control: Optional[str] = None) -> Callable:
+    """
+    Add ETag/Last-Modified validators to the (200) responses of a GET endpoint and answer conditional requests
+    (If-None-Match/If-Modified-Since) that are still valid with a 304 response before running the endpoint.
+
+    The Cache-Control header is the given policy, unless HTTP_CACHE_CONTROL_ENDPOINTS has one for the endpoint.
+    Nothing is done (and the data version isn't read) unless the validators are enabled (see is_enabled).
+
+    N.B. Use below the jwt_required/is_authorized decorator, the validators depend on the user.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs) -> Response:
+            if not is_enabled():
+                return view(*args, **kwargs)
+
+            # the version is read before the view, so the ETag is never of newer data than the response
+            version = get_data_version()
+            etag = make_etag(version)
+            policy = get_cache_control(cache_control)
+
+            if is_not_modified(etag, version.last_modified):
+                response = Response(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            set_validators(response, etag, version.last_modified, policy)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,108 @@
+from functools import cache
+from typing import Optional
+
+from marshmallow import Schema, fields
+from marshmallow_sqlalchemy.fields import Related, RelatedList
+from sqlalchemy import inspect
+from sqlalchemy.orm import Mapper, RelationshipDirection, RelationshipProperty, joinedload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from models import CAN, BaseModel, BudgetLineItem
+
+MAX_LOADER_DEPTH = 5
+
+# Response fields that are plain python properties on the model but only read relationships,
+# mapped to the relationship path they read (so they can be eager loaded like a relationship).
+PROPERTY_RELATIONSHIP_PATHS: dict[tuple[type[BaseModel], str], tuple[str, ...]] = {
+    (BudgetLineItem, "team_members"): ("agreement", "team_members"),
+    (CAN, "active_period"): ("funding_details",),
+    (CAN, "funding_method"): ("funding_details",),
+    (CAN, "funding_frequency"): ("funding_details",),
+    (CAN, "funding_type"): ("funding_details",),
+    (CAN, "obligate_by"): ("funding_details",),
+    (CAN, "projects"): ("budget_line_items", "agreement", "project"),
+}
+
+# relationship loading strategies that can't be changed with a loader option
+NON_EAGER_LAZY_STRATEGIES = {"dynamic", "write_only", "noload", "raise", "raise_on_sql"}
+
+
+def get_loader_options(model: type[BaseModel], schema: Schema | type[Schema]) -> tuple[LoaderOption, ...]:
+    """
+    Build the eager loading options (a selectinload/joinedload tree) for a query of the model
+    from the relationships that the (nested) fields of the response schema serialize.
+
+    Collections are loaded with selectinload and many-to-one relationships with joinedload so
+    the number of queries needed to serialize the results doesn't depend on the number of rows.
+
+    The options are built once per model and schema class.
+    """
+    schema_class = schema if isinstance(schema, type) else type(schema)
+    return _get_loader_options(model, schema_class)
+
+
+@cache
+def _get_loader_options(model: type[BaseModel], schema_class: type[Schema]) -> tuple[LoaderOption, ...]:
+    return tuple(_get_schema_loader_options(inspect(model), schema_class(), MAX_LOADER_DEPTH))
+
+
+def _get_schema_loader_options(mapper: Mapper, schema: Optional[Schema], depth: int) -> list[LoaderOption]:
+    if schema is None or depth == 0:
+        return []
+
+    # fields reading the same relationships (e.g. the CAN properties of the funding details) get one option
+    nested_schemas: dict[tuple[RelationshipProperty, ...], list[Schema]] = {}
+    for name, field in schema.fields.items():
+        attribute = field.attribute or name
+        path = _get_relationship_path(mapper, attribute)
+        if path:
+            schemas = nested_schemas.setdefault(tuple(path), [])
+            nested_schema = _get_nested_schema(field)
+            if nested_schema is not None:
+                schemas.append(nested_schema)
+    return [_get_path_loader_option(list(path), schemas, depth) for path, schemas in nested_schemas.items()]
+
+
+def _get_relationship_path(mapper: Mapper, attribute: str) -> list[RelationshipProperty]:
+    """
+    The relationships read by the attribute of the mapped class (or one of its polymorphic subclasses).
+    """
+    for class_mapper in mapper.self_and_descendants:
+        names = PROPERTY_RELATIONSHIP_PATHS.get((class_mapper.class_, attribute), (attribute,))
+        path = []
+        current_mapper = class_mapper
+        for relationship_name in names:
+            relationship = current_mapper.relationships.get(relationship_name)
+            if relationship is None or relationship.lazy in NON_EAGER_LAZY_STRATEGIES:
+                break
+            path.append(relationship)
+            current_mapper = relationship.mapper
+        else:
+            return path
+    return []
+
+
+def _get_path_loader_option(path: list[RelationshipProperty], schemas: list[Schema], depth: int) -> LoaderOption:
+    option = None
+    for relationship in path:
+        loader = joinedload if relationship.direction == RelationshipDirection.MANYTOONE else selectinload
+        attribute = getattr(relationship.parent.class_, relationship.key)
+        option = loader(attribute) if option is None else getattr(option, loader.__name__)(attribute)
+
+    nested_options = [
+        nested_option
+        for schema in schemas
+        for nested_option in _get_schema_loader_options(path[-1].mapper, schema, depth - 1)
+    ]
+    return option.options(*nested_options) if nested_options else option
+
+
+def _get_nested_schema(field: fields.Field) -> Optional[Schema]:
+    if isinstance(field, (Related, RelatedList)):
+        # serializes the primary keys of the related objects only
+        return None
+    if isinstance(field, fields.List):
+        return _get_nested_schema(field.inner)
+    if isinstance(field, fields.Nested):
+        return field.schema
+    return None
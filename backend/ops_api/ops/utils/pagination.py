@@ -0,0 +1,276 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
+from urllib.parse import urlencode
+
+from flask import current_app, request
+from marshmallow import ValidationError
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from werkzeug.datastructures import MultiDict
+
+# the query parameters of the pagination (and the streaming), not filters of the list APIs
+PAGINATION_PARAMETERS = ("limit", "cursor", "count", "stream")
+
+COUNT_TYPES = ("exact", "estimated")
+
+# the response headers of the pagination (exposed to the frontend by CORS)
+PAGINATION_HEADERS = ["Link", "X-Next-Cursor", "X-Prev-Cursor", "X-Total-Count", "X-Total-Count-Estimated"]
+
+# the values the nulls of a nullable column are ordered (and compared) as, the lowest of the column's type
+NULL_ORDER_VALUES = {datetime: datetime.min, date: date.min, str: ""}
+
+
+@dataclass
+class KeysetOrder:
+    """
+    The columns a list is ordered by (all ascending or all descending) for the keyset pagination.
+
+    The columns must identify a row (end with the primary key). The nulls of a nullable column (e.g. created_on)
+    are ordered as the lowest value of its type (see NULL_ORDER_VALUES), so that a cursor of a row with a null
+    can be compared with the other rows (a comparison with NULL matches no rows).
+    """
+
+    columns: Sequence[InstrumentedAttribute]
+    descending: bool = False
+
+    def __post_init__(self):
+        self.keys = []
+        self.null_values = []
+        for column in self.columns:
+            null_value = None
+            if column.expression.nullable:
+                python_type = column.type.python_type
+                if python_type not in NULL_ORDER_VALUES:
+                    raise ValueError(f"The nullable column {column} of type {python_type} can't be ordered.")
+                null_value = NULL_ORDER_VALUES[python_type]
+            self.keys.append(column if null_value is None else func.coalesce(column, null_value))
+            self.null_values.append(null_value)
+
+    def order_by(self, backward: bool = False) -> list:
+        descending = self.descending != backward
+        return [key.desc() if descending else key.asc() for key in self.keys]
+
+    def after(self, values: list, backward: bool = False):
+        """The where clause of the rows after (or before, backward) the row with the values."""
+        key = tuple_(*self.keys)
+        values = tuple_(*values)
+        return key < values if self.descending != backward else key > values
+
+    def get_values(self, item) -> list:
+        values = [getattr(item, column.key) for column in self.columns]
+        return [
+            null_value if value is None else value for value, null_value in zip(values, self.null_values, strict=True)
+        ]
+
+    def sort(self, items: list, backward: bool = False) -> list:
+        return sorted(items, key=self.get_values, reverse=self.descending != backward)
+
+    def encode(self, item, backward: bool = False) -> str:
+        values = [
+            value.isoformat() if isinstance(value, (date, datetime)) else value for value in self.get_values(item)
+        ]
+        cursor = json.dumps({"k": values, "b": backward}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(cursor.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> tuple[list, bool]:
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            values = data["k"]
+            if len(values) != len(self.columns):
+                raise ValueError("wrong number of keys")
+            values = [
+                _parse_value(value, column.type.python_type) for value, column in zip(values, self.columns, strict=True)
+            ]
+            return values, bool(data.get("b"))
+        except (ValueError, TypeError, KeyError) as e:
+            raise ValidationError({"cursor": ["Invalid cursor."]}) from e
+
+
+def _parse_value(value: Any, python_type: type) -> Any:
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+@dataclass
+class PageRequest:
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+    count: Optional[str] = None
+
+    @property
+    def is_paginated(self) -> bool:
+        return self.limit is not None or self.cursor is not None
+
+    @classmethod
+    def from_request(cls, default_limit: Optional[int] = None) -> "PageRequest":
+        errors = {}
+        max_limit = current_app.config.get("PAGINATION_MAX_LIMIT", 1000)
+        limit = request.args.get("limit", default_limit or current_app.config.get("PAGINATION_DEFAULT_LIMIT"))
+        if limit is not None:
+            try:
+                limit = int(limit)
+                if limit < 1:
+                    raise ValueError()
+                limit = min(limit, max_limit)
+            except ValueError:
+                errors["limit"] = ["Must be a positive integer."]
+
+        cursor = request.args.get("cursor") or None
+        if cursor is not None and limit is None:
+            limit = current_app.config.get("PAGINATION_CURSOR_LIMIT", 100)
+
+        count = request.args.get("count") or None
+        if count is not None and count not in COUNT_TYPES:
+            errors["count"] = [f"Must be one of: {', '.join(COUNT_TYPES)}."]
+
+        if errors:
+            raise ValidationError(errors)
+        return cls(limit, cursor, count)
+
+
+@dataclass
+class Page:
+    items: list
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_estimated: bool = False
+
+
+def get_query_args() -> MultiDict:
+    """The query parameters of the request without the pagination parameters."""
+    args = request.args.copy()
+    for parameter in PAGINATION_PARAMETERS:
+        args.poplist(parameter)
+    return args
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, compiled with the statement's bind parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, stmt: Select):
+        self.stmt = stmt
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler, **kw) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.stmt, **kw)}"
+
+
+def count_rows(session: Session, stmt: Select, estimated: bool = False) -> int:
+    """
+    The number of rows of the statement, the planner's estimate (from EXPLAIN, no rows are read) if estimated.
+
+    The EXPLAIN runs in a savepoint so the rows can still be counted in the transaction if it fails.
+    """
+    stmt = stmt.order_by(None).limit(None).offset(None)
+    if estimated:
+        try:
+            with session.begin_nested():
+                plan = session.execute(_Explain(stmt)).scalar()
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception:
+            current_app.logger.exception("Failed to estimate the row count, counting the rows")
+    return session.scalar(select(func.count()).select_from(stmt.subquery()))
+
+
+def fetch_page(
+    session: Session, stmt: Select | Sequence[Select], order: KeysetOrder, page_request: PageRequest
+) -> Page:
+    """
+    Get a page of the (single entity) statement with keyset pagination.
+
+    The page starts after the row of the cursor (or ends before it for a prev cursor) so getting a page doesn't
+    depend on the number of rows before it, unlike OFFSET.
+
+    The items of several statements (e.g. of the classes of a polymorphic model) are paginated together,
+    unpaginated they are returned one statement after the other.
+    """
+    stmts = [stmt] if isinstance(stmt, Select) else list(stmt)
+    total = None
+    if page_request.count:
+        total = sum(count_rows(session, stmt, estimated=page_request.count == "estimated") for stmt in stmts)
+
+    if not page_request.is_paginated:
+        items = [item for stmt in stmts for item in session.scalars(stmt).unique()]
+        return Page(items, total=total, total_estimated=page_request.count == "estimated")
+
+    backward = False
+    values = None
+    if page_request.cursor:
+        values, backward = order.decode(page_request.cursor)
+
+    items = []
+    for stmt in stmts:
+        if values is not None:
+            stmt = stmt.where(order.after(values, backward))
+        stmt = stmt.order_by(None).order_by(*order.order_by(backward)).limit(page_request.limit + 1)
+        items.extend(session.scalars(stmt).unique())
+    if len(stmts) > 1:
+        items = order.sort(items, backward)
+
+    has_more = len(items) > page_request.limit
+    items = items[: page_request.limit]
+    if backward:
+        items.reverse()
+
+    return make_page(items, order, page_request, has_more, backward, total)
+
+
+def make_page(
+    items: list,
+    order: KeysetOrder,
+    page_request: PageRequest,
+    has_more: bool,
+    backward: bool = False,
+    total: Optional[int] = None,
+) -> Page:
+    """The page of the items with the cursors of the pages after and before it."""
+    page = Page(items, total=total, total_estimated=page_request.count == "estimated")
+    if items:
+        has_next = has_more if not backward else True
+        has_prev = has_more if backward else page_request.cursor is not None
+        page.next_cursor = order.encode(items[-1]) if has_next else None
+        page.prev_cursor = order.encode(items[0], backward=True) if has_prev else None
+    return page
+
+
+def get_page_url(cursor: str) -> str:
+    args = request.args.copy()
+    args["cursor"] = cursor
+    return f"{request.base_url}?{urlencode(list(args.items(multi=True)))}"
+
+
+def set_page_headers(response, page: Page):
+    """
+    Set the pagination headers of a list response (the body is the list of items).
+
+    Link has the URLs of the next/prev pages, X-Next-Cursor/X-Prev-Cursor their cursors and X-Total-Count the
+    (exact or estimated) number of items when it was requested.
+    """
+    links = []
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+        links.append(f'<{get_page_url(page.next_cursor)}>; rel="next"')
+    if page.prev_cursor:
+        response.headers["X-Prev-Cursor"] = page.prev_cursor
+        links.append(f'<{get_page_url(page.prev_cursor)}>; rel="prev"')
+    if links:
+        response.headers["Link"] = ", ".join(links)
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+        if page.total_estimated:
+            response.headers["X-Total-Count-Estimated"] = "true"
+    return response
@@ -0,0 +1,128 @@
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# upper bounds (seconds) of the histogram buckets
+HISTOGRAM_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    Counts observations in fixed (cumulative when exported) buckets like a Prometheus histogram.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> list[tuple[str, int]]:
+        result = []
+        total = 0
+        for bound, count in zip((*map(str, self.buckets), "+Inf"), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class PoolMetrics:
+    """
+    The connection wait time and checkout duration histograms and the overflow/timeout counts of a pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait_time = Histogram()
+        self.checkout_duration = Histogram()
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+
+    def observe_wait(self, duration: float, overflow: bool, timed_out: bool):
+        with self._lock:
+            self.wait_time.observe(duration)
+            self.overflow_checkouts += int(overflow)
+            self.timeouts += int(timed_out)
+
+    def observe_checkout(self, duration: float):
+        with self._lock:
+            self.checkout_duration.observe(duration)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    A QueuePool that records how long getting a connection waits and how long connections are checked out.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe_wait(time.perf_counter() - start, overflow=False, timed_out=True)
+            raise
+        # other errors (e.g. failing to connect) aren't waits for a connection of the pool
+        self.metrics.observe_wait(time.perf_counter() - start, overflow=self._overflow > 0, timed_out=False)
+        record.info["checkout_start"] = time.perf_counter()
+        return record
+
+    def _do_return_conn(self, record):
+        start = record.info.pop("checkout_start", None)
+        if start is not None:
+            self.metrics.observe_checkout(time.perf_counter() - start)
+        super()._do_return_conn(record)
+
+
+def render_pool_metrics(pools: dict[str, QueuePool]) -> list[str]:
+    """
+    The metrics of the (named) pools in the Prometheus text format.
+    """
+    gauges = {
+        "ops_db_pool_size": lambda pool: pool.size(),
+        "ops_db_pool_checked_out": lambda pool: pool.checkedout(),
+        "ops_db_pool_overflow": lambda pool: max(pool.overflow(), 0),
+    }
+    counters = {
+        "ops_db_pool_overflow_checkouts_total": lambda metrics: metrics.overflow_checkouts,
+        "ops_db_pool_timeouts_total": lambda metrics: metrics.timeouts,
+    }
+    histograms = {
+        "ops_db_pool_wait_seconds": lambda metrics: metrics.wait_time,
+        "ops_db_pool_checkout_seconds": lambda metrics: metrics.checkout_duration,
+    }
+    pool_metrics = {name: pool.metrics for name, pool in pools.items() if isinstance(pool, InstrumentedQueuePool)}
+
+    lines = []
+    for metric_name, get_value in gauges.items():
+        lines.append(f"# TYPE {metric_name} gauge")
+        lines.extend(f'{metric_name}{{pool="{name}"}} {get_value(pool)}' for name, pool in pools.items())
+    for metric_name, get_value in counters.items():
+        lines.append(f"# TYPE {metric_name} counter")
+        lines.extend(f'{metric_name}{{pool="{name}"}} {get_value(metrics)}' for name, metrics in pool_metrics.items())
+    for metric_name, get_histogram in histograms.items():
+        lines.append(f"# TYPE {metric_name} histogram")
+        for name, metrics in pool_metrics.items():
+            with metrics._lock:
+                histogram = get_histogram(metrics)
+                for bound, count in histogram.cumulative_counts():
+                    lines.append(f'{metric_name}_bucket{{pool="{name}",le="{bound}"}} {count}')
+                lines.append(f'{metric_name}_sum{{pool="{name}"}} {histogram.sum}')
+                lines.append(f'{metric_name}_count{{pool="{name}"}} {histogram.count}')
+    return lines
@@ -2,9 +2,10 @@ from decimal import Decimal
 from typing import TypedDict
 
 from flask import current_app
-from sqlalchemy import and_, select
+from sqlalchemy import Row, func, select
 
-from models import CAN, BudgetLineItem, BudgetLineItemStatus, CANFundingBudget, Portfolio
+from models import CAN, BudgetLineItem, BudgetLineItemStatus, CANFundingBudget, CANFundingDetails, Portfolio
+from ops_api.ops.utils.funding_summary_cache import get_cached_funding_summary
 
 
 class FundingLineItem(TypedDict):
@@ -25,33 +26,53 @@ class TotalFunding(TypedDict):
     available_funding: FundingLineItem
 
 
-def _get_all_budgets(portfolio_id: int, fiscal_year: int) -> list[CANFundingBudget]:
+def _get_budget_totals(portfolio_id: int, fiscal_year: int) -> Row:
+    """Get the total and carry forward budgets of the portfolio's CANs for the fiscal year in one query."""
     stmt = (
-        select(CANFundingBudget)
-        .join(CAN)
+        select(
+            func.coalesce(func.sum(CANFundingBudget.budget), 0).label("total_funding"),
+            func.coalesce(
+                func.sum(CANFundingBudget.budget).filter(CANFundingBudget.fiscal_year != CANFundingDetails.fiscal_year),
+                0,
+            ).label("carry_forward_funding"),
+        )
+        .join(CAN, CAN.id == CANFundingBudget.can_id)
+        .outerjoin(CANFundingDetails, CANFundingDetails.id == CAN.funding_details_id)
         .where(CAN.portfolio_id == portfolio_id)
         .where(CANFundingBudget.fiscal_year == fiscal_year)
     )
 
-    return current_app.db_session.execute(stmt).scalars().all()
+    return current_app.db_session.execute(stmt).one()
+
+
+def _get_budget_line_item_totals(portfolio_id: int, fiscal_year: int) -> dict[BudgetLineItemStatus, Decimal]:
+    """Get the total amount of the portfolio's budget line items in the fiscal year for every status in one query."""
+    stmt = (
+        select(BudgetLineItem.status, func.sum(BudgetLineItem.amount))
+        .join(CAN, CAN.id == BudgetLineItem.can_id)
+        .where(CAN.portfolio_id == portfolio_id)
+        .where(BudgetLineItem.fiscal_year == fiscal_year)
+        .group_by(BudgetLineItem.status)
+    )
+
+    totals = {status: Decimal(0) for status in BudgetLineItemStatus}
+    for status, total in current_app.db_session.execute(stmt):
+        if status:
+            totals[status] = total or Decimal(0)
+
+    return totals
 
 
 def _get_total_fiscal_year_funding(portfolio_id: int, fiscal_year: int) -> Decimal:
-    return sum([b.budget for b in _get_all_budgets(portfolio_id, fiscal_year)]) or Decimal(0)
+    return _get_budget_totals(portfolio_id, fiscal_year).total_funding
 
 
 def _get_carry_forward_total(portfolio_id: int, fiscal_year: int) -> Decimal:
-    return sum([b.budget for b in _get_all_budgets(portfolio_id, fiscal_year) if b.is_carry_forward]) or Decimal(0)
+    return _get_budget_totals(portfolio_id, fiscal_year).carry_forward_funding
 
 
 def _get_budget_line_item_total_by_status(portfolio_id: int, fiscal_year: int, status: BudgetLineItemStatus) -> Decimal:
-    stmt = (
-        select(BudgetLineItem).join(CAN).where(and_(CAN.portfolio_id == portfolio_id, BudgetLineItem.status == status))
-    )
-
-    blis = current_app.db_session.execute(stmt).scalars().all()
-
-    return sum([bli.amount for bli in blis if bli.fiscal_year == fiscal_year]) or Decimal(0)
+    return _get_budget_line_item_totals(portfolio_id, fiscal_year)[status]
 
 
 def get_total_funding(
@@ -59,27 +80,23 @@ def get_total_funding(
     fiscal_year: int,
 ) -> TotalFunding:
     """Get the portfolio total funding for the given fiscal year."""
-    total_funding = _get_total_fiscal_year_funding(
-        portfolio_id=portfolio.id,
-        fiscal_year=fiscal_year,
-    )
-
-    carry_forward_funding = _get_carry_forward_total(
-        portfolio_id=portfolio.id,
-        fiscal_year=fiscal_year,
+    fiscal_year = int(fiscal_year) if fiscal_year else None
+    return get_cached_funding_summary(
+        ("portfolio", portfolio.id, fiscal_year),
+        [("portfolio", portfolio.id)],
+        lambda: _get_total_funding(portfolio.id, fiscal_year),
     )
 
-    planned_funding = _get_budget_line_item_total_by_status(
-        portfolio_id=portfolio.id, fiscal_year=fiscal_year, status=BudgetLineItemStatus.PLANNED
-    )
 
-    obligated_funding = _get_budget_line_item_total_by_status(
-        portfolio_id=portfolio.id, fiscal_year=fiscal_year, status=BudgetLineItemStatus.OBLIGATED
-    )
+def _get_total_funding(portfolio_id: int, fiscal_year: int) -> TotalFunding:
+    budget_totals = _get_budget_totals(portfolio_id=portfolio_id, fiscal_year=fiscal_year)
+    total_funding = budget_totals.total_funding
+    carry_forward_funding = budget_totals.carry_forward_funding
 
-    in_execution_funding = _get_budget_line_item_total_by_status(
-        portfolio_id=portfolio.id, fiscal_year=fiscal_year, status=BudgetLineItemStatus.IN_EXECUTION
-    )
+    budget_line_item_totals = _get_budget_line_item_totals(portfolio_id=portfolio_id, fiscal_year=fiscal_year)
+    planned_funding = budget_line_item_totals[BudgetLineItemStatus.PLANNED]
+    obligated_funding = budget_line_item_totals[BudgetLineItemStatus.OBLIGATED]
+    in_execution_funding = budget_line_item_totals[BudgetLineItemStatus.IN_EXECUTION]
 
     total_accounted_for = (
         sum(
@@ -0,0 +1,187 @@
+import random
+import sys
+import time
+from dataclasses import dataclass
+from enum import Enum
+
+from flask import Flask, Request, Response, current_app, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from werkzeug.datastructures import Headers
+
+from ops_api.ops.utils.core import is_unit_test
+
+LOG_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | "
+    "<level>{message}</level>"
+)
+
+# headers that are never written to the logs
+REDACTED_HEADERS = frozenset(["authorization", "cookie", "set-cookie"])
+
+
+class LogVerbosity(Enum):
+    # no request/response logs
+    NONE = "none"
+    # method, url, status code and timings
+    SUMMARY = "summary"
+    # the summary and the (sampled, truncated) headers and JSON bodies
+    FULL = "full"
+
+
+@dataclass
+class RequestLogState:
+    """
+    The timings of a request collected for its response log.
+    """
+
+    start: float
+    verbosity: LogVerbosity
+    sampled: bool
+    db_time: float = 0.0
+    db_queries: int = 0
+    json_time: float = 0.0
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """
+    A JSON provider that adds the time spent serializing JSON to the response log of the request.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        state = get_request_log_state()
+        if state is None:
+            return super().dumps(obj, **kwargs)
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            state.json_time += time.perf_counter() - start
+
+
+def configure_logging(app: Flask) -> None:
+    """
+    Configure the loguru sink (replacing the sink of a previously created app) and the JSON serialization timing.
+
+    The sink writes from a background thread (LOG_ENQUEUE) so logging doesn't block the request
+    and LOG_SERIALIZE writes the records as JSON (with the structured request/response fields).
+    """
+    # the default loguru sink or the sink of a previously created app
+    logger.remove()
+
+    log_level = app.config.get("LOG_LEVEL") or ("DEBUG" if is_unit_test() else "INFO")
+    logger.add(
+        sys.stdout,
+        format=format_record,
+        level=log_level,
+        enqueue=app.config.get("LOG_ENQUEUE", True),
+        serialize=app.config.get("LOG_SERIALIZE", False),
+    )
+
+    app.json = TimedJSONProvider(app)
+
+
+def format_record(record: dict) -> str:
+    if "details" in record["extra"]:
+        return LOG_FORMAT + " | {extra[details]}\n{exception}"
+    return LOG_FORMAT + "\n{exception}"
+
+
+def track_db_time(engine: Engine) -> None:
+    """
+    Add the number of queries and the time spent executing them to the response log of the request.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and get_request_log_state() is not None:
+            context._log_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_log_query_start", None)
+        state = get_request_log_state()
+        if start is not None and state is not None:
+            state.db_time += time.perf_counter() - start
+            state.db_queries += 1
+
+
+def get_request_log_state() -> RequestLogState | None:
+    if not has_request_context():
+        return None
+    return getattr(request, "log_state", None)
+
+
+def get_verbosity(endpoint: str | None) -> LogVerbosity:
+    verbosity = current_app.config.get("LOG_ENDPOINT_VERBOSITY", {}).get(endpoint)
+    return LogVerbosity(verbosity or current_app.config.get("LOG_VERBOSITY", LogVerbosity.FULL.value))
+
+
+def get_headers(headers: Headers) -> dict:
+    return {key: "[REDACTED]" if key.lower() in REDACTED_HEADERS else value for key, value in headers}
+
+
+def get_body(message: Request | Response) -> str | None:
+    """
+    The (truncated) JSON body of the request or response, streamed responses are never read.
+    """
+    if not message.is_json or (isinstance(message, Response) and message.is_streamed):
+        return None
+    max_length = current_app.config.get("LOG_BODY_MAX_LENGTH", 2000)
+    data = message.get_data()
+    body = data[:max_length].decode(errors="replace")
+    if len(data) > max_length:
+        body += f"... ({len(data)} bytes)"
+    return body
+
+
+def log_request() -> None:
+    verbosity = get_verbosity(request.endpoint)
+    sampled = random.random() < current_app.config.get("LOG_BODY_SAMPLE_RATE", 1.0)
+    request.log_state = RequestLogState(start=time.perf_counter(), verbosity=verbosity, sampled=sampled)
+
+    if verbosity == LogVerbosity.NONE:
+        return
+
+    fields = {"method": request.method, "url": request.url, "endpoint": request.endpoint}
+    if verbosity == LogVerbosity.FULL and sampled:
+        fields["details"] = {
+            "args": request.args.to_dict(flat=False),
+            "headers": get_headers(request.headers),
+            "json": get_body(request),
+        }
+    logger.info("Request: {method} {url}", **fields)
+
+
+def log_response(response: Response) -> None:
+    state = get_request_log_state()
+    if state is None or state.verbosity == LogVerbosity.NONE:
+        return
+
+    fields = {
+        "method": request.method,
+        "url": request.url,
+        "endpoint": request.endpoint,
+        "status_code": response.status_code,
+        "content_length": response.content_length,
+        "total_ms": round((time.perf_counter() - state.start) * 1000, 1),
+        "db_ms": round(state.db_time * 1000, 1),
+        "db_queries": state.db_queries,
+        "json_ms": round(state.json_time * 1000, 1),
+    }
+    # error responses are always logged in full
+    if state.verbosity == LogVerbosity.FULL and (state.sampled or response.status_code >= 400):
+        fields["details"] = {
+            "request_headers": get_headers(request.headers),
+            "response_headers": get_headers(response.headers),
+            "json": get_body(response),
+        }
+    logger.info(
+        "Response: {method} {url} {status_code} in {total_ms}ms "
+        "(db: {db_queries} queries in {db_ms}ms, json: {json_ms}ms)",
+        **fields,
+    )
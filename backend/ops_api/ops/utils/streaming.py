@@ -0,0 +1,94 @@
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+from flask import Response, current_app, request, stream_with_context
+from loguru import logger
+from marshmallow import ValidationError
+from sqlalchemy import Select, inspect
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+STREAM_FORMATS = ("json", "ndjson")
+
+
+def get_stream_format() -> Optional[str]:
+    """
+    The streaming format requested by the stream query parameter (json or ndjson) or an Accept header of NDJSON.
+    """
+    stream_format = request.args.get("stream")
+    if stream_format is None:
+        return "ndjson" if request.accept_mimetypes.best == NDJSON_MIMETYPE else None
+    if stream_format not in STREAM_FORMATS:
+        raise ValidationError({"stream": [f"Must be one of: {', '.join(STREAM_FORMATS)}."]})
+    return stream_format
+
+
+def iter_items(stmts: Select | Sequence[Select], batch_size: int) -> Iterator[list]:
+    """
+    The (single entity) items of the statements in batches, read from a server side cursor.
+
+    The cursor reads the primary keys of the rows and the items of each batch of keys are loaded (with the eager loads
+    of the statement) by another query, so only a batch of items is held in memory at a time. (The ORM's yield_per
+    can't be used for the items: the selectin loads of the eager loaded relationships inherit it and fail with it
+    when a do_orm_execute listener is registered.)
+    """
+    stmts = [stmts] if isinstance(stmts, Select) else stmts
+    session = current_app.db_session
+    for stmt in stmts:
+        primary_key = inspect(stmt.column_descriptions[0]["entity"]).primary_key[0]
+        keys_stmt = stmt.with_only_columns(primary_key, maintain_column_froms=True)
+        keys = session.scalars(keys_stmt.execution_options(yield_per=batch_size))
+        for batch_keys in keys.partitions():
+            positions = {key: position for position, key in enumerate(batch_keys)}
+            items = session.scalars(stmt.where(primary_key.in_(batch_keys))).unique().all()
+            yield sorted(items, key=lambda item: positions[inspect(item).identity[0]])
+
+
+def generate_json(
+    batches: Iterable[list],
+    serialize: Callable[[list], list[dict]],
+    stream_format: str,
+) -> Iterator[str]:
+    """The JSON array (or the NDJSON lines) of the serialized items, a chunk per batch."""
+    dumps = current_app.json.dumps
+    first = True
+    if stream_format == "json":
+        yield "["
+    for batch in batches:
+        items = [dumps(data) for data in serialize(batch)]
+        if not items:
+            continue
+        if stream_format == "ndjson":
+            yield "\n".join(items) + "\n"
+        else:
+            yield ("" if first else ",") + ",".join(items)
+        first = False
+    if stream_format == "json":
+        yield "]"
+
+
+def make_streamed_response(
+    stmts: Select | Sequence[Select],
+    serialize: Callable[[list], list[dict]],
+    stream_format: str,
+) -> Response:
+    """
+    Stream the items of the statements as a JSON array or as NDJSON (one item per line).
+
+    The items are serialized a batch at a time by serialize (which can also load data for the whole batch) and
+    written to the response as they are read, so the memory doesn't grow with the number of items.
+    """
+    batch_size = current_app.config.get("STREAMING_BATCH_SIZE", 500)
+
+    def generate():
+        try:
+            yield from generate_json(iter_items(stmts, batch_size), serialize, stream_format)
+        except Exception:
+            # the status was already sent, the client gets a truncated response
+            logger.exception(f"Failed to stream {request.path}")
+            raise
+
+    mimetype = NDJSON_MIMETYPE if stream_format == "ndjson" else "application/json"
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    # the format can be negotiated by the Accept header
+    response.vary.add("Accept")
+    return response
@@ -52,8 +52,10 @@ from ops_api.ops.resources.cans import CANItemAPI, CANListAPI, CANsByPortfolioAP
 from ops_api.ops.resources.change_requests import ChangeRequestListAPI, ChangeRequestReviewAPI
 from ops_api.ops.resources.contract import ContractItemAPI, ContractListAPI
 from ops_api.ops.resources.divisions import DivisionsItemAPI, DivisionsListAPI
+from ops_api.ops.resources.exports import AgreementsExportAPI, BudgetLineItemsExportAPI
 from ops_api.ops.resources.health_check import HealthCheckAPI
 from ops_api.ops.resources.history import OpsDBHistoryListAPI
+from ops_api.ops.resources.metrics import MetricsAPI
 from ops_api.ops.resources.notifications import NotificationItemAPI, NotificationListAPI
 from ops_api.ops.resources.portfolio_calculate_funding import PortfolioCalculateFundingAPI
 from ops_api.ops.resources.portfolio_cans import PortfolioCansAPI
@@ -81,6 +83,7 @@ from ops_api.ops.utils.version import VersionAPI
 # AGREEMENT ENDPOINTS
 AGREEMENT_ITEM_API_VIEW_FUNC = AgreementItemAPI.as_view("agreements-item", Agreement)
 AGREEMENT_LIST_API_VIEW_FUNC = AgreementListAPI.as_view("agreements-group", Agreement)
+AGREEMENTS_EXPORT_API_VIEW_FUNC = AgreementsExportAPI.as_view("agreements-export", Agreement)
 AGREEMENT_REASON_LIST_API_VIEW_FUNC = AgreementReasonListAPI.as_view("agreement-reason-list")
 # Agreement History Endpoint - specialized from OpsDBHistory
 AGREEMENT_HISTORY_LIST_API_VIEW_FUNC = AgreementHistoryListAPI.as_view("agreement-history-group", OpsDBHistory)
@@ -114,6 +117,7 @@ CAN_FUNDING_RECEIVED_ITEM_API_VIEW_FUNC = CANFundingReceivedItemAPI.as_view(
 # BUDGET LINE ITEM ENDPOINTS
 BUDGET_LINE_ITEMS_ITEM_API_VIEW_FUNC = BudgetLineItemsItemAPI.as_view("budget-line-items-item", BudgetLineItem)
 BUDGET_LINE_ITEMS_LIST_API_VIEW_FUNC = BudgetLineItemsListAPI.as_view("budget-line-items-group", BudgetLineItem)
+BUDGET_LINE_ITEMS_EXPORT_API_VIEW_FUNC = BudgetLineItemsExportAPI.as_view("budget-line-items-export", BudgetLineItem)
 
 
 # PRODUCT SERVICE CODES ENDPOINTS
@@ -187,6 +191,9 @@ RESEARCH_TYPE_LIST_API_VIEW_FUNC = ResearchTypeListAPI.as_view("research-type-gr
 # HEALTH CHECK
 HEALTH_CHECK_VIEW_FUNC = HealthCheckAPI.as_view("health-check")
 
+# METRICS
+METRICS_VIEW_FUNC = MetricsAPI.as_view("metrics")
+
 # OPS DB HISTORY ENDPOINTS
 OPS_DB_HISTORY_LIST_API_VIEW_FUNC = OpsDBHistoryListAPI.as_view("ops-db-history-group", OpsDBHistory)
 
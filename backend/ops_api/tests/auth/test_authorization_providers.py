@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import select
+
+from models import Role, User
+from ops_api.ops.auth.authorization_providers import (
+    BasicAuthorizationProvider,
+    get_user_permissions,
+    user_permissions_cache,
+)
+
+
+@pytest.fixture()
+def user_with_roles(loaded_db):
+    viewer_editor = loaded_db.scalar(select(Role).where(Role.name == "VIEWER_EDITOR"))
+    user = User(
+        oidc_id="00000000-0000-1111-a111-00000000fff1",
+        email="permissions@example.com",
+        roles=[viewer_editor],
+    )
+    loaded_db.add(user)
+    loaded_db.commit()
+    yield user
+    loaded_db.delete(user)
+    loaded_db.commit()
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_user_permissions_are_cached(user_with_roles, count_queries):
+    viewer_editor_permissions = frozenset(user_with_roles.roles[0].permissions)
+    assert get_user_permissions(user_with_roles.oidc_id) == viewer_editor_permissions
+
+    with count_queries() as statements:
+        assert get_user_permissions(user_with_roles.oidc_id) == viewer_editor_permissions
+        assert BasicAuthorizationProvider().is_authorized(user_with_roles.oidc_id, "GET_AGREEMENT")
+
+    assert statements == []
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_user_permissions_invalidated_when_roles_change(loaded_db, user_with_roles):
+    assert not BasicAuthorizationProvider().is_authorized(user_with_roles.oidc_id, "POST_USER")
+
+    user_admin = loaded_db.scalar(select(Role).where(Role.name == "USER_ADMIN"))
+    user_with_roles.roles.append(user_admin)
+    loaded_db.commit()
+
+    assert BasicAuthorizationProvider().is_authorized(user_with_roles.oidc_id, "POST_USER")
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_user_permissions_invalidated_on_commit(loaded_db, user_with_roles):
+    assert not BasicAuthorizationProvider().is_authorized(user_with_roles.oidc_id, "POST_USER")
+
+    user_admin = loaded_db.scalar(select(Role).where(Role.name == "USER_ADMIN"))
+    user_with_roles.roles.append(user_admin)
+    loaded_db.flush()
+
+    # the flushed (uncommitted) roles don't invalidate the cached permissions
+    assert not BasicAuthorizationProvider().is_authorized(user_with_roles.oidc_id, "POST_USER")
+
+    loaded_db.rollback()
+    assert not BasicAuthorizationProvider().is_authorized(user_with_roles.oidc_id, "POST_USER")
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_user_permissions_read_before_an_invalidation_are_not_cached(user_with_roles):
+    generation = user_permissions_cache.generation
+    user_permissions_cache.invalidate(user_with_roles.oidc_id)
+    user_permissions_cache.set(user_with_roles.oidc_id, frozenset(), generation)
+    assert user_permissions_cache.get(user_with_roles.oidc_id, 60) is None
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_user_permissions_of_unknown_user():
+    assert get_user_permissions("00000000-0000-1111-a111-00000000fff2") == frozenset()
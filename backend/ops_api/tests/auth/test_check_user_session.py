@@ -4,9 +4,10 @@ import pytest
 from flask import request, url_for
 from flask_jwt_extended import verify_jwt_in_request
 
-from ops_api.ops.auth.decorators import check_user_session
+from models import UserSession
+from ops_api.ops.auth.decorators import check_user_session, check_user_session_function
 from ops_api.ops.auth.exceptions import InvalidUserSessionError
-from ops_api.ops.auth.utils import get_all_user_sessions
+from ops_api.ops.auth.utils import get_all_user_sessions, user_session_cache
 
 
 @pytest.mark.usefixtures("app_ctx")
@@ -156,3 +157,90 @@ def test_check_user_session_exclude_options(auth_client, mocker):
     result = auth_client.options(url_for("api.agreements-group"))
     assert result.status_code == 200
     assert not mock.called
+
+
+@pytest.fixture()
+def latest_user_session(loaded_db, test_user):
+    user_session = UserSession(
+        user_id=test_user.id,
+        is_active=True,
+        ip_address="127.0.0.1",
+        access_token="latest-access-token",
+        refresh_token="latest-refresh-token",
+        last_active_at=datetime.now(),
+        created_on=datetime.now() + timedelta(days=1),
+    )
+    loaded_db.add(user_session)
+    loaded_db.commit()
+    yield user_session
+    loaded_db.delete(user_session)
+    loaded_db.commit()
+
+
+def user_session_request_context(app):
+    return app.test_request_context(
+        url_for("api.agreements-group"), headers={"Authorization": "Bearer latest-access-token"}
+    )
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_check_user_session_caches_valid_token(app, test_user, latest_user_session, count_queries):
+    with user_session_request_context(app):
+        check_user_session_function(test_user)
+        with count_queries() as statements:
+            check_user_session_function(test_user)
+
+    assert statements == []
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_check_user_session_only_writes_last_active_at_past_granularity(
+    app, loaded_db, test_user, latest_user_session, count_queries
+):
+    latest_user_session.last_active_at = datetime.now() - timedelta(minutes=2)
+    loaded_db.commit()
+    with user_session_request_context(app):
+        with count_queries() as statements:
+            check_user_session_function(test_user)
+    assert [statement for statement in statements if statement.startswith("UPDATE user_session")]
+    assert datetime.now() - latest_user_session.last_active_at < timedelta(minutes=1)
+
+    with user_session_request_context(app):
+        with count_queries() as statements:
+            check_user_session_function(test_user)
+    assert not [statement for statement in statements if statement.startswith("UPDATE user_session")]
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_check_user_session_cached_token_invalidated_by_deactivation(app, loaded_db, test_user, latest_user_session):
+    with user_session_request_context(app):
+        check_user_session_function(test_user)
+
+    latest_user_session.is_active = False
+    loaded_db.commit()
+
+    with user_session_request_context(app):
+        with pytest.raises(InvalidUserSessionError):
+            check_user_session_function(test_user)
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_check_user_session_cached_token_invalidated_on_commit(app, loaded_db, test_user, latest_user_session):
+    with user_session_request_context(app):
+        check_user_session_function(test_user)
+
+    # the flushed (uncommitted) deactivation doesn't invalidate the cached token
+    latest_user_session.is_active = False
+    loaded_db.flush()
+    assert user_session_cache.get(test_user.id, "latest-access-token", 60)
+
+    loaded_db.commit()
+    assert user_session_cache.get(test_user.id, "latest-access-token", 60) is None
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_user_session_validated_before_an_invalidation_is_not_cached(test_user):
+    generation = user_session_cache.generation
+    user_session_cache.invalidate(test_user.id)
+    user_session_cache.set(test_user.id, "latest-access-token", datetime.now(), generation)
+    assert user_session_cache.get(test_user.id, "latest-access-token", 60) is None
@@ -22,7 +22,7 @@ class AuthClient(FlaskClient):
 
         access_token = create_access_token(identity=user, additional_claims=additional_claims)
         refresh_token = create_refresh_token(identity=user)
-        kwargs.setdefault("headers", {"Authorization": f"Bearer {access_token}"})
+        kwargs["headers"] = {"Authorization": f"Bearer {access_token}", **kwargs.get("headers", {})}
 
         user_session = _get_or_create_user_session(user, access_token=access_token, refresh_token=refresh_token)
         user_session.access_token = access_token
@@ -54,7 +54,7 @@ class NoPermsAuthClient(FlaskClient):
         )
         access_token = create_access_token(identity=user, additional_claims={})
         refresh_token = create_refresh_token(identity=user)
-        kwargs.setdefault("headers", {"Authorization": f"Bearer {access_token}"})
+        kwargs["headers"] = {"Authorization": f"Bearer {access_token}", **kwargs.get("headers", {})}
 
         user_session = _get_or_create_user_session(user, access_token=access_token, refresh_token=refresh_token)
         user_session.access_token = access_token
@@ -86,7 +86,7 @@ class BasicUserAuthClient(FlaskClient):
 
         access_token = create_access_token(identity=user, additional_claims=additional_claims)
         refresh_token = create_refresh_token(identity=user)
-        kwargs.setdefault("headers", {"Authorization": f"Bearer {access_token}"})
+        kwargs["headers"] = {"Authorization": f"Bearer {access_token}", **kwargs.get("headers", {})}
 
         user_session = _get_or_create_user_session(user, access_token=access_token, refresh_token=refresh_token)
         user_session.access_token = access_token
@@ -118,7 +118,7 @@ class BudgetTeamAuthClient(FlaskClient):
 
         access_token = create_access_token(identity=user, additional_claims=additional_claims)
         refresh_token = create_refresh_token(identity=user)
-        kwargs.setdefault("headers", {"Authorization": f"Bearer {access_token}"})
+        kwargs["headers"] = {"Authorization": f"Bearer {access_token}", **kwargs.get("headers", {})}
 
         user_session = _get_or_create_user_session(user, access_token=access_token, refresh_token=refresh_token)
         user_session.access_token = access_token
@@ -150,7 +150,7 @@ class DivisionDirectorAuthClient(FlaskClient):
 
         access_token = create_access_token(identity=user, additional_claims=additional_claims)
         refresh_token = create_refresh_token(identity=user)
-        kwargs.setdefault("headers", {"Authorization": f"Bearer {access_token}"})
+        kwargs["headers"] = {"Authorization": f"Bearer {access_token}", **kwargs.get("headers", {})}
 
         user_session = _get_or_create_user_session(user, access_token=access_token, refresh_token=refresh_token)
         user_session.access_token = access_token
@@ -182,7 +182,7 @@ class Division6DirectorAuthClient(FlaskClient):
 
         access_token = create_access_token(identity=user, additional_claims=additional_claims)
         refresh_token = create_refresh_token(identity=user)
-        kwargs.setdefault("headers", {"Authorization": f"Bearer {access_token}"})
+        kwargs["headers"] = {"Authorization": f"Bearer {access_token}", **kwargs.get("headers", {})}
 
         user_session = _get_or_create_user_session(user, access_token=access_token, refresh_token=refresh_token)
         user_session.access_token = access_token
@@ -2,6 +2,7 @@
 
 import subprocess
 from collections.abc import Generator
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from typing import Type
 
@@ -9,7 +10,7 @@ import pytest
 from flask import Flask
 from flask.testing import FlaskClient
 from pytest_docker.plugin import Services
-from sqlalchemy import create_engine, delete, text
+from sqlalchemy import create_engine, delete, event, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
@@ -43,6 +44,11 @@ def app(db_service) -> Generator[Flask, None, None]:
     """Make and return the flask app."""
     app = create_app()
     yield app
+    # close the pooled connections of the app now rather than when it's garbage collected
+    app.engine.dispose()
+    app.audit_engine.dispose()
+    if app.replica_engine is not None:
+        app.replica_engine.dispose()
 
 
 @pytest.fixture()
@@ -198,6 +204,26 @@ def app_ctx(app: Flask) -> Generator[None, None, None]:
         yield
 
 
+@pytest.fixture()
+def count_queries(app: Flask):
+    """Return a context manager that collects the SQL statements executed by the app while it is active."""
+
+    @contextmanager
+    def _count_queries() -> Generator[list[str], None, None]:
+        statements: list[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(app.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(app.engine, "before_cursor_execute", before_cursor_execute)
+
+    return _count_queries
+
+
 @pytest.fixture()
 def test_user(loaded_db) -> User | None:
     """Get a test user.
@@ -1,6 +1,7 @@
 import datetime
 
 import pytest
+from sqlalchemy import event, select
 from sqlalchemy_continuum import parent_class, version_class
 
 from models import CAN, Agreement, BudgetLineItem, BudgetLineItemStatus, ServicesComponent
@@ -745,6 +746,26 @@ def test_budget_line_item_fiscal_year(
     ), "test_bli_new_previous_fiscal_year.date_needed == 2042-09-01"
 
 
+@pytest.mark.usefixtures("app_ctx")
+def test_budget_line_item_fiscal_year_and_portfolio_id_expressions(
+    loaded_db, test_bli_new, test_bli_new_previous_year, test_bli_new_previous_fiscal_year
+):
+    blis = [test_bli_new, test_bli_new_previous_year, test_bli_new_previous_fiscal_year]
+    stmt = select(BudgetLineItem.id, BudgetLineItem.fiscal_year, BudgetLineItem.portfolio_id).where(
+        BudgetLineItem.id.in_([bli.id for bli in blis])
+    )
+    rows = {row.id: row for row in loaded_db.execute(stmt)}
+
+    for bli in blis:
+        assert rows[bli.id].fiscal_year == bli.fiscal_year
+        assert rows[bli.id].portfolio_id == bli.portfolio_id
+
+    stmt = select(BudgetLineItem).where(
+        BudgetLineItem.fiscal_year == 2043, BudgetLineItem.portfolio_id == test_bli_new.can.portfolio_id
+    )
+    assert test_bli_new in loaded_db.scalars(stmt).all()
+
+
 @pytest.mark.usefixtures("app_ctx")
 def test_budget_line_item_portfolio_id_null(auth_client, loaded_db, test_bli_new_no_can):
     assert test_bli_new_no_can.portfolio_id is None
@@ -1119,3 +1140,31 @@ def test_invalid_post_budget_line_items(loaded_db, basic_user_auth_client, test_
     }
     response = basic_user_auth_client.post("/api/v1/budget-line-items/", json=data)
     assert response.status_code == 403
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_load_change_requests_in_review(loaded_db, test_bli, test_change_request):
+    other_bli = loaded_db.get(BudgetLineItem, 15001)
+    BudgetLineItem.load_change_requests_in_review(loaded_db, [test_bli, other_bli])
+
+    statements = []
+
+    def count_statements(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = loaded_db.get_bind()
+    event.listen(engine, "before_cursor_execute", count_statements)
+    try:
+        assert test_bli.in_review is True
+        assert test_bli.change_requests_in_review == [test_change_request]
+        assert other_bli.in_review is False
+        assert other_bli.change_requests_in_review is None
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statements)
+
+    assert statements == []
+
+    # the bulk loaded change requests are discarded once the instance is expired
+    loaded_db.expire(test_bli)
+    assert "_change_requests_in_review" not in test_bli.__dict__
+    assert test_bli.change_requests_in_review == [test_change_request]
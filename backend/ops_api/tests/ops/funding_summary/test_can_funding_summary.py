@@ -1,32 +1,20 @@
 from decimal import Decimal
 from typing import Type
-from unittest.mock import MagicMock
 
 import pytest
 from flask.testing import FlaskClient
+from sqlalchemy import select
 
 from models.cans import CAN, CANMethodOfTransfer
 from ops_api.ops.utils.cans import (
     aggregate_funding_summaries,
-    filter_by_attribute,
-    filter_by_fiscal_year_budget,
+    get_can_funding_summaries,
     get_can_funding_summary,
-    get_filtered_cans,
-    get_nested_attribute,
+    get_filtered_cans_stmt,
 )
 from ops_api.tests.utils import remove_keys
 
 
-class DummyObject:
-    def __init__(self):
-        self.nested = DummyNestedObject()
-
-
-class DummyNestedObject:
-    def __init__(self):
-        self.value = "test_value"
-
-
 def test_can_get_can_funding_summary_filter_fy_budget_400(auth_client: FlaskClient):
     query_params = f"can_ids={0}&fy_budget=0"
     response = auth_client.get(f"/api/v1/can-funding-summary?{query_params}")
@@ -361,100 +349,6 @@ def test_can_get_can_funding_summary_complete_filter(auth_client: FlaskClient, t
     assert response.json["obligated_funding"] == "0.0"
 
 
-def test_get_nested_attribute_existing_attribute():
-    obj = DummyObject()
-    result = get_nested_attribute(obj, "nested.value")
-    assert result == "test_value"
-
-
-def test_get_nested_attribute_non_existing_attribute():
-    obj = DummyObject()
-    result = get_nested_attribute(obj, "nested.non_existing")
-    assert result is None
-
-
-def test_get_nested_attribute_non_existing_top_level():
-    obj = DummyObject()
-    result = get_nested_attribute(obj, "non_existing")
-    assert result is None
-
-
-def test_filter_cans_by_attribute():
-    cans = [
-        MagicMock(active_period=1, funding_details=MagicMock(method_of_transfer=CANMethodOfTransfer.DIRECT)),
-        MagicMock(active_period=2, funding_details=MagicMock(method_of_transfer=CANMethodOfTransfer.IAA)),
-        MagicMock(active_period=1, funding_details=MagicMock(method_of_transfer=CANMethodOfTransfer.DIRECT)),
-    ]
-
-    filtered_cans = filter_by_attribute(cans, "funding_details.method_of_transfer", [CANMethodOfTransfer.DIRECT])
-
-    assert len(filtered_cans) == 2
-
-
-def test_filter_cans_by_fiscal_year_budget():
-    cans = [
-        MagicMock(funding_budgets=[MagicMock(budget=1000001.0)]),
-        MagicMock(funding_budgets=[MagicMock(budget=2000000.0)]),
-        MagicMock(funding_budgets=[MagicMock(budget=500000.0)]),
-    ]
-
-    fiscal_year_budget = [1000000, 2000000]
-    filtered_cans = filter_by_fiscal_year_budget(cans, fiscal_year_budget)
-
-    assert len(filtered_cans) == 2
-
-
-def test_filter_cans_by_fiscal_year_budget_no_match():
-    cans = [
-        MagicMock(funding_budgets=[MagicMock(budget=500000.0, fiscal_year=2023)]),
-        MagicMock(funding_budgets=[MagicMock(budget=7000000.0, fiscal_year=2024)]),
-    ]
-
-    fiscal_year_budget = [1000000, 2000000]
-    filtered_cans = filter_by_fiscal_year_budget(cans, fiscal_year_budget)
-
-    assert len(filtered_cans) == 0
-
-
-@pytest.mark.parametrize(
-    "active_period, transfer, portfolio, fy_budget, expected_count",
-    [
-        (None, None, None, None, 3),
-        ([1], None, None, None, 2),
-        (None, [CANMethodOfTransfer.DIRECT], None, None, 1),
-        (None, None, None, [100000, 200000], 2),
-        ([1], [CANMethodOfTransfer.IAA], ["HS"], [100000, 200000], 0),
-    ],
-)
-def test_filter_cans(active_period, transfer, portfolio, fy_budget, expected_count):
-    cans = [
-        MagicMock(
-            active_period=1,
-            funding_details=MagicMock(method_of_transfer=CANMethodOfTransfer.DIRECT),
-            portfolio=[MagicMock(abbreviation="HS")],
-            funding_budgets=[MagicMock(budget=150000)],
-        ),
-        MagicMock(
-            active_period=2,
-            funding_details=MagicMock(method_of_transfer=CANMethodOfTransfer.IAA),
-            portfolio=[MagicMock(abbreviation="HS")],
-            funding_budgets=[MagicMock(budget=50000)],
-        ),
-        MagicMock(
-            active_period=1,
-            funding_details=MagicMock(method_of_transfer=CANMethodOfTransfer.IAA),
-            portfolio=[MagicMock(abbreviation="HMRF")],
-            funding_budgets=[MagicMock(budget=200000)],
-        ),
-    ]
-
-    filtered_cans = get_filtered_cans(
-        cans, active_period=active_period, transfer=transfer, portfolio=portfolio, fy_budget=fy_budget
-    )
-
-    assert len(filtered_cans) == expected_count
-
-
 def test_aggregate_funding_summaries():
     funding_sums = [
         {
@@ -544,3 +438,74 @@ def test_can_get_can_funding_summary_all_cans(auth_client: FlaskClient) -> None:
     response = auth_client.get(f"/api/v1/can-funding-summary?can_ids={0}")
     assert response.status_code == 200
     assert len(response.json["cans"]) == 17
+
+
+@pytest.mark.usefixtures("app_ctx")
+@pytest.mark.parametrize("fiscal_year", [None, 2023, 2024, 2025])
+def test_get_can_funding_summaries_matches_get_can_funding_summary(loaded_db, fiscal_year) -> None:
+    cans = loaded_db.execute(select(CAN).order_by(CAN.id)).scalars().all()
+
+    result = get_can_funding_summaries(cans, fiscal_year)
+
+    assert result == [get_can_funding_summary(can, fiscal_year) for can in cans]
+    assert aggregate_funding_summaries(result) == aggregate_funding_summaries(
+        [get_can_funding_summary(can, fiscal_year) for can in cans]
+    )
+
+
+def _matches_filters(can, fiscal_year, active_period, transfer, portfolio, fy_budget) -> bool:
+    funding_details = can.funding_details
+    if fiscal_year and not (funding_details and funding_details.fiscal_year == fiscal_year):
+        return False
+    if active_period and can.active_period not in active_period:
+        return False
+    if transfer and not (funding_details and funding_details.method_of_transfer in transfer):
+        return False
+    if portfolio and can.portfolio.abbreviation not in portfolio:
+        return False
+    if fy_budget and not any(fy_budget[0] <= budget.budget <= fy_budget[1] for budget in can.funding_budgets):
+        return False
+    return True
+
+
+@pytest.mark.usefixtures("app_ctx")
+@pytest.mark.parametrize(
+    "fiscal_year, active_period, transfer, portfolio, fy_budget",
+    [
+        (None, None, None, None, None),
+        (2023, None, None, None, None),
+        (None, [1], None, None, None),
+        (None, [1, 5], None, None, None),
+        (2023, None, [CANMethodOfTransfer.DIRECT], None, None),
+        (None, None, [CANMethodOfTransfer.IAA, CANMethodOfTransfer.COST_SHARE], None, None),
+        (None, None, None, ["HS", "HMRF"], None),
+        (None, None, None, None, [0, 1000000]),
+        (None, None, None, None, [1000000, 2000000]),
+        (2024, [1, 5], [CANMethodOfTransfer.DIRECT], ["HS", "HMRF"], [50000, 100000]),
+    ],
+)
+def test_get_filtered_cans_stmt(loaded_db, fiscal_year, active_period, transfer, portfolio, fy_budget) -> None:
+    all_cans = loaded_db.execute(select(CAN).order_by(CAN.id)).scalars().all()
+
+    stmt = get_filtered_cans_stmt(None, fiscal_year, active_period, transfer, portfolio, fy_budget)
+    result = loaded_db.execute(stmt).scalars().all()
+
+    assert result == [
+        can for can in all_cans if _matches_filters(can, fiscal_year, active_period, transfer, portfolio, fy_budget)
+    ]
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_get_filtered_cans_stmt_can_ids(loaded_db, test_cans: list[Type[CAN]]) -> None:
+    stmt = get_filtered_cans_stmt([str(test_cans[1].id), str(test_cans[0].id)], active_period=[1])
+    result = loaded_db.execute(stmt).scalars().all()
+
+    assert result == [can for can in reversed(test_cans) if can.active_period == 1]
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_get_filtered_cans_stmt_can_ids_keeps_the_requested_order(loaded_db, test_cans: list[Type[CAN]]) -> None:
+    stmt = get_filtered_cans_stmt([str(test_cans[1].id), "0", str(test_cans[0].id), str(test_cans[1].id)])
+    result = loaded_db.execute(stmt).scalars().all()
+
+    assert result == [test_cans[1], test_cans[0]]
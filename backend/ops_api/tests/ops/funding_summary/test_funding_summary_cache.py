@@ -0,0 +1,88 @@
+import pytest
+
+from models import CANFundingBudget
+from ops_api.ops.utils.funding_summary_cache import ANY_CAN, FundingSummaryCache, funding_summary_cache
+
+
+@pytest.fixture()
+def cache():
+    funding_summary_cache.invalidate()
+    yield funding_summary_cache
+    funding_summary_cache.invalidate()
+
+
+@pytest.fixture()
+def add_budget(loaded_db):
+    budgets = []
+
+    def add(can_id: int, budget: float):
+        funding_budget = CANFundingBudget(can_id=can_id, fiscal_year=2050, budget=budget)
+        loaded_db.add(funding_budget)
+        loaded_db.commit()
+        budgets.append(funding_budget)
+
+    yield add
+    for funding_budget in budgets:
+        loaded_db.delete(funding_budget)
+    loaded_db.commit()
+
+
+def test_cache_lru_and_ttl():
+    cache = FundingSummaryCache()
+    cache.set("a", 1, [], max_size=2, generation=0)
+    cache.set("b", 2, [], max_size=2, generation=0)
+    assert cache.get("a", ttl=60) == 1
+    cache.set("c", 3, [], max_size=2, generation=0)
+    assert cache.get("b", ttl=60) is None
+    assert cache.get("a", ttl=60) == 1
+    assert cache.get("a", ttl=0) is None
+
+
+def test_cache_invalidate_by_tag():
+    cache = FundingSummaryCache()
+    cache.set("can-500", 1, [("can", 500)], max_size=10, generation=0)
+    cache.set("all", 2, [ANY_CAN], max_size=10, generation=0)
+    cache.invalidate([("can", 501)])
+    assert cache.get("can-500", ttl=60) == 1
+    cache.invalidate([("can", 500)])
+    assert cache.get("can-500", ttl=60) is None
+    assert cache.get("all", ttl=60) == 2
+
+    # a summary computed before an invalidation isn't cached
+    cache.set("can-500", 1, [("can", 500)], max_size=10, generation=0)
+    assert cache.get("can-500", ttl=60) is None
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_can_funding_summary_invalidated_by_budget(auth_client, cache, add_budget):
+    response = auth_client.get("/api/v1/can-funding-summary?can_ids=500&fiscal_year=2050")
+    assert response.status_code == 200
+    total_funding = float(response.json["total_funding"])
+    auth_client.get("/api/v1/can-funding-summary?can_ids=0&fiscal_year=2050")
+    assert len(cache) == 2
+
+    # a budget of a CAN in another portfolio only invalidates the summary of all the CANs
+    add_budget(504, 1000)
+    assert len(cache) == 1
+
+    add_budget(500, 1000)
+    assert len(cache) == 0
+    response = auth_client.get("/api/v1/can-funding-summary?can_ids=500&fiscal_year=2050")
+    assert float(response.json["total_funding"]) == total_funding + 1000
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_portfolio_funding_summary_invalidated_by_budget(auth_client, cache, add_budget):
+    response = auth_client.get("/api/v1/portfolio-funding-summary/6?fiscal_year=2050")
+    assert response.status_code == 200
+    total_funding = response.json["total_funding"]["amount"]
+
+    add_budget(504, 1000)
+    assert len(cache) == 1
+    response = auth_client.get("/api/v1/portfolio-funding-summary/6?fiscal_year=2050")
+    assert response.json["total_funding"]["amount"] == total_funding
+
+    add_budget(510, 1000)
+    assert len(cache) == 0
+    response = auth_client.get("/api/v1/portfolio-funding-summary/6?fiscal_year=2050")
+    assert response.json["total_funding"]["amount"] == total_funding + 1000
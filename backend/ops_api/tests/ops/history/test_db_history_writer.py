@@ -0,0 +1,173 @@
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from models import AgreementOpsDbHistory, BudgetLineItem, BudgetLineItemStatus, OpsDBHistory, OpsDBHistoryType
+from models.utils import BatchWriter, DbHistoryWriter
+
+
+@pytest.fixture()
+def db_history_writer(app):
+    writer = DbHistoryWriter(app.engine, batch_size=10, flush_interval=0.1)
+    yield writer
+    writer.close()
+
+
+@pytest.fixture()
+def writer_session(app, db_history_writer, test_user):
+    with Session(app.engine) as session:
+        db_history_writer.listen(session, test_user)
+        yield session
+
+
+def get_histories(session, row_key):
+    stmt = (
+        select(OpsDBHistory)
+        .where(OpsDBHistory.class_name == "BudgetLineItem", OpsDBHistory.row_key == row_key)
+        .order_by(OpsDBHistory.id)
+    )
+    return session.scalars(stmt).all()
+
+
+def delete_histories(session, row_key):
+    session.execute(
+        delete(OpsDBHistory).where(OpsDBHistory.class_name == "BudgetLineItem", OpsDBHistory.row_key == row_key)
+    )
+    session.commit()
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_db_history_writer(loaded_db, writer_session, db_history_writer, test_user):
+    bli = BudgetLineItem(
+        line_description="Audit Pipeline BLI", agreement_id=1, can_id=500, status=BudgetLineItemStatus.DRAFT
+    )
+    writer_session.add(bli)
+    writer_session.commit()
+    row_key = str(bli.id)
+    db_history_writer.flush()
+
+    bli.line_description = "Audit Pipeline BLI (UPDATED)"
+    writer_session.commit()
+    db_history_writer.flush()
+
+    writer_session.delete(bli)
+    writer_session.commit()
+    db_history_writer.flush()
+
+    try:
+        histories = get_histories(loaded_db, row_key)
+        assert [history.event_type for history in histories] == [
+            OpsDBHistoryType.NEW,
+            OpsDBHistoryType.UPDATED,
+            OpsDBHistoryType.DELETED,
+        ]
+        new, updated, deleted = histories
+        assert all(history.created_by == test_user.id for history in histories)
+        assert new.changes["line_description"] == {"new": "Audit Pipeline BLI"}
+        assert new.event_details["line_description"] == "Audit Pipeline BLI"
+        assert updated.event_details["line_description"] == "Audit Pipeline BLI (UPDATED)"
+        assert updated.changes["line_description"] == {
+            "new": "Audit Pipeline BLI (UPDATED)",
+            "old": "Audit Pipeline BLI",
+        }
+        assert deleted.event_details["line_description"] == "Audit Pipeline BLI (UPDATED)"
+
+        agreement_history_ids = loaded_db.scalars(
+            select(AgreementOpsDbHistory.ops_db_history_id).where(AgreementOpsDbHistory.agreement_id == 1)
+        ).all()
+        assert {history.id for history in histories} <= set(agreement_history_ids)
+    finally:
+        delete_histories(loaded_db, row_key)
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_db_history_writer_discards_rolled_back_changes(loaded_db, writer_session, db_history_writer):
+    bli = BudgetLineItem(line_description="Audit Pipeline BLI", agreement_id=1, can_id=500)
+    writer_session.add(bli)
+    writer_session.flush()
+    row_key = str(bli.id)
+    writer_session.rollback()
+
+    db_history_writer.flush()
+
+    assert get_histories(loaded_db, row_key) == []
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_db_history_writer_close_writes_queued_records(app, loaded_db, test_user):
+    writer = DbHistoryWriter(app.engine, batch_size=100, flush_interval=60)
+    with Session(app.engine) as session:
+        writer.listen(session, test_user)
+        bli = BudgetLineItem(line_description="Audit Pipeline BLI", agreement_id=1, can_id=500)
+        session.add(bli)
+        session.commit()
+        row_key = str(bli.id)
+        session.delete(bli)
+        session.commit()
+
+    writer.close()
+    try:
+        histories = get_histories(loaded_db, row_key)
+        assert [history.event_type for history in histories] == [OpsDBHistoryType.NEW, OpsDBHistoryType.DELETED]
+    finally:
+        delete_histories(loaded_db, row_key)
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_db_history_writer_snapshots_the_state_of_each_change(app, loaded_db, test_user):
+    # the commits are written in one batch, after the row is gone
+    writer = DbHistoryWriter(app.engine, batch_size=100, flush_interval=60)
+    with Session(app.engine) as session:
+        writer.listen(session, test_user)
+        bli = BudgetLineItem(line_description="First", agreement_id=1, can_id=500)
+        session.add(bli)
+        session.commit()
+        row_key = str(bli.id)
+        bli.line_description = "Second"
+        session.commit()
+        bli.line_description = "Third"
+        session.commit()
+        session.delete(bli)
+        session.commit()
+
+    writer.close()
+    try:
+        histories = get_histories(loaded_db, row_key)
+        assert [history.event_details["line_description"] for history in histories] == [
+            "First",
+            "Second",
+            "Third",
+            "Third",
+        ]
+    finally:
+        delete_histories(loaded_db, row_key)
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_db_history_writer_merges_flushes_in_a_commit(loaded_db, writer_session, db_history_writer):
+    bli = BudgetLineItem(line_description="Flushed Once", agreement_id=1, can_id=500)
+    writer_session.add(bli)
+    writer_session.flush()
+    bli.line_description = "Flushed Twice"
+    writer_session.commit()
+    row_key = str(bli.id)
+
+    db_history_writer.flush()
+    try:
+        histories = get_histories(loaded_db, row_key)
+        assert [history.event_type for history in histories] == [OpsDBHistoryType.NEW]
+        assert histories[0].changes["line_description"] == {"new": "Flushed Twice"}
+        assert histories[0].event_details["line_description"] == "Flushed Twice"
+    finally:
+        writer_session.delete(bli)
+        writer_session.commit()
+        db_history_writer.flush()
+        delete_histories(loaded_db, row_key)
+
+
+def test_batch_writer_requires_write():
+    class Writer(BatchWriter):
+        pass
+
+    with pytest.raises(TypeError):
+        Writer()
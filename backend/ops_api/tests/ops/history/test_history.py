@@ -3,7 +3,9 @@ from sqlalchemy import and_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from models import CAN, BudgetLineItem, BudgetLineItemStatus, OpsDBHistory, OpsDBHistoryType
+from models import CAN, Agreement, BudgetLineItem, BudgetLineItemStatus, OpsDBHistory, OpsDBHistoryType
+from models.base import USER_SUMMARIES_KEY
+from ops_api.ops.schemas.users import SafeUserSchema
 
 
 @pytest.mark.usefixtures("app_ctx")
@@ -251,3 +253,90 @@ def test_get_history_list(auth_client, class_name, row_key, expected_status):
         url += "?" + "&".join(params)
     response = auth_client.get(url)
     assert response.status_code == expected_status
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_history_to_dict_uses_loaded_user_summaries(loaded_db, count_queries):
+    histories = [
+        OpsDBHistory(event_type=OpsDBHistoryType.NEW, class_name="Test", created_by=user_id, updated_by=503)
+        for user_id in [500, 503, 520, 500]
+    ]
+    loaded_db.add_all(histories)
+    loaded_db.flush()
+    loaded_db.info.pop(USER_SUMMARIES_KEY, None)
+    try:
+        OpsDBHistory.load_user_summaries(loaded_db, histories)
+        with count_queries() as statements:
+            history_dicts = [history.to_dict() for history in histories]
+
+        # the versions of each history are still queried (a dynamic relationship), the users are not
+        assert not [statement for statement in statements if "FROM ops_user" in statement]
+        for history, history_dict in zip(histories, history_dicts):
+            assert history_dict["created_by_user"] == SafeUserSchema().dump(history.created_by_user)
+            assert history_dict["updated_by_user"] == SafeUserSchema().dump(history.updated_by_user)
+    finally:
+        loaded_db.rollback()
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_user_summaries_discarded_when_user_changes(loaded_db, test_user):
+    history = OpsDBHistory(event_type=OpsDBHistoryType.NEW, class_name="Test", created_by=test_user.id)
+    loaded_db.add(history)
+    loaded_db.flush()
+    first_name = test_user.first_name
+    try:
+        assert history.to_dict()["created_by_user"]["full_name"] == test_user.full_name
+
+        test_user.first_name = "Changed"
+        loaded_db.flush()
+
+        assert history.to_dict()["created_by_user"]["full_name"] == test_user.full_name
+    finally:
+        loaded_db.rollback()
+        test_user.first_name = first_name
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_history_snapshot_of_audit_profile(loaded_db):
+    agreement = loaded_db.get(Agreement, 1)
+    description = agreement.description
+    try:
+        agreement.description = "Audit Profile Description"
+        loaded_db.commit()
+
+        stmt = (
+            select(OpsDBHistory)
+            .where(OpsDBHistory.class_name == agreement.__class__.__name__, OpsDBHistory.row_key == "1")
+            .order_by(OpsDBHistory.id.desc())
+        )
+        history = loaded_db.scalars(stmt).first()
+        assert history.changes == {"description": {"new": "Audit Profile Description", "old": description}}
+        # only the column values (and display_name) are stored for agreements
+        assert history.event_details["description"] == "Audit Profile Description"
+        assert history.event_details["display_name"] == agreement.display_name
+        assert "team_members" not in history.event_details
+    finally:
+        agreement.description = description
+        loaded_db.commit()
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_history_of_object_flushed_several_times_in_a_commit(loaded_db, test_can):
+    bli = BudgetLineItem(line_description="Flushed Once", agreement_id=1, can_id=test_can.id, amount=100)
+    loaded_db.add(bli)
+    loaded_db.flush()
+    bli.line_description = "Flushed Twice"
+    bli.amount = 200
+    loaded_db.commit()
+
+    stmt = select(OpsDBHistory).where(OpsDBHistory.class_name == "BudgetLineItem", OpsDBHistory.row_key == str(bli.id))
+    histories = loaded_db.scalars(stmt).all()
+    try:
+        assert len(histories) == 1
+        assert histories[0].event_type == OpsDBHistoryType.NEW
+        assert histories[0].changes["line_description"] == {"new": "Flushed Twice"}
+        assert histories[0].changes["amount"] == {"new": 200.0}
+        assert histories[0].event_details["line_description"] == "Flushed Twice"
+    finally:
+        loaded_db.delete(bli)
+        loaded_db.commit()
@@ -1,7 +1,9 @@
+import threading
+
 import pytest
 
 from models import OpsEvent, OpsEventType
-from ops_api.ops.services.message_bus import MessageBus
+from ops_api.ops.services.message_bus import MessageBus, message_bus_metrics, wait_for_deferred_handlers
 from ops_api.ops.utils.events import OpsEventHandler
 
 
@@ -48,3 +50,62 @@ def test_message_bus_create_cans(loaded_db, mocker):
     mock_callback_1.assert_called()
     mock_callback_2.assert_called()
     mock_callback_3.assert_called()
+
+
+def test_message_bus_published_events_are_per_instance():
+    message_bus_1 = MessageBus()
+    message_bus_2 = MessageBus()
+
+    message_bus_1.publish(OpsEventType.CREATE_NEW_CAN, OpsEvent(event_type=OpsEventType.CREATE_NEW_CAN))
+
+    assert len(message_bus_1.published_events) == 1
+    assert message_bus_2.published_events == []
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_message_bus_subscribe_once(loaded_db, mocker):
+    mock_callback = mocker.MagicMock()
+
+    message_bus = MessageBus()
+    message_bus.subscribe(OpsEventType.CREATE_NEW_CAN, mock_callback)
+    message_bus.subscribe(OpsEventType.CREATE_NEW_CAN, mock_callback)
+    message_bus.publish(OpsEventType.CREATE_NEW_CAN, OpsEvent(event_type=OpsEventType.CREATE_NEW_CAN))
+    message_bus.handle()
+
+    mock_callback.assert_called_once()
+
+    # a later request (message bus) uses the same subscriptions
+    mock_callback.reset_mock()
+    message_bus = MessageBus()
+    message_bus.publish(OpsEventType.CREATE_NEW_CAN, OpsEvent(event_type=OpsEventType.CREATE_NEW_CAN))
+    message_bus.handle()
+    message_bus.unsubscribe(OpsEventType.CREATE_NEW_CAN, mock_callback)
+
+    mock_callback.assert_called_once()
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_message_bus_deferred_handler(loaded_db, mocker):
+    request_thread = threading.current_thread()
+    handler_threads = []
+
+    def deferred_callback(event, session):
+        handler_threads.append(threading.current_thread())
+        raise Exception("blah blah")
+
+    message_bus = MessageBus()
+    message_bus.subscribe(OpsEventType.CREATE_NEW_CAN, deferred_callback, deferred=True)
+    message_bus.publish(OpsEventType.CREATE_NEW_CAN, OpsEvent(event_type=OpsEventType.CREATE_NEW_CAN))
+    message_bus.handle()
+    wait_for_deferred_handlers(timeout=10)
+    message_bus.unsubscribe(OpsEventType.CREATE_NEW_CAN, deferred_callback)
+
+    assert len(handler_threads) == 1
+    assert handler_threads[0] is not request_thread
+
+    metrics = message_bus_metrics.snapshot()
+    assert metrics["deferred_pending"] == 0
+    stats = metrics["handlers"][deferred_callback.__qualname__]
+    assert stats["calls"] == 1
+    assert stats["errors"] == 1
+    assert stats["max_seconds"] >= 0
@@ -1,3 +1,4 @@
+from datetime import date
 from decimal import Decimal
 
 import pytest
@@ -8,6 +9,7 @@ from ops_api.ops.utils.portfolios import (
     _get_budget_line_item_total_by_status,
     _get_carry_forward_total,
     _get_total_fiscal_year_funding,
+    get_total_funding,
 )
 
 
@@ -208,3 +210,30 @@ def test_get_budget_line_item_total_obligated(
 
     result = _get_budget_line_item_total_by_status(1000, 2023, BudgetLineItemStatus.OBLIGATED)
     assert result == Decimal(0), "No Portfolio"
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_get_total_funding_budget_line_item_fiscal_year(db_loaded_with_data_for_total_fiscal_year_funding):
+    session = db_loaded_with_data_for_total_fiscal_year_funding
+    portfolio = session.execute(select(Portfolio).where(Portfolio.name == "UNIT TEST PORTFOLIO")).scalar()
+    can = portfolio.cans[0]
+
+    blis = [
+        BudgetLineItem(amount=10.0, status=BudgetLineItemStatus.PLANNED, can_id=can.id, date_needed=date(2022, 10, 1)),
+        BudgetLineItem(amount=20.0, status=BudgetLineItemStatus.PLANNED, can_id=can.id, date_needed=date(2023, 9, 30)),
+        BudgetLineItem(amount=40.0, status=BudgetLineItemStatus.PLANNED, can_id=can.id, date_needed=date(2023, 10, 1)),
+        BudgetLineItem(amount=80.0, status=BudgetLineItemStatus.OBLIGATED, can_id=can.id, date_needed=date(2023, 1, 1)),
+    ]
+    session.add_all(blis)
+    session.commit()
+
+    result = get_total_funding(portfolio, "2023")
+
+    assert result["planned_funding"]["amount"] == 30.0
+    assert result["obligated_funding"]["amount"] == 80.0
+    assert result["in_execution_funding"]["amount"] == 0.0
+    assert result["available_funding"]["amount"] == -110.0
+
+    for bli in blis:
+        session.delete(bli)
+    session.commit()
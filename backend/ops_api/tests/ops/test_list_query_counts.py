@@ -0,0 +1,141 @@
+import pytest
+
+from models import (
+    CAN,
+    AgreementChangeRequest,
+    AgreementType,
+    BudgetLineItem,
+    BudgetLineItemStatus,
+    ChangeRequestNotification,
+    ChangeRequestStatus,
+    ContractAgreement,
+    Notification,
+    ResearchProject,
+    User,
+)
+
+
+def add_agreements(session, indexes):
+    agreements = [
+        ContractAgreement(
+            name=f"Query Count Contract #{i}",
+            agreement_type=AgreementType.CONTRACT,
+            project_id=1000,
+            team_members=[session.get(User, 503)],
+            budget_line_items=[
+                BudgetLineItem(line_description="Query Count BLI", can_id=500, status=BudgetLineItemStatus.DRAFT)
+            ],
+        )
+        for i in indexes
+    ]
+    session.add_all(agreements)
+    session.commit()
+    return agreements
+
+
+def add_budget_line_items(session, indexes):
+    budget_line_items = [
+        BudgetLineItem(
+            line_description=f"Query Count BLI #{i}",
+            agreement_id=1,
+            can_id=501 + i,
+            amount=100,
+            status=BudgetLineItemStatus.DRAFT,
+        )
+        for i in indexes
+    ]
+    session.add_all(budget_line_items)
+    session.commit()
+    return budget_line_items
+
+
+def add_cans(session, indexes):
+    cans = [CAN(number=f"G99QC{i}", portfolio_id=6, funding_details_id=1) for i in indexes]
+    session.add_all(cans)
+    session.commit()
+    budget_line_items = [
+        BudgetLineItem(line_description="Query Count BLI", agreement_id=1, can_id=can.id, amount=100) for can in cans
+    ]
+    session.add_all(budget_line_items)
+    session.commit()
+    return cans + budget_line_items
+
+
+def add_notifications(session, indexes):
+    created = []
+    for i in indexes:
+        change_request = AgreementChangeRequest(
+            agreement_id=1,
+            status=ChangeRequestStatus.APPROVED,
+            managing_division_id=1,
+            requested_change_data={"notes": f"Query Count #{i}"},
+            created_by=503,
+        )
+        session.add(change_request)
+        session.commit()
+        notifications = [
+            Notification(title="Query Count Notification", recipient_id=520),
+            ChangeRequestNotification(
+                title="Query Count Change Request Notification",
+                recipient_id=520,
+                change_request_id=change_request.id,
+            ),
+        ]
+        session.add_all(notifications)
+        session.commit()
+        created.extend([change_request, *notifications])
+    return created
+
+
+def add_research_projects(session, indexes):
+    research_projects = [
+        ResearchProject(
+            title=f"Query Count Research Project #{i}",
+            short_title=f"QC{i}",
+            team_leaders=[session.get(User, 503)],
+        )
+        for i in indexes
+    ]
+    session.add_all(research_projects)
+    session.commit()
+    return research_projects
+
+
+def get_row_and_query_count(client, session, count_queries, url):
+    # expire everything loaded so far so nothing is served without a query
+    session.expire_all()
+    with count_queries() as statements:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(response.json), len(statements)
+
+
+@pytest.mark.usefixtures("app_ctx")
+@pytest.mark.parametrize(
+    "url,add_rows",
+    [
+        ("/api/v1/agreements/?project_id=1000", add_agreements),
+        ("/api/v1/budget-line-items/?agreement_id=1", add_budget_line_items),
+        ("/api/v1/cans/?search=G99", add_cans),
+        ("/api/v1/notifications/?user_id=520", add_notifications),
+        ("/api/v1/research-projects/?search=Query Count", add_research_projects),
+    ],
+)
+def test_list_query_count_does_not_depend_on_row_count(auth_client, loaded_db, count_queries, url, add_rows):
+    created = []
+    try:
+        # the first request of the client also sets up the user session
+        auth_client.get(url)
+
+        created.extend(add_rows(loaded_db, range(1)))
+        row_count, query_count = get_row_and_query_count(auth_client, loaded_db, count_queries, url)
+
+        created.extend(add_rows(loaded_db, range(1, 4)))
+        more_row_count, more_query_count = get_row_and_query_count(auth_client, loaded_db, count_queries, url)
+    finally:
+        for obj in reversed(created):
+            loaded_db.delete(obj)
+        loaded_db.commit()
+
+    assert more_row_count > row_count
+    assert more_query_count == query_count
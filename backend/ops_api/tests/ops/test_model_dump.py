@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import select
+
+from marshmallow import Schema, fields
+from models import CAN, BudgetLineItem, ContractAgreement, Division, Portfolio, User
+from models.base import dump, get_dump_fields
+
+
+@pytest.mark.usefixtures("app_ctx")
+@pytest.mark.parametrize("model", [BudgetLineItem, CAN, ContractAgreement, Division, Portfolio, User])
+def test_dump_is_the_same_as_schema_dump(loaded_db, model):
+    objs = loaded_db.scalars(select(model).order_by(model.id).limit(20)).all()
+    assert objs
+    assert get_dump_fields(model.__marshmallow__) is not None
+
+    for obj in objs:
+        assert dump(model.__marshmallow__, obj) == model.__marshmallow__().dump(obj)
+
+
+class MissingAttributeSchema(Schema):
+    id = fields.Integer()
+    name = fields.String()
+    nick_name = fields.String(dump_default="none")
+
+
+class MissingAttributeObject:
+    id = 1
+
+
+@pytest.mark.parametrize("obj", [MissingAttributeObject(), {"id": 1}])
+def test_dump_of_missing_attributes_is_the_same_as_schema_dump(obj):
+    assert dump(MissingAttributeSchema, obj) == MissingAttributeSchema().dump(obj) == {"id": 1, "nick_name": "none"}
@@ -0,0 +1,81 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from models import CAN
+from ops_api.ops import create_app
+from ops_api.ops.db import recent_writes
+
+
+@pytest.fixture()
+def app(db_service, monkeypatch):
+    """Make the flask app with a second engine (on the same database) standing in for a read replica."""
+    primary_app = create_app()
+    primary_app.engine.dispose()
+    primary_app.audit_engine.dispose()
+    monkeypatch.setenv("FLASK_SQLALCHEMY_REPLICA_DATABASE_URI", primary_app.config["SQLALCHEMY_DATABASE_URI"])
+
+    app = create_app()
+    recent_writes.clear()
+    yield app
+    app.engine.dispose()
+    app.audit_engine.dispose()
+    app.replica_engine.dispose()
+    recent_writes.clear()
+
+
+@contextmanager
+def count_engine_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def get_with_query_counts(app, client, url):
+    app.db_session.expire_all()
+    with count_engine_queries(app.engine) as primary, count_engine_queries(app.replica_engine) as replica:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(primary), len(replica)
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_get_reads_from_replica(app, auth_client, loaded_db):
+    assert app.replica_engine is not None
+
+    primary, replica = get_with_query_counts(app, auth_client, "/api/v1/cans/500")
+
+    # the user is loaded (to verify the JWT) from the primary, the CAN from the replica
+    assert primary > 0
+    assert replica > 0
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_read_your_writes(app, auth_client, loaded_db):
+    can = loaded_db.get(CAN, 500)
+    nick_name = can.nick_name
+    try:
+        response = auth_client.patch("/api/v1/cans/500", json={"nick_name": "Read Replica Test"})
+        assert response.status_code == 200
+
+        # the user just wrote, their reads go to the primary
+        primary, replica = get_with_query_counts(app, auth_client, "/api/v1/cans/500")
+        assert primary > 0
+        assert replica == 0
+
+        # until the replica caught up
+        app.config["READ_REPLICA_STICKY_SECONDS"] = 0
+        primary, replica = get_with_query_counts(app, auth_client, "/api/v1/cans/500")
+        assert replica > 0
+    finally:
+        can = loaded_db.get(CAN, 500)
+        can.nick_name = nick_name
+        loaded_db.commit()
@@ -1,9 +1,11 @@
 import traceback
 
 import pytest
+from sqlalchemy import select
+from werkzeug.datastructures import Headers
 
-from models.events import OpsEventStatus, OpsEventType
-from ops_api.ops.utils.events import OpsEventHandler
+from models.events import OpsEvent, OpsEventStatus, OpsEventType
+from ops_api.ops.utils.events import OpsEventHandler, OpsEventWriter
 
 
 def test_ops_event_handler_init():
@@ -50,3 +52,42 @@ def test_ops_event_handler_exit_success(loaded_db, mocker):
 
     event = mock_session.add.call_args[0][0]
     assert event.event_status == OpsEventStatus.SUCCESS
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_ops_event_handler_metadata(app, mocker):
+    r_patch = mocker.patch("ops_api.ops.utils.events.request")
+    r_patch.headers = Headers({"Authorization": "Bearer blah", "User-Agent": "pytest"})
+    app.config["OPS_EVENT_METADATA"] = ["request.headers"]
+
+    oeh = OpsEventHandler(OpsEventType.LOGIN_ATTEMPT)
+    oeh.__enter__()
+
+    assert oeh.metadata == {"request.headers": {"Authorization": "[REDACTED]", "User-Agent": "pytest"}}
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_ops_event_writer(app, loaded_db):
+    writer = OpsEventWriter(app.engine, batch_size=10, flush_interval=0.1)
+    app.ops_event_writer = writer
+    try:
+        with app.test_request_context("/api/v1/users/", json={"blah": "blah"}):
+            for _ in range(3):
+                with OpsEventHandler(OpsEventType.GET_USER_DETAILS) as meta:
+                    meta.metadata["ops_event_writer_test"] = True
+            with pytest.raises(Exception):
+                with OpsEventHandler(OpsEventType.GET_USER_DETAILS) as meta:
+                    meta.metadata["ops_event_writer_test"] = True
+                    raise Exception("blah blah")
+        writer.flush()
+    finally:
+        writer.close()
+        del app.ops_event_writer
+
+    stmt = select(OpsEvent).where(OpsEvent.event_details["ops_event_writer_test"].as_boolean()).order_by(OpsEvent.id)
+    events = loaded_db.scalars(stmt).all()
+    assert [event.event_status for event in events] == [OpsEventStatus.SUCCESS] * 3 + [OpsEventStatus.FAILED]
+    assert all(event.event_type == OpsEventType.GET_USER_DETAILS for event in events)
+    assert all(event.event_details["request.json"] == {"blah": "blah"} for event in events)
+    assert all(event.created_on is not None for event in events)
+    assert events[-1].event_details["error_message"] == "blah blah"
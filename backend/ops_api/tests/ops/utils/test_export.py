@@ -0,0 +1,111 @@
+import csv
+import io
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+from sqlalchemy import select
+
+from models import Agreement, BudgetLineItem, BudgetLineItemStatus
+from ops_api.ops.utils.export import generate_csv
+
+SHEET_NAMESPACE = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def read_csv(response) -> list[dict]:
+    return list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_budget_line_items_csv_export(auth_client, app, loaded_db):
+    app.config["EXPORT_BATCH_SIZE"] = 10
+    try:
+        response = auth_client.get("/api/v1/budget-line-items/export")
+    finally:
+        app.config.pop("EXPORT_BATCH_SIZE")
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "text/csv"
+    assert response.headers["Content-Disposition"].startswith('attachment; filename="budget-line-items-')
+
+    rows = read_csv(response)
+    assert [int(row["id"]) for row in rows] == list(
+        loaded_db.scalars(select(BudgetLineItem.id).order_by(BudgetLineItem.id))
+    )
+    bli = loaded_db.get(BudgetLineItem, int(rows[0]["id"]))
+    assert rows[0]["status"] == (bli.status.name if bli.status else "")
+    assert rows[0]["agreement_name"] == (bli.agreement.name if bli.agreement else "")
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_budget_line_items_export_filters(auth_client, loaded_db):
+    rows = read_csv(auth_client.get("/api/v1/budget-line-items/export?agreement_id=2&status=PLANNED"))
+    expected = loaded_db.scalars(
+        select(BudgetLineItem.id)
+        .where(BudgetLineItem.agreement_id == 2, BudgetLineItem.status == BudgetLineItemStatus.PLANNED)
+        .order_by(BudgetLineItem.id)
+    ).all()
+    assert expected
+    assert [int(row["id"]) for row in rows] == expected
+
+    rows = read_csv(auth_client.get("/api/v1/budget-line-items/export?fiscal_year=2043"))
+    expected = loaded_db.scalars(select(BudgetLineItem.id).where(BudgetLineItem.fiscal_year == 2043)).all()
+    assert sorted(int(row["id"]) for row in rows) == sorted(expected)
+    assert all(row["fiscal_year"] == "2043" for row in rows)
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_agreements_csv_export(auth_client, loaded_db):
+    rows = read_csv(auth_client.get("/api/v1/agreements/export"))
+    assert [int(row["id"]) for row in rows] == list(loaded_db.scalars(select(Agreement.id).order_by(Agreement.id)))
+
+    agreement = loaded_db.get(Agreement, 1)
+    row = next(row for row in rows if row["id"] == "1")
+    assert row["agreement_type"] == agreement.agreement_type.name
+    assert int(row["budget_line_item_count"]) == len(agreement.budget_line_items)
+
+    rows = read_csv(auth_client.get("/api/v1/agreements/export?can_id=504"))
+    expected = loaded_db.scalars(
+        select(BudgetLineItem.agreement_id).where(BudgetLineItem.can_id == 504).distinct()
+    ).all()
+    assert sorted(int(row["id"]) for row in rows) == sorted(agreement_id for agreement_id in expected if agreement_id)
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_budget_line_items_xlsx_export(auth_client, loaded_db):
+    response = auth_client.get("/api/v1/budget-line-items/export?format=xlsx&agreement_id=1")
+    assert response.status_code == 200
+    assert response.mimetype == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as workbook:
+        assert "xl/workbook.xml" in workbook.namelist()
+        sheet = ElementTree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+    rows = sheet.findall("s:sheetData/s:row", SHEET_NAMESPACE)
+    assert rows[0].find("s:c/s:is/s:t", SHEET_NAMESPACE).text == "id"
+    ids = [int(row.find("s:c/s:v", SHEET_NAMESPACE).text) for row in rows[1:]]
+    assert (
+        ids
+        == loaded_db.scalars(
+            select(BudgetLineItem.id).where(BudgetLineItem.agreement_id == 1).order_by(BudgetLineItem.id)
+        ).all()
+    )
+
+
+@pytest.mark.usefixtures("app_ctx")
+@pytest.mark.parametrize("query_string", ["format=pdf", "can_id=x", "status=NOT_A_STATUS", "fiscal_year=x"])
+def test_invalid_export_parameters(auth_client, query_string):
+    response = auth_client.get(f"/api/v1/budget-line-items/export?{query_string}")
+    assert response.status_code == 400
+
+
+def test_generate_csv_neutralizes_formulas():
+    rows = [['=HYPERLINK("http://example.com")', "+1", "-1", "@SUM(A1)", "a - b", -1]]
+    content = "".join(generate_csv(["a", "b", "c", "d", "e", "f"], [rows]))
+    assert list(csv.reader(io.StringIO(content)))[1] == [
+        '\'=HYPERLINK("http://example.com")',
+        "'+1",
+        "'-1",
+        "'@SUM(A1)",
+        "a - b",
+        "-1",
+    ]
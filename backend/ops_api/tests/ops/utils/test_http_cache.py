@@ -0,0 +1,113 @@
+import pytest
+
+from models import CAN
+
+
+@pytest.fixture(autouse=True)
+def http_cache_enabled(app):
+    app.config["HTTP_CACHE_ENABLED"] = True
+    yield
+    app.config["HTTP_CACHE_ENABLED"] = False
+
+
+@pytest.fixture()
+def update_can(loaded_db):
+    can = loaded_db.get(CAN, 500)
+    description = can.description
+
+    def update(new_description: str):
+        can.description = new_description
+        loaded_db.commit()
+
+    yield update
+    can.description = description
+    loaded_db.commit()
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_list_has_validators(auth_client):
+    response = auth_client.get("/api/v1/cans/")
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_if_none_match_not_modified(auth_client):
+    response = auth_client.get("/api/v1/cans/")
+    etag = response.headers["ETag"]
+
+    response = auth_client.get("/api/v1/cans/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+    # the validators depend on the query parameters
+    response = auth_client.get("/api/v1/cans/?search=HMRF", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_streaming_format_changes_etag(auth_client):
+    response = auth_client.get("/api/v1/cans/")
+    etag = response.headers["ETag"]
+    assert "Accept" in response.headers["Vary"]
+
+    # the NDJSON negotiated by the Accept header is a different representation of the same URL
+    response = auth_client.get("/api/v1/cans/", headers={"If-None-Match": etag, "Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["ETag"] != etag
+    assert "Accept" in response.headers["Vary"]
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_write_changes_etag(auth_client, update_can):
+    response = auth_client.get("/api/v1/cans/")
+    etag = response.headers["ETag"]
+
+    update_can("An updated description")
+
+    response = auth_client.get("/api/v1/cans/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.headers["Last-Modified"]
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_if_modified_since_not_modified(auth_client, update_can):
+    update_can("An updated description")
+    response = auth_client.get("/api/v1/agreements/")
+    last_modified = response.headers["Last-Modified"]
+
+    response = auth_client.get("/api/v1/agreements/", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    update_can("Another updated description")
+    response = auth_client.get("/api/v1/agreements/", headers={"If-Modified-Since": "Tue, 01 Jan 2019 00:00:00 GMT"})
+    assert response.status_code == 200
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_cache_control_by_endpoint(app, auth_client):
+    app.config["HTTP_CACHE_CONTROL_ENDPOINTS"] = {"api.can-funding-summary-list": "private, max-age=30"}
+    response = auth_client.get("/api/v1/can-funding-summary?can_ids=500")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "private, max-age=30"
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_disabled(app, auth_client):
+    app.config["HTTP_CACHE_ENABLED"] = False
+    response = auth_client.get("/api/v1/cans/")
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_disabled_with_async_audit_pipeline(app, auth_client):
+    # the history records (the data version) are written after the commit
+    app.config["AUDIT_PIPELINE_MODE"] = "async"
+    response = auth_client.get("/api/v1/cans/")
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
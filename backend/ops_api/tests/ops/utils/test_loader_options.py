@@ -0,0 +1,11 @@
+from sqlalchemy.orm import joinedload
+
+from models import CAN
+from ops_api.ops.schemas.cans import CANSchema
+from ops_api.ops.utils.loader_options import get_loader_options
+
+
+def test_loader_options_are_not_duplicated():
+    # active_period, funding_method, ... all read the funding details
+    paths = [str(option.context[0].path) for option in get_loader_options(CAN, CANSchema)]
+    assert paths.count(str(joinedload(CAN.funding_details).context[0].path)) == 1
@@ -0,0 +1,138 @@
+import pytest
+from sqlalchemy import select, update
+
+from models import CAN, OpsDBHistory, OpsDBHistoryType
+from ops_api.ops.utils.pagination import count_rows
+
+
+def get_all_pages(client, path: str, limit: int) -> list[list[dict]]:
+    pages = []
+    path = f"{path}{'&' if '?' in path else '?'}limit={limit}"
+    response = client.get(path)
+    while True:
+        assert response.status_code == 200
+        pages.append(response.json)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+        response = client.get(f"{path}&cursor={cursor}")
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_cans_pages(auth_client, loaded_db):
+    all_ids = [can["id"] for can in auth_client.get("/api/v1/cans/").json]
+
+    pages = get_all_pages(auth_client, "/api/v1/cans/", limit=5)
+    assert all(len(page) <= 5 for page in pages)
+    assert [can["id"] for page in pages for can in page] == all_ids
+    assert len(all_ids) == loaded_db.query(CAN).count()
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_prev_page(auth_client):
+    first_page = auth_client.get("/api/v1/budget-line-items/?limit=3")
+    assert "X-Prev-Cursor" not in first_page.headers
+    assert 'rel="next"' in first_page.headers["Link"]
+
+    second_page = auth_client.get(f"/api/v1/budget-line-items/?limit=3&cursor={first_page.headers['X-Next-Cursor']}")
+    prev_page = auth_client.get(f"/api/v1/budget-line-items/?limit=3&cursor={second_page.headers['X-Prev-Cursor']}")
+    assert [bli["id"] for bli in prev_page.json] == [bli["id"] for bli in first_page.json]
+    assert prev_page.headers["X-Next-Cursor"] == first_page.headers["X-Next-Cursor"]
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_agreements_pages_across_agreement_types(auth_client):
+    all_ids = sorted(agreement["id"] for agreement in auth_client.get("/api/v1/agreements/").json)
+
+    pages = get_all_pages(auth_client, "/api/v1/agreements/", limit=4)
+    assert [agreement["id"] for page in pages for agreement in page] == all_ids
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_counts(auth_client):
+    all_users = auth_client.get("/api/v1/users/").json
+
+    response = auth_client.get("/api/v1/users/?limit=2&count=exact")
+    assert len(response.json) == 2
+    assert response.headers["X-Total-Count"] == str(len(all_users))
+
+    response = auth_client.get("/api/v1/users/?limit=2&count=estimated")
+    assert response.headers["X-Total-Count-Estimated"] == "true"
+    assert int(response.headers["X-Total-Count"]) >= 0
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_estimated_count_of_a_search_with_a_colon(auth_client, loaded_db, mocker):
+    logger = mocker.patch("ops_api.ops.utils.pagination.current_app.logger")
+    stmt = select(CAN).where(CAN.number.ilike("% :HS%"))
+
+    assert count_rows(loaded_db, stmt, estimated=True) >= 0
+    logger.exception.assert_not_called()
+
+    response = auth_client.get("/api/v1/cans/?search=G99 :HS&limit=2&count=estimated")
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count-Estimated"] == "true"
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_failed_estimated_count_falls_back_to_the_count(loaded_db, mocker):
+    mocker.patch("ops_api.ops.utils.pagination.current_app.logger")
+    stmt = select(CAN).where(CAN.number == "G99HS")
+    # the EXPLAIN fails (the count of the rows is still run in the transaction)
+    mocker.patch("ops_api.ops.utils.pagination._Explain", side_effect=lambda stmt: select(CAN.id / 0))
+
+    assert count_rows(loaded_db, stmt, estimated=True) == loaded_db.query(CAN).filter(CAN.number == "G99HS").count()
+
+
+@pytest.mark.usefixtures("app_ctx")
+@pytest.mark.parametrize("query_string", ["limit=0", "limit=x", "count=some", "cursor=not-a-cursor"])
+def test_invalid_pagination_parameters(auth_client, query_string):
+    response = auth_client.get(f"/api/v1/cans/?{query_string}")
+    assert response.status_code == 400
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_history_pages_and_offset(auth_client, loaded_db):
+    histories = [
+        OpsDBHistory(event_type=OpsDBHistoryType.NEW, class_name="PaginationTest", row_key=str(i)) for i in range(5)
+    ]
+    loaded_db.add_all(histories)
+    loaded_db.commit()
+    try:
+        path = "/api/v1/ops-db-histories/?class_name=PaginationTest"
+        response = auth_client.get(f"{path}&limit=2")
+        first_ids = [history["id"] for history in response.json]
+        response = auth_client.get(f"{path}&limit=2&cursor={response.headers['X-Next-Cursor']}")
+        second_ids = [history["id"] for history in response.json]
+        assert len(set(first_ids + second_ids)) == 4
+
+        # the offset skips rows (it used to skip "limit" rows)
+        response = auth_client.get(f"{path}&limit=2&offset=1")
+        assert [history["id"] for history in response.json] == (first_ids + second_ids)[1:3]
+    finally:
+        for history in histories:
+            loaded_db.delete(history)
+        loaded_db.commit()
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_history_pages_with_null_created_on(auth_client, loaded_db):
+    histories = [
+        OpsDBHistory(event_type=OpsDBHistoryType.NEW, class_name="PaginationNullTest", row_key=str(i)) for i in range(5)
+    ]
+    loaded_db.add_all(histories)
+    loaded_db.commit()
+    loaded_db.execute(
+        update(OpsDBHistory).where(OpsDBHistory.id.in_([h.id for h in histories[1:3]])).values(created_on=None)
+    )
+    loaded_db.commit()
+    try:
+        pages = get_all_pages(auth_client, "/api/v1/ops-db-histories/?class_name=PaginationNullTest", limit=2)
+
+        # latest first, the histories without created_on last
+        expected_ids = [histories[i].id for i in (4, 3, 0, 2, 1)]
+        assert [history["id"] for page in pages for history in page] == expected_ids
+    finally:
+        for history in histories:
+            loaded_db.delete(history)
+        loaded_db.commit()
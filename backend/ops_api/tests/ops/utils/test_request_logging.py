@@ -0,0 +1,63 @@
+import pytest
+from loguru import logger
+
+
+@pytest.fixture()
+def log_records():
+    records = []
+    sink_id = logger.add(lambda message: records.append(message.record), level="INFO")
+    yield records
+    logger.remove(sink_id)
+
+
+def get_records(log_records, prefix):
+    return [record for record in log_records if record["message"].startswith(prefix)]
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_response_log_has_timings(auth_client, log_records):
+    response = auth_client.get("/api/v1/cans/500")
+    assert response.status_code == 200
+
+    (record,) = get_records(log_records, "Response: GET")
+    extra = record["extra"]
+    assert extra["endpoint"] == "api.can-item"
+    assert extra["status_code"] == 200
+    assert extra["db_queries"] > 0
+    assert extra["total_ms"] >= extra["db_ms"]
+    assert extra["json_ms"] >= 0
+    assert extra["details"]["request_headers"]["Authorization"] == "[REDACTED]"
+    assert '"id":500' in extra["details"]["json"].replace(" ", "")
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_response_log_body_is_truncated(app, auth_client, log_records):
+    app.config["LOG_BODY_MAX_LENGTH"] = 100
+
+    response = auth_client.get("/api/v1/cans/")
+    assert response.status_code == 200
+
+    (record,) = get_records(log_records, "Response: GET")
+    body = record["extra"]["details"]["json"]
+    assert body.endswith(f"... ({len(response.data)} bytes)")
+    assert len(body) < 200
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_log_verbosity(app, auth_client, log_records):
+    app.config["LOG_BODY_SAMPLE_RATE"] = 0
+    auth_client.get("/api/v1/cans/500")
+    assert all("details" not in record["extra"] for record in log_records)
+
+    # error responses are logged in full
+    log_records.clear()
+    auth_client.get("/api/v1/cans/0")
+    (record,) = get_records(log_records, "Response: GET")
+    assert record["extra"]["status_code"] == 404
+    assert "details" in record["extra"]
+
+    app.config["LOG_ENDPOINT_VERBOSITY"] = {"api.can-item": "none"}
+    log_records.clear()
+    auth_client.get("/api/v1/cans/500")
+    assert get_records(log_records, "Request: GET") == []
+    assert get_records(log_records, "Response: GET") == []
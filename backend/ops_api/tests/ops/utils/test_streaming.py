@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from models import OpsDBHistory, OpsDBHistoryType
+
+
+@pytest.mark.usefixtures("app_ctx")
+@pytest.mark.parametrize("path", ["/api/v1/budget-line-items/", "/api/v1/agreements/", "/api/v1/cans/"])
+def test_streamed_json_array(auth_client, app, path):
+    expected = auth_client.get(path).json
+
+    app.config["STREAMING_BATCH_SIZE"] = 3
+    try:
+        response = auth_client.get(f"{path}?stream=json")
+    finally:
+        app.config.pop("STREAMING_BATCH_SIZE")
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "application/json"
+    # (the order of the unordered nested collections isn't deterministic)
+    assert [item["id"] for item in json.loads(response.get_data())] == [item["id"] for item in expected]
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_streamed_ndjson(auth_client):
+    expected = auth_client.get("/api/v1/budget-line-items/?agreement_id=1").json
+
+    response = auth_client.get("/api/v1/budget-line-items/?agreement_id=1&stream=ndjson")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == expected
+
+    response = auth_client.get("/api/v1/budget-line-items/?agreement_id=1", headers={"Accept": "application/x-ndjson"})
+    assert response.mimetype == "application/x-ndjson"
+    assert response.get_data(as_text=True).splitlines() == lines
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_streamed_empty_list(auth_client):
+    response = auth_client.get("/api/v1/cans/?search=&stream=json")
+    assert response.status_code == 200
+    assert response.json == []
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_streamed_histories(auth_client, loaded_db):
+    histories = [
+        OpsDBHistory(event_type=OpsDBHistoryType.NEW, class_name="StreamingTest", row_key=str(i)) for i in range(3)
+    ]
+    loaded_db.add_all(histories)
+    loaded_db.commit()
+    try:
+        response = auth_client.get("/api/v1/ops-db-histories/?class_name=StreamingTest&stream=ndjson")
+        assert response.status_code == 200
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [history.id for history in reversed(histories)]
+    finally:
+        for history in histories:
+            loaded_db.delete(history)
+        loaded_db.commit()
+
+
+@pytest.mark.usefixtures("app_ctx")
+def test_invalid_stream_format(auth_client):
+    response = auth_client.get("/api/v1/budget-line-items/?stream=xml")
+    assert response.status_code == 400
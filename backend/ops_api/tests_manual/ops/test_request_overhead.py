@@ -0,0 +1,37 @@
+import sys
+import time
+
+import pytest
+from flask.testing import FlaskClient
+from flask_jwt_extended import create_access_token
+
+from models import User
+
+REQUEST_COUNT = 1000
+
+
+@pytest.mark.skipif(
+    "test_request_overhead.py::test_request_overhead" not in sys.argv,
+    reason="Skip unless run manually by itself",
+)
+@pytest.mark.usefixtures("app_ctx")
+def test_request_overhead(app):
+    # an endpoint that doesn't query the database so the time measured is the per-request overhead
+    # of the app (before/teardown request handlers, JWT verification and loading the user, response handling)
+    url = "/api/v1/agreement-types/"
+
+    # use a plain test client with a fixed token (AuthClient creates a token and a user session for every request)
+    access_token = create_access_token(identity=app.db_session.get(User, 503))
+    client = FlaskClient(app, app.response_class, use_cookies=False)
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    # warm up
+    for _ in range(10):
+        assert client.get(url, headers=headers).status_code == 200
+
+    start = time.perf_counter()
+    for _ in range(REQUEST_COUNT):
+        client.get(url, headers=headers)
+    elapsed = time.perf_counter() - start
+
+    print(f"{REQUEST_COUNT} requests in {elapsed:.3f}s ({elapsed / REQUEST_COUNT * 1000:.3f}ms per request)")